@@ -3,6 +3,7 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from backend.game_classes import Base
+from database.database_access import db_url
 from alembic import context
 
 
@@ -10,6 +11,9 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate the database the game is configured to use, % has to be escaped for the ini interpolation
+config.set_main_option("sqlalchemy.url", db_url.replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -0,0 +1,54 @@
+"""Add the timer events the background worker applies and index the buildings and units with a running timer
+
+Revision ID: 1d6a4e9b0c52
+Revises: 3f1c2a9d7e40
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1d6a4e9b0c52"
+down_revision: Union[str, None] = "3f1c2a9d7e40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RUNNING: list[tuple[str, str, str, str]] = [
+    ("ix_buildings_in_construction", "buildings", "settlement_id", "construction_time_left > 0"),
+    ("ix_farms_gathering", "farms", "building_id", "gathering_time_left > 0"),
+    ("ix_mines_gathering", "mines", "building_id", "gathering_time_left > 0"),
+    ("ix_attack_units_in_training", "attack_units", "building_id", "training_pos IS NOT NULL"),
+]
+"Partial index of the rows with a running timer, with its table, column and condition"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "timer_events",
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("target_id", sa.Uuid(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("claimed_by", sa.Uuid(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.user_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_index("ix_timer_events_due_at", "timer_events", ["due_at"])
+
+    for index, table, column, condition in RUNNING:
+        op.create_index(index, table, [column], postgresql_where=sa.text(condition))
+
+
+def downgrade() -> None:
+    for index, table, _column, _condition in RUNNING:
+        op.drop_index(index, table_name=table)
+
+    op.drop_index("ix_timer_events_due_at", table_name="timer_events")
+    op.drop_table("timer_events")
@@ -0,0 +1,278 @@
+"""Baseline, the schema of the game before the timer events and migrations were added
+
+A new database is created with ``alembic upgrade head``, which starts from the tables created here. The live database,
+created with database/create_tables.py before the migrations were added, doesn't run this revision. It is marked as
+being at it with ``alembic stamp 3f1c2a9d7e40``, server/redeploy.sh does this once, and upgraded from there.
+database/create_tables.py creates the tables at the latest version and stamps them with ``head``.
+
+Revision ID: 3f1c2a9d7e40
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c2a9d7e40"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('achievements',
+    sa.Column('achievement_id', sa.Uuid(), nullable=False),
+    sa.Column('achievement_name', sa.String(), nullable=False),
+    sa.Column('achievement_description', sa.String(), nullable=False),
+    sa.Column('reward', sa.Integer(), nullable=False),
+    sa.Column('requirement', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('achievement_id'),
+    sa.UniqueConstraint('achievement_name')
+    )
+    op.create_table('races',
+    sa.Column('race_id', sa.Uuid(), nullable=False),
+    sa.Column('race_name', sa.String(), nullable=False),
+    sa.Column('leader_id', sa.Uuid(), nullable=False),
+    sa.PrimaryKeyConstraint('race_id'),
+    sa.UniqueConstraint('leader_id'),
+    sa.UniqueConstraint('race_name')
+    )
+    op.create_table('setup_state',
+    sa.Column('_key', sa.Integer(), nullable=False),
+    sa.Column('achievements_created', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('_key')
+    )
+    op.create_table('units',
+    sa.Column('unit_id', sa.Uuid(), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+    op.create_table('users',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('user_name', sa.String(), nullable=False),
+    sa.Column('password', sa.String(), nullable=False),
+    sa.Column('last_update', sa.DateTime(), nullable=False),
+    sa.Column('race_id', sa.Uuid(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id'),
+    sa.UniqueConstraint('user_name')
+    )
+    op.create_table('has_achievement',
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('achievement_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['achievement_id'], ['achievements.achievement_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'achievement_id')
+    )
+    op.create_table('messages',
+    sa.Column('message_id', sa.Uuid(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=False),
+    sa.Column('race_id', sa.Uuid(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['race_id'], ['races.race_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('message_id'),
+    sa.UniqueConstraint('user_id', 'race_id', 'position')
+    )
+    op.create_table('planets',
+    sa.Column('planet_id', sa.Uuid(), nullable=False),
+    sa.Column('planet_x', sa.Integer(), nullable=False),
+    sa.Column('planet_y', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Uuid(), nullable=True),
+    sa.Column('planet_name', sa.String(), nullable=False),
+    sa.Column('building_materials', sa.Integer(), nullable=False),
+    sa.Column('rations', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('planet_id'),
+    sa.UniqueConstraint('planet_name'),
+    sa.UniqueConstraint('planet_x', 'planet_y')
+    )
+    op.create_table('ships',
+    sa.Column('ship_id', sa.Uuid(), nullable=False),
+    sa.Column('owner_id', sa.Uuid(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.user_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ship_id')
+    )
+    op.create_table('colony_ships',
+    sa.Column('ship_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['ship_id'], ['ships.ship_id'], ),
+    sa.PrimaryKeyConstraint('ship_id')
+    )
+    op.create_table('settlements',
+    sa.Column('settlement_id', sa.Uuid(), nullable=False),
+    sa.Column('settlement_nr', sa.Integer(), nullable=False),
+    sa.Column('planet_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['planet_id'], ['planets.planet_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('settlement_id'),
+    sa.UniqueConstraint('settlement_nr', 'planet_id')
+    )
+    op.create_table('spaceships',
+    sa.Column('ship_id', sa.Uuid(), nullable=False),
+    sa.Column('building_materials', sa.Integer(), nullable=False),
+    sa.Column('rations', sa.Integer(), nullable=False),
+    sa.Column('current_destination_id', sa.Uuid(), nullable=True),
+    sa.Column('moving_time_left', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['current_destination_id'], ['planets.planet_id'], ),
+    sa.ForeignKeyConstraint(['ship_id'], ['ships.ship_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ship_id')
+    )
+    op.create_table('buildings',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.Column('settlement_id', sa.Uuid(), nullable=False),
+    sa.Column('grid_pos_x', sa.Integer(), nullable=False),
+    sa.Column('grid_pos_y', sa.Integer(), nullable=False),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('construction_time_left', sa.Float(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['settlement_id'], ['settlements.settlement_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id'),
+    sa.UniqueConstraint('settlement_id', 'grid_pos_x', 'grid_pos_y')
+    )
+    op.create_table('barracks',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.Column('space_marine_level', sa.Integer(), nullable=False),
+    sa.Column('space_commando_level', sa.Integer(), nullable=False),
+    sa.Column('space_drone_level', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id')
+    )
+    op.create_table('farms',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.Column('stored_resources', sa.Integer(), nullable=False),
+    sa.Column('gathering_time_left', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id')
+    )
+    op.create_table('mines',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.Column('stored_resources', sa.Integer(), nullable=False),
+    sa.Column('gathering_time_left', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id')
+    )
+    op.create_table('spaceports',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.Column('space_ship_id', sa.Uuid(), nullable=True),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['space_ship_id'], ['spaceships.ship_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id'),
+    sa.UniqueConstraint('space_ship_id')
+    )
+    op.create_table('town_halls',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id')
+    )
+    op.create_table('warpers',
+    sa.Column('building_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['buildings.building_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('building_id')
+    )
+    op.create_table('attack_units',
+    sa.Column('unit_id', sa.Uuid(), nullable=False),
+    sa.Column('building_id', sa.Uuid(), nullable=True),
+    sa.Column('spaceship_id', sa.Uuid(), nullable=True),
+    sa.Column('seconds_since_last_feed', sa.Float(), nullable=False),
+    sa.Column('training_pos', sa.Integer(), nullable=True),
+    sa.Column('training_time_left', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['building_id'], ['barracks.building_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['spaceship_id'], ['spaceships.ship_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['unit_id'], ['units.unit_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+    op.create_table('planet_links',
+    sa.Column('link_id', sa.Uuid(), nullable=False),
+    sa.Column('planet_from_id', sa.Uuid(), nullable=False),
+    sa.Column('planet_to_id', sa.Uuid(), nullable=False),
+    sa.Column('warper_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['planet_from_id'], ['planets.planet_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['planet_to_id'], ['planets.planet_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['warper_id'], ['warpers.building_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id'),
+    sa.UniqueConstraint('planet_from_id', 'planet_to_id')
+    )
+    op.create_table('ship_locations',
+    sa.Column('ship_id', sa.Uuid(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('planet_id', sa.Uuid(), nullable=True),
+    sa.Column('planet_to_id', sa.Uuid(), nullable=True),
+    sa.Column('departure_time', sa.DateTime(), nullable=True),
+    sa.Column('spaceport_id', sa.Uuid(), nullable=True),
+    sa.ForeignKeyConstraint(['planet_id'], ['planets.planet_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['planet_to_id'], ['planets.planet_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['ship_id'], ['ships.ship_id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['spaceport_id'], ['spaceports.building_id'], ),
+    sa.PrimaryKeyConstraint('ship_id')
+    )
+    op.create_table('attacks',
+    sa.Column('attacking_planet_id', sa.Uuid(), nullable=False),
+    sa.Column('defending_planet_id', sa.Uuid(), nullable=False),
+    sa.Column('_selected_attack_unit_id', sa.Uuid(), nullable=True),
+    sa.Column('_selected_defence_unit_id', sa.Uuid(), nullable=True),
+    sa.ForeignKeyConstraint(['_selected_attack_unit_id'], ['attack_units.unit_id'], ),
+    sa.ForeignKeyConstraint(['_selected_defence_unit_id'], ['attack_units.unit_id'], ),
+    sa.ForeignKeyConstraint(['attacking_planet_id'], ['planets.planet_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['defending_planet_id'], ['planets.planet_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('attacking_planet_id', 'defending_planet_id'),
+    sa.UniqueConstraint('attacking_planet_id'),
+    sa.UniqueConstraint('defending_planet_id')
+    )
+    op.create_table('space_commandos',
+    sa.Column('unit_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['unit_id'], ['attack_units.unit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+    op.create_table('space_drones',
+    sa.Column('unit_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['unit_id'], ['attack_units.unit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+    op.create_table('space_marines',
+    sa.Column('unit_id', sa.Uuid(), nullable=False),
+    sa.Column('combats_survived', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['unit_id'], ['attack_units.unit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('unit_id')
+    )
+
+    # Races and users refer to each other, so these are added once both tables exist
+    op.create_foreign_key(
+        "races_leader_id_fkey", "races", "users", ["leader_id"], ["user_id"], ondelete="CASCADE"
+    )
+    op.create_foreign_key("users_race_id_fkey", "users", "races", ["race_id"], ["race_id"], ondelete="SET NULL")
+
+
+def downgrade() -> None:
+    op.drop_constraint("users_race_id_fkey", "users", type_="foreignkey")
+    op.drop_constraint("races_leader_id_fkey", "races", type_="foreignkey")
+    op.drop_table('space_marines')
+    op.drop_table('space_drones')
+    op.drop_table('space_commandos')
+    op.drop_table('attacks')
+    op.drop_table('ship_locations')
+    op.drop_table('planet_links')
+    op.drop_table('attack_units')
+    op.drop_table('warpers')
+    op.drop_table('town_halls')
+    op.drop_table('spaceports')
+    op.drop_table('mines')
+    op.drop_table('farms')
+    op.drop_table('barracks')
+    op.drop_table('buildings')
+    op.drop_table('spaceships')
+    op.drop_table('settlements')
+    op.drop_table('colony_ships')
+    op.drop_table('ships')
+    op.drop_table('planets')
+    op.drop_table('messages')
+    op.drop_table('has_achievement')
+    op.drop_table('users')
+    op.drop_table('units')
+    op.drop_table('setup_state')
+    op.drop_table('races')
+    op.drop_table('achievements')
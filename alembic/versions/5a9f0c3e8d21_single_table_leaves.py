@@ -0,0 +1,60 @@
+"""Store the unit types, town halls and colony ships in the table of their parent
+
+These subclasses have no columns of their own, except the combats survived of space marines, which moves to
+attack_units. Their rows are told apart by the type column, which already holds their polymorphic identity.
+
+Revision ID: 5a9f0c3e8d21
+Revises: e41b7d9a2c06
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5a9f0c3e8d21"
+down_revision: Union[str, None] = "e41b7d9a2c06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LEAVES: list[tuple[str, str, str, str, str]] = [
+    ("space_marines", "attack_units", "unit_id", "units", "space_marines"),
+    ("space_commandos", "attack_units", "unit_id", "units", "space_commandos"),
+    ("space_drones", "attack_units", "unit_id", "units", "space_drones"),
+    ("town_halls", "buildings", "building_id", "buildings", "town_halls"),
+    ("colony_ships", "ships", "ship_id", "ships", "colony_ship"),
+]
+"Table of every leaf, with the table and key of its parent, the table with the type column and the type of its rows"
+
+
+def upgrade() -> None:
+    op.add_column("attack_units", sa.Column("combats_survived", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE attack_units a SET combats_survived = m.combats_survived FROM space_marines m WHERE m.unit_id = a.unit_id"
+    )
+    for table, _parent, _key, _typed, _type in LEAVES:
+        op.drop_table(table)
+
+
+def downgrade() -> None:
+    for table, parent, key, typed, type_ in LEAVES:
+        op.create_table(
+            table,
+            sa.Column(key, sa.Uuid(), sa.ForeignKey(f"{parent}.{key}", ondelete="CASCADE"), primary_key=True),
+        )
+        # The type column is on the root table of the hierarchy, which isn't always the parent
+        op.execute(
+            f"INSERT INTO {table} ({key}) SELECT p.{key} FROM {parent} p JOIN {typed} t ON t.{key} = p.{key} "
+            f"WHERE t.type = '{type_}'"
+        )
+
+    op.add_column("space_marines", sa.Column("combats_survived", sa.Integer(), server_default="0", nullable=False))
+    op.execute(
+        "UPDATE space_marines m SET combats_survived = COALESCE(a.combats_survived, 0) "
+        "FROM attack_units a WHERE a.unit_id = m.unit_id"
+    )
+    op.drop_column("attack_units", "combats_survived")
@@ -0,0 +1,35 @@
+"""Version the planets, barracks and spaceships, so concurrent updates of the same row are detected
+
+Every row starts at version 1. SQLAlchemy bumps the version on each update and only updates the row when it still has
+the version that was loaded.
+
+Revision ID: 7d3b9e2f4a18
+Revises: 5a9f0c3e8d21
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3b9e2f4a18"
+down_revision: Union[str, None] = "5a9f0c3e8d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES: list[str] = ["planets", "barracks", "spaceships"]
+"Tables with a version column"
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, "version")
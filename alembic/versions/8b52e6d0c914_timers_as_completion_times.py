@@ -0,0 +1,149 @@
+"""Store timers as the moment they complete instead of the seconds that are left
+
+Revision ID: 8b52e6d0c914
+Revises: 1d6a4e9b0c52
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b52e6d0c914"
+down_revision: Union[str, None] = "1d6a4e9b0c52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LEVELS: dict[str, dict[int, dict[str, int]]] = {
+    building: {
+        1: {"capacity": 1000, "production_rate": 200},
+        2: {"capacity": 2000, "production_rate": 400},
+        3: {"capacity": 3000, "production_rate": 600},
+        4: {"capacity": 5000, "production_rate": 800},
+    }
+    for building in ("farm", "mine")
+}
+"Properties of the levels of the farms and mines when this revision was written, it doesn't read the property files"
+
+
+def _per_level(building: str, prop: str) -> str:
+    """CASE expression looking up a building property for the level of the joined building"""
+    whens = " ".join(f"WHEN {level} THEN {values[prop]}" for level, values in LEVELS[building].items())
+    return f"(CASE b.level {whens} END)"
+
+
+def _seconds(column: str) -> str:
+    return f"make_interval(secs => {column})"
+
+
+def upgrade() -> None:
+    # Construction
+    op.add_column("buildings", sa.Column("construction_completes_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE buildings SET construction_completes_at = now()::timestamp + "
+        f"{_seconds('construction_time_left')} WHERE construction_time_left > 0"
+    )
+
+    # Farms and mines store what they held when the gathering started, so the amount gathered so far is derived
+    for table, name in (("farms", "farm"), ("mines", "mine")):
+        op.add_column(table, sa.Column("gathering_completes_at", sa.DateTime(), nullable=True))
+        capacity, rate = _per_level(name, "capacity"), _per_level(name, "production_rate")
+        op.execute(
+            f"UPDATE {table} t SET gathering_completes_at = now()::timestamp + {_seconds('t.gathering_time_left')}, "
+            f"stored_resources = GREATEST(0, t.stored_resources - "
+            f"trunc({capacity} - t.gathering_time_left * {rate} / 3600)::integer) "
+            f"FROM buildings b WHERE b.building_id = t.building_id AND t.gathering_time_left > 0"
+        )
+
+    # Units in training complete one after the other, units that are trained were fed some time ago
+    op.add_column("attack_units", sa.Column("training_completes_at", sa.DateTime(), nullable=True))
+    op.add_column("attack_units", sa.Column("fed_until", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE attack_units a SET training_completes_at = now()::timestamp + make_interval(secs => q.queue_time) "
+        "FROM (SELECT unit_id, SUM(training_time_left) OVER (PARTITION BY building_id ORDER BY training_pos) "
+        "AS queue_time FROM attack_units WHERE training_pos IS NOT NULL) q WHERE q.unit_id = a.unit_id"
+    )
+    op.execute(
+        "UPDATE attack_units SET fed_until = COALESCE(training_completes_at, "
+        f"now()::timestamp - {_seconds('seconds_since_last_feed')})"
+    )
+    op.alter_column("attack_units", "fed_until", nullable=False)
+
+    # Ships
+    op.add_column("spaceships", sa.Column("moving_completes_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE spaceships SET moving_completes_at = now()::timestamp + "
+        f"{_seconds('moving_time_left')} WHERE moving_time_left > 0"
+    )
+
+    # The partial indexes move to the new columns
+    for index, table, column, timer in (
+        ("ix_buildings_in_construction", "buildings", "settlement_id", "construction_completes_at"),
+        ("ix_farms_gathering", "farms", "building_id", "gathering_completes_at"),
+        ("ix_mines_gathering", "mines", "building_id", "gathering_completes_at"),
+        ("ix_attack_units_in_training", "attack_units", "building_id", "training_completes_at"),
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+        op.create_index(index, table, [column], postgresql_where=sa.text(f"{timer} IS NOT NULL"))
+
+    op.drop_column("buildings", "construction_time_left")
+    op.drop_column("farms", "gathering_time_left")
+    op.drop_column("mines", "gathering_time_left")
+    op.drop_column("attack_units", "training_time_left")
+    op.drop_column("attack_units", "seconds_since_last_feed")
+    op.drop_column("spaceships", "moving_time_left")
+
+
+def downgrade() -> None:
+    def time_left(column: str) -> str:
+        return f"GREATEST(0, COALESCE(EXTRACT(EPOCH FROM ({column} - now()::timestamp)), 0))"
+
+    op.add_column("buildings", sa.Column("construction_time_left", sa.Float(), server_default="0", nullable=False))
+    op.execute(f"UPDATE buildings SET construction_time_left = {time_left('construction_completes_at')}")
+
+    for table, name in (("farms", "farm"), ("mines", "mine")):
+        op.add_column(table, sa.Column("gathering_time_left", sa.Float(), server_default="0", nullable=False))
+        capacity, rate = _per_level(name, "capacity"), _per_level(name, "production_rate")
+        op.execute(
+            f"UPDATE {table} t SET gathering_time_left = {time_left('t.gathering_completes_at')}, "
+            f"stored_resources = LEAST({capacity}, t.stored_resources + "
+            f"trunc({capacity} - {time_left('t.gathering_completes_at')} * {rate} / 3600)::integer) "
+            f"FROM buildings b WHERE b.building_id = t.building_id AND t.gathering_completes_at IS NOT NULL"
+        )
+
+    op.add_column("attack_units", sa.Column("training_time_left", sa.Float(), server_default="0", nullable=False))
+    op.add_column("attack_units", sa.Column("seconds_since_last_feed", sa.Float(), server_default="0", nullable=False))
+    op.execute(
+        "UPDATE attack_units a SET training_time_left = "
+        f"{time_left('a.training_completes_at')} - {time_left('q.previous_completes_at')} "
+        "FROM (SELECT unit_id, LAG(training_completes_at) OVER (PARTITION BY building_id ORDER BY training_pos) "
+        "AS previous_completes_at FROM attack_units WHERE training_completes_at IS NOT NULL) q "
+        "WHERE q.unit_id = a.unit_id"
+    )
+    op.execute(
+        "UPDATE attack_units SET seconds_since_last_feed = "
+        "GREATEST(0, EXTRACT(EPOCH FROM (now()::timestamp - fed_until)))"
+    )
+
+    op.add_column("spaceships", sa.Column("moving_time_left", sa.Float(), server_default="0", nullable=False))
+    op.execute(f"UPDATE spaceships SET moving_time_left = {time_left('moving_completes_at')}")
+
+    for index, table, column, timer in (
+        ("ix_buildings_in_construction", "buildings", "settlement_id", "construction_time_left > 0"),
+        ("ix_farms_gathering", "farms", "building_id", "gathering_time_left > 0"),
+        ("ix_mines_gathering", "mines", "building_id", "gathering_time_left > 0"),
+        ("ix_attack_units_in_training", "attack_units", "building_id", "training_pos IS NOT NULL"),
+    ):
+        op.drop_index(index, table_name=table)
+        op.create_index(index, table, [column], postgresql_where=sa.text(timer))
+
+    op.drop_column("buildings", "construction_completes_at")
+    op.drop_column("farms", "gathering_completes_at")
+    op.drop_column("mines", "gathering_completes_at")
+    op.drop_column("attack_units", "training_completes_at")
+    op.drop_column("attack_units", "fed_until")
+    op.drop_column("spaceships", "moving_completes_at")
@@ -0,0 +1,31 @@
+"""Version all buildings instead of the barracks
+
+Resources are spent with a conditional update of the planet that doesn't check the version of the planet, so the
+buildings are versioned themselves to keep two requests from upgrading or collecting the same building.
+
+Revision ID: b81e5c4d7f30
+Revises: 7d3b9e2f4a18
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81e5c4d7f30"
+down_revision: Union[str, None] = "7d3b9e2f4a18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("buildings", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.drop_column("barracks", "version")
+
+
+def downgrade() -> None:
+    op.add_column("barracks", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+    op.drop_column("buildings", "version")
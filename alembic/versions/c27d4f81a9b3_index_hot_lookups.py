@@ -0,0 +1,45 @@
+"""Index the foreign keys and orderings the game looks up on every request
+
+The indexes are built concurrently, so a live database keeps accepting writes while they are created.
+``buildings(settlement_id)`` and ``planet_links(planet_from_id, planet_to_id)`` already lead their unique constraints.
+
+Revision ID: c27d4f81a9b3
+Revises: 8b52e6d0c914
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c27d4f81a9b3"
+down_revision: Union[str, None] = "8b52e6d0c914"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES: list[tuple[str, str, list[str]]] = [
+    ("ix_messages_race_id_position", "messages", ["race_id", "position"]),
+    ("ix_planets_user_id", "planets", ["user_id"]),
+    ("ix_settlements_planet_id", "settlements", ["planet_id"]),
+    ("ix_attack_units_building_id", "attack_units", ["building_id"]),
+    ("ix_attack_units_spaceship_id", "attack_units", ["spaceship_id"]),
+    ("ix_ship_locations_planet_id", "ship_locations", ["planet_id"]),
+    ("ix_spaceships_current_destination_id", "spaceships", ["current_destination_id"]),
+]
+"Name, table and columns of every index"
+
+
+def upgrade() -> None:
+    # Concurrent index builds can't run inside the transaction of the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,39 @@
+"""Rebuild the primary key indexes of the tables that get the most inserts
+
+New keys are UUIDv7, ordered by the time they were made, see database/ids.py. The existing uuid1 keys stay, both are
+valid uuids, but the random inserts left their indexes with half-empty pages. Rebuilding them packs the old keys, the
+new ones are appended at the end. The indexes are rebuilt concurrently, so a live database keeps accepting writes.
+
+Revision ID: e41b7d9a2c06
+Revises: c27d4f81a9b3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e41b7d9a2c06"
+down_revision: Union[str, None] = "c27d4f81a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES: list[str] = ["units", "attack_units", "buildings", "messages", "spaceships", "timer_events"]
+"Tables to rebuild the indexes of"
+
+
+def upgrade() -> None:
+    # Concurrent rebuilds can't run inside the transaction of the migration, and only exist on Postgres
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f"REINDEX TABLE CONCURRENTLY {table}")
+
+
+def downgrade() -> None:
+    # Rebuilt indexes hold the same keys, there is nothing to undo
+    pass
@@ -7,8 +7,23 @@ from backend.api.settlement import api as settlement_ns
 from backend.api.user import api as user_ns
 from backend.api.combat import api as combat_ns
 from backend.api.ship import api as ship_ns
-from flask import Blueprint, make_response
+import json
+import time
+from http import HTTPStatus
+
+from flask import Blueprint, Response, current_app, g, make_response, request, session as flask_session
 from flask_restx import Api
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.game_classes import properties
+from backend.game_classes.properties import refresh_properties
+from backend.game_classes.update_registry import begin_registry, current_registry, end_registry
+from database.config import config_data
+from database.conflicts import ConflictError, conflict_metrics, retry_on_conflict
+from database.database_access import DefaultSession, engine
+from database.pool import pool_status
+from database.query_counter import QueryStats, begin_counting, current_stats, end_counting
+from database.routing import ConsistencyToken, begin_scope, end_scope, written_token
 
 api_desc: str = """
 Backend API for Project Galaxy.
@@ -21,6 +36,8 @@ api: Api = Api(
     title="Project Galaxy API",
     description=api_desc,
     doc="/",
+    # requests that lost a race for a planet, barrack or spaceship to another request are run again
+    decorators=[retry_on_conflict],
 )
 
 # add namespaces
@@ -34,6 +51,114 @@ api.add_namespace(user_ns)
 api.add_namespace(combat_ns)
 api.add_namespace(ship_ns)
 
+
+@api.errorhandler(StaleDataError)
+@api.errorhandler(ConflictError)
+def conflict(_error: StaleDataError | ConflictError):
+    # the request kept conflicting with other requests of the same player, it changed nothing
+    return {"message": "The request conflicted with another request, try again"}, HTTPStatus.CONFLICT
+
+
+# a published balance version is swapped in without restarting the worker
+@api_bp.before_request
+def refresh_balance() -> None:
+    if refresh_properties():
+        current_app.logger.info("Loaded balance version %s", properties.version)
+
+
+# users are brought up to date at most once per request
+@api_bp.before_request
+def begin_update_registry() -> None:
+    g.update_registry_token = begin_registry()
+
+
+@api_bp.after_request
+def report_absorbed_updates(response: Response) -> Response:
+    registry = current_registry()
+    absorbed: int = 0 if registry is None else registry.absorbed
+    if absorbed > 0:
+        current_app.logger.debug(f"Absorbed {absorbed} redundant user updates")
+    if current_app.debug:
+        response.headers["X-Absorbed-Updates"] = str(absorbed)
+    return response
+
+
+# reads of a user are only routed to replicas that have the last writes of the user
+@api_bp.before_request
+def begin_consistency_scope() -> None:
+    g.consistency_scope_token = begin_scope(ConsistencyToken.from_json(flask_session.get("consistency_token")))
+
+
+@api_bp.after_request
+def store_consistency_token(response: Response) -> Response:
+    token: ConsistencyToken | None = written_token(DefaultSession.kw["bind"])
+    if token is not None:
+        flask_session["consistency_token"] = token.json()
+    return response
+
+
+# the statements of every request are counted, repeated ones point at lazy loads in a loop
+@api_bp.before_request
+def begin_query_counting() -> None:
+    g.query_counting_token = begin_counting()
+
+
+@api_bp.after_request
+def report_query_stats(response: Response) -> Response:
+    stats: QueryStats | None = current_stats()
+    if stats is None:
+        return response
+
+    repeated: dict[str, int] = stats.repeated()
+    for statement, count in repeated.items():
+        current_app.logger.warning(f"Statement executed {count} times in {request.path}: {statement[:200]}")
+    if current_app.debug:
+        response.headers["X-Query-Count"] = str(stats.statements)
+        response.headers["X-Query-Time-Ms"] = f"{1000 * stats.seconds:.1f}"
+        response.headers["X-Query-Repeated"] = str(len(repeated))
+    return response
+
+
+# every worker process reports its own connection pool
+_last_pool_report: float = time.monotonic()
+
+
+@api_bp.after_request
+def report_pool_status(response: Response) -> Response:
+    global _last_pool_report
+    status: dict = pool_status(engine.pool)
+    if current_app.debug:
+        response.headers["X-Pool-Checked-Out"] = str(status.get("checked_out", 0))
+
+    now: float = time.monotonic()
+    if now - _last_pool_report >= config_data.get("db_pool_report_interval", 300):
+        _last_pool_report = now
+        current_app.logger.info(f"Database pool: {json.dumps(status)}")
+        current_app.logger.info(f"Conflicts: {json.dumps(conflict_metrics.status())}")
+    return response
+
+
+@api_bp.teardown_request
+def end_update_registry(_exc: BaseException | None) -> None:
+    token = g.pop("update_registry_token", None)
+    if token is not None:
+        end_registry(token)
+
+
+@api_bp.teardown_request
+def end_query_counting(_exc: BaseException | None) -> None:
+    token = g.pop("query_counting_token", None)
+    if token is not None:
+        end_counting(token)
+
+
+@api_bp.teardown_request
+def end_consistency_scope(_exc: BaseException | None) -> None:
+    token = g.pop("consistency_scope_token", None)
+    if token is not None:
+        end_scope(token)
+
+
 # api catchall
 @api_bp.route("", defaults={"endpoint": ""})
 @api_bp.route("/<path:endpoint>")
@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend.api.account import active_users, api
 from backend.game_classes import User
 from backend.game_classes.General import check_user
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields
@@ -49,7 +49,7 @@ class Login(Resource):
         if not result:
             return Response("Invalid combination of username and password", HTTPStatus.BAD_REQUEST)
 
-        with DefaultSession() as db_session:
+        with unit_of_work() as db_session:
             # We load the user into the backend classes
             user = User.load_by_name(data["user_name"], session=db_session)
 
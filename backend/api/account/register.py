@@ -1,12 +1,14 @@
 from http import HTTPStatus
 
 from backend.api.account import active_users, api
-from backend.game_classes import Planet, Settlement, TownHall, User
-from backend.game_classes.General import add_user, check_password
-from database.database_access import DefaultSession
+from backend.game_classes import User
+from backend.game_classes.General import check_password
+from backend.onboarding import Account, check_accounts, create_accounts
+from database.database_access import unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields
+from sqlalchemy.exc import IntegrityError
 
 register_model = api.model(
     "RegisterInfo",
@@ -56,68 +58,25 @@ class Register(Resource):
 
         data = register_parser.parse_args(request)
 
-        # if data["username"] == "" or data["password"] == "":
-        #     return Response("Missing fields", HTTPStatus.BAD_REQUEST)
-
         if check_password(data["password"]) != "correct":
             return Response("Password is not strong enough!", HTTPStatus.BAD_REQUEST)
 
-        # Insert this value into table User and get the result string
-        result: str = add_user(data["user_name"], data["password"])
-
-        if result == "Successfully added user":
-            with DefaultSession(autoflush=False) as db_session:
-                user = User.load_by_name(data["user_name"], session=db_session)
-
-                all_planets = Planet.get_all_planets_coordinates(session=db_session)
-
-                planet_coordinate = Planet.generateNewPlanetCoordinates(all_planets)
-
-                planet: Planet = Planet(
-                    user_id=user.user_id,
-                    planet_x=planet_coordinate[0],
-                    planet_y=planet_coordinate[1],
-                    name=data["planet_name"],
-                )
-
-                user.add_planet(planet, session=db_session)
-
-                settlement: Settlement = Settlement(0, planet.planet_id)
-                planet.add_settlement(settlement, session=db_session)
-
-                town_hall = TownHall(settlement_id=settlement.settlement_id, grid_pos_x=2, grid_pos_y=2)
+        # The user, its planet, settlement and town hall are created in one transaction
+        account = Account(data["user_name"], data["password"], data["planet_name"])
+        try:
+            with unit_of_work(autoflush=False) as db_session:
+                result: str = check_accounts([account], session=db_session)
+                if result != "correct":
+                    return Response(result, HTTPStatus.BAD_REQUEST)
 
-                settlement.build(town_hall, session=db_session)
+                user: User = create_accounts([account], session=db_session)[0]
 
-                user.update(session=db_session)
-
-                db_session.commit()
-
-                """
-                this does not work yet, but this is how i want to immediately log in the user after registering.
-                Problem: i can't get the credentials in the request.
-
-                # The URL of the login endpoint
-                url = "http://localhost:8080/api/login"
-
-                # The data to be sent in the request body
-                data = {
-                    "Username": data['Username'],
-                    "Password": data['Password']
-                }
-
-                # Send the POST request to the login endpoint
-                response = requests.post(url, json=data)
-
-                return Response(response)
-                """
                 active_users[user.user_id] = user
 
                 flask_session["user_id"] = user.user_id
                 flask_session["user_name"] = user.user_name
+        except IntegrityError:
+            # Another request took the name between the check and the insert
+            return Response("Username or planet name already exists", HTTPStatus.BAD_REQUEST)
 
-                user.update(session=db_session)
-
-                return Response("Successfully logged in", HTTPStatus.OK)
-
-        return Response(result, HTTPStatus.BAD_REQUEST)
+        return Response("Successfully logged in", HTTPStatus.OK)
@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend import game_classes
 from backend.api.achievement import api
 from backend.game_classes import Achievement, User
-from database.database_access import DefaultSession
+from database.database_access import read_only_session
 from flask import request, session as flask_session
 from flask_restx import Resource, fields, marshal
 
@@ -35,7 +35,7 @@ class AllAchievements(Resource):
         if user_name is None:
             return api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
-        with DefaultSession() as session:
+        with read_only_session() as session:
             user = session.query(User).filter(User.user_name == user_name).first()
 
             all_achievements = session.query(Achievement).all()
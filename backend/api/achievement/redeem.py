@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend import game_classes
 from backend.api.achievement import api
 from backend.game_classes import Achievement, User
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import request, session as flask_session
 from flask_restx import Resource, fields, marshal
 
@@ -27,7 +27,7 @@ class Redeem(Resource):
             return api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = redeem_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = session.query(User).filter(User.user_name == user_name).first()
             
             achievement = Achievement.load(data["achievement_id"], session)
@@ -42,4 +42,4 @@ class Redeem(Resource):
 
             user.achievements.append(achievement)
             user.planets[0].add_building_materials(achievement.reward)
-            session.commit()
\ No newline at end of file
+            commit(session)
\ No newline at end of file
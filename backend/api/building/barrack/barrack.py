@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend.api.building import api
 from backend.api.building.building import building_model, building_parser
 from backend.game_classes import Barrack, Planet, Settlement, User, AttackUnit
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request, session
 from flask_restx import Resource, fields, inputs, marshal
 
@@ -118,7 +118,7 @@ class BarrackRes(Resource):
         if user_name is None:
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
         data = barrack_parser.parse_args(request)
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(session.get("user_name", None), session=BaseSession)
             user.update()
             planet: Planet = user.planets[data["planet_number"]]
@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from backend.api.building import api
 from backend.game_classes import Barrack, Building, Planet, Settlement, SpaceCommando, SpaceDrone, SpaceMarine, User
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource
@@ -34,7 +34,7 @@ class Unit(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = unit_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
 
             planet: Planet = user.planets[data["planet_number"]]
@@ -62,10 +62,10 @@ class Unit(Resource):
 
             building: Barrack
             result = building.train_unit(unit, session=session)
-            session.commit()
+            commit(session)
             if result is not None:
                 session.delete(unit)
-                session.commit()
+                commit(session)
                 api.abort(HTTPStatus.BAD_REQUEST, result)
 
             return Response("Unit added", HTTPStatus.OK)
@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from backend.api.building import api
 from backend.game_classes import Building, Farm, Mine, Planet, Settlement, User, Warper
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request
 from flask import session as flask_session
 from flask_restx import Resource, fields, marshal
@@ -73,7 +73,7 @@ class BuildingRes(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = building_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(flask_session.get("user_name", None), session=session)
             user.update(session=session)
             planet: Planet = user.planets[data["planet_number"]]
@@ -3,7 +3,7 @@ from http import HTTPStatus
 
 from backend.api.building import api
 from backend.game_classes import Building, Farm, Mine, Planet, Settlement, User
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource
@@ -32,7 +32,7 @@ class StartProduction(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = production_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             planet: Planet = user.planets[data["planet_number"]]
             settlement: Settlement = planet.settlements[data["settlement_number"]]
@@ -46,7 +46,7 @@ class StartProduction(Resource):
 
             building.start_gathering()
 
-            session.commit()
+            commit(session)
 
             return Response(json.dumps(building.gathering_time_left))
 
@@ -63,7 +63,7 @@ class StartProduction(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = production_parser.parse_args(request)
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(flask_session.get("user_name", None), session=BaseSession)
             planet: Planet = user.planets[data["planet_number"]]
             settlement: Settlement = planet.settlements[data["settlement_number"]]
@@ -76,6 +76,6 @@ class StartProduction(Resource):
 
             success: bool = building.collect_resources(session=BaseSession)
 
-            BaseSession.commit()
+            commit(BaseSession)
 
             return Response(str(success))
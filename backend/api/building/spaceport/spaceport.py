@@ -4,7 +4,7 @@ from backend.api.building import api
 from backend.api.building.building import building_parser
 from backend.api.planet.all import planet_name_model
 from backend.game_classes import Planet, Settlement, User, Spaceport, Barrack, SpaceMarine, SpaceDrone, SpaceCommando
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request, session, Response
 from flask_restx import Resource, fields, marshal
 
@@ -66,7 +66,7 @@ class BarrackRes(Resource):
         if user_name is None:
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
         data = building_parser.parse_args(request)
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(session.get("user_name", None), session=BaseSession)
             user.update()
             planet: Planet = user.planets[data["planet_number"]]
@@ -92,7 +92,7 @@ class BarrackRes(Resource):
         if user_name is None:
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
         data = request.get_json()["params"]
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(session.get("user_name", None), session=BaseSession)
             user.update()
             planet: Planet = user.planets[data["planet_number"]]
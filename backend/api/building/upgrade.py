@@ -1,7 +1,7 @@
 from backend.api.building import api
 from backend.game_classes import Planet, Settlement, User
 from backend.game_classes.Buildings.Building import Building
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource
@@ -23,7 +23,7 @@ class Upgrade(Resource):
         Upgrades a building.
         """
         data = building_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(flask_session.get("user_name", None), session=session)
             planet: Planet = user.planets[data["planet_number"]]
             settlement: Settlement = planet.settlements[data["settlement_number"]]
@@ -34,6 +34,6 @@ class Upgrade(Resource):
 
             building.upgrade()
 
-            session.commit()
+            commit(session)
 
             return Response(str(building.level))
@@ -2,7 +2,7 @@ from http import HTTPStatus
 from backend.api.building import api
 from backend.api.building.building import building_parser
 from backend.game_classes import Planet, User, Settlement, Warper, Building
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request, session as flask_session, Response
 from flask_restx import Resource
 
@@ -25,7 +25,7 @@ class WarperLinkRes(Resource):
 
         data = request.get_json()["params"]
 
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             user.update()
 
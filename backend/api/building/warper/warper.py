@@ -3,7 +3,7 @@ from backend.api.building import api
 from backend.api.building.building import building_model, building_parser
 from backend.api.planet.planet import planet_model
 from backend.game_classes import Planet, User, Settlement, Warper, Building
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request, session as flask_session
 from flask_restx import Resource, fields, marshal
 
@@ -65,7 +65,7 @@ class WarperRes(Resource):
 
         data = building_parser.parse_args(request)
 
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             user.update()
 
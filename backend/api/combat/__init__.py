@@ -20,3 +20,4 @@ api: Namespace = Namespace(
 import backend.api.combat.load_enemy
 import backend.api.combat.load_attack_data
 import backend.api.combat.play_round
+import backend.api.combat.auto_resolve
@@ -0,0 +1,58 @@
+import json
+from http import HTTPStatus
+
+from backend.api.combat import api
+from backend.game_classes import Planet, User, Attack
+from backend.game_classes.Combat.Attack import Round
+from backend.game_classes.Planet import planet_loader_options
+from database.database_access import commit, unit_of_work
+from flask import Response, request, session as flask_session
+from flask_restx import Resource
+
+
+@api.route("/auto_resolve", methods=["POST"])
+class AutoResolve(Resource):
+    @api.response(HTTPStatus.UNAUTHORIZED, "User not logged in")
+    @api.response(HTTPStatus.OK, "Success")
+    def post(self):
+        """
+        Plays the whole battle of an attack and ends it
+
+        planet_name: attacking planet name
+
+        Returns the combat result and a row per round, with the values in the order of round_fields
+        """
+        # Get the data items
+        data = request.get_json()["params"]
+        planet_from_name = data["planet_name"]
+        user_name = flask_session.get("user_name", None)
+
+        with unit_of_work() as BaseSession:
+            # Update the user
+            curr_user = User.load_by_name(user_name, session=BaseSession)
+            curr_user.update()
+
+            # Load the planet and attack
+            planet_from: Planet = (
+                BaseSession.query(Planet)
+                .filter(Planet.planet_name == planet_from_name, Planet.user_id == curr_user.user_id)
+                .options(*planet_loader_options("combat roster"))
+                .first()
+            )
+            attack: Attack = planet_from.current_offence_attack
+            assert attack is not None
+
+            # The units of the defender are loaded with the planet too, instead of per barrack during the battle
+            BaseSession.query(Planet).filter(Planet.planet_id == attack.defending_planet_id).options(
+                *planet_loader_options("combat roster")
+            ).first()
+
+            battle: dict = attack.auto_resolve(session=BaseSession)
+            result: dict = {
+                "combat_result": battle["combat_result"],
+                "round_fields": Round._fields,
+                "rounds": battle["rounds"],
+            }
+
+            commit(BaseSession)
+            return Response(json.dumps(result), mimetype="application/json")
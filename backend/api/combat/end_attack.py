@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend.api.combat import api
 from backend.game_classes import Planet, User, Attack, AttackUnit
 from backend.api.planet.planet import planet_model
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import Response, request, session as flask_session
 from flask_restx import Resource, marshal, fields
 
@@ -25,7 +25,7 @@ class EndAttack(Resource):
         user_name = flask_session.get("user_name", None)
         opponent_won = data["opponent_won"]
 
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             # Update the user
             curr_user = User.load_by_name(user_name, session=BaseSession)
             curr_user.update()
@@ -2,8 +2,9 @@ from http import HTTPStatus
 
 from backend.api.combat import api
 from backend.game_classes import Planet, User, Attack, AttackUnit
+from backend.game_classes.Planet import planet_loader_options
 from backend.api.planet.planet import planet_model
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request, session as flask_session
 from flask_restx import Resource, marshal, fields
 
@@ -51,16 +52,16 @@ class LoadAttackData(Resource):
         create_attack: bool = data["create_attack"]
 
         # Make the attack
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             curr_user: User = User.load_by_name(user_name, session=BaseSession)
             planet_from: Planet = BaseSession.query(Planet).filter(
                 Planet.planet_name == planet_from_name,
                 Planet.user_id == curr_user.user_id,
-            ).first()
+            ).options(*planet_loader_options("combat roster")).first()
             planet_to: Planet = BaseSession.query(Planet).filter(
                 Planet.planet_x == planet_xy_to[0],
                 Planet.planet_y == planet_xy_to[1],
-            ).first()
+            ).options(*planet_loader_options("combat roster")).first()
 
             # Get the current attack
             if (
@@ -70,10 +71,10 @@ class LoadAttackData(Resource):
             ):
                 attack: Attack = planet_from.attack(planet_to.planet_id)
                 BaseSession.add(attack)
-                BaseSession.commit()
+                commit(BaseSession)
 
             attack: Attack = planet_from.current_offence_attack
             assert attack is not None, "Other planet is already defending against someone"
 
-            BaseSession.commit()
+            commit(BaseSession)
             return marshal(attack, attack_model)
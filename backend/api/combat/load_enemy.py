@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend.api.combat import api
 from backend.game_classes import Planet, User
 from backend.api.planet.planet import planet_model
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request, session as flask_session
 from flask_restx import Resource, marshal
 
@@ -22,7 +22,7 @@ class LoadEnemy(Resource):
         planet_from_name = data["planet_name"]
 
         # Make the attack
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             curr_user: User = User.load_by_name(user_name, session=BaseSession)
             curr_user.update()
             planet_from: Planet = BaseSession.query(Planet).filter(
@@ -42,7 +42,7 @@ class LoadEnemy(Resource):
             # If there is a left behind attack, remove it
             if planet_from.current_offence_attack is not None:
                 BaseSession.delete(planet_from.current_offence_attack)
-                BaseSession.commit()
+                commit(BaseSession)
 
-            BaseSession.commit()
+            commit(BaseSession)
             return marshal(planet_to, planet_model)
@@ -3,7 +3,8 @@ from http import HTTPStatus
 
 from backend.api.combat import api
 from backend.game_classes import Planet, User, SpaceDrone, SpaceMarine, SpaceCommando, Attack, AttackUnit
-from database.database_access import DefaultSession
+from backend.game_classes.Planet import planet_loader_options
+from database.database_access import commit, unit_of_work
 from flask import Response, request, session as flask_session
 from flask_restx import Resource
 
@@ -39,13 +40,18 @@ class LoadEnemy(Resource):
         result: dict = {}
 
         # Make the attack
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             # Update the user
             curr_user = User.load_by_name(user_name, session=BaseSession)
             curr_user.update()
 
             # Load the planet and attack
-            planet_from: Planet = BaseSession.query(Planet).filter(Planet.planet_name == planet_from_name).first()
+            planet_from: Planet = (
+                BaseSession.query(Planet)
+                .filter(Planet.planet_name == planet_from_name)
+                .options(*planet_loader_options("combat roster"))
+                .first()
+            )
             attack: Attack = planet_from.current_offence_attack
             assert attack is not None
 
@@ -80,5 +86,5 @@ class LoadEnemy(Resource):
             result["passive_b"] = round_result["passive_defense"]
             result["combat_result"] = round_result["combat_result"]
 
-            BaseSession.commit()
+            commit(BaseSession)
             return Response(json.dumps(result), mimetype="application/json")
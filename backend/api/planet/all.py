@@ -3,7 +3,7 @@ from http import HTTPStatus
 from backend.api.planet import api
 from backend.api.planet.planet import planet_coordinate_model
 from backend.game_classes import Planet, User
-from database.database_access import DefaultSession
+from database.database_access import read_only_session
 from flask import request, session as flask_session
 from flask_restx import Resource, inputs, marshal, fields
 
@@ -27,7 +27,7 @@ class AllPlanets(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = all_planets_parser.parse_args(request)
-        with DefaultSession() as session:
+        with read_only_session() as session:
             user = User.load_by_name(user_name, session=session)
             if data["own_only"]:
                 planets = user.planets
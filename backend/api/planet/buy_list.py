@@ -3,7 +3,7 @@ from http import HTTPStatus
 
 from backend.api.planet import api
 from backend.game_classes import Planet
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import Response
 from flask_restx import Resource, fields
 
@@ -41,7 +41,7 @@ class BuyList(Resource):
         """
         Gets the coordinates of the planets.
         """
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             planets = Planet.get_all_planets_coordinates(session=BaseSession)
             planet_coords: list[tuple[int, int]] = [(planet[0], planet[1]) for planet in planets]
             new_coords = []
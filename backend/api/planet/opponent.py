@@ -4,7 +4,7 @@ from flask_restx import Resource, fields, marshal
 from backend.api.planet.planet import planet_resource_model, forward
 from backend.api.planet import api
 from backend.game_classes import Planet
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 
 planet_opponent_model = api.model(
     "PlanetOpponentInfo",
@@ -57,8 +57,8 @@ class Opponent(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = planet_opponent_parser.parse_args(request)
-        with DefaultSession() as session:
-            planet = Planet.get_by_pos(data["pos_x"], data["pos_y"], session=session)
+        with unit_of_work() as session:
+            planet = Planet.get_by_pos(data["pos_x"], data["pos_y"], profile="combat roster", session=session)
             planet.user.update()
             if planet is None:
                 api.abort(HTTPStatus.BAD_REQUEST, "Planet does not exist")
@@ -2,8 +2,8 @@ from http import HTTPStatus
 
 from backend.api.planet import api
 from backend.api.settlement.settlement import settlement_model
-from backend.game_classes import Planet, Settlement, TownHall, User, Settlement
-from database.database_access import DefaultSession
+from backend.game_classes import Planet, Resources, Settlement, TownHall, User, Settlement
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields, inputs, marshal
@@ -89,15 +89,13 @@ class PlanetRes(Resource):
         Add a planet to the database.
         """
         data = post_planet_parser.parse_args(request)
-        with DefaultSession(autoflush=False) as session:
+        with unit_of_work(autoflush=False) as session:
             user_name = flask_session.get("user_name", None)
             user = User.load_by_name(user_name, session=session)
 
             # Remove 10k from the first planet that can afford it
             for planet in user.planets:
-                if planet.building_materials >= 10000:
-                    planet.building_materials -= 10000
-                    session.commit()
+                if planet.spend(Resources(building_materials=10000), session=session):
                     break
 
             planet: Planet = Planet(
@@ -108,7 +106,7 @@ class PlanetRes(Resource):
             )
 
             user.add_planet(planet, session=session)
-            session.commit()
+            commit(session)
 
             settlement: Settlement = Settlement(0, planet.planet_id)
             planet.add_settlement(settlement, session=session)
@@ -117,7 +115,7 @@ class PlanetRes(Resource):
 
             settlement.build(building, session=session)
 
-            session.commit()
+            commit(session)
 
         return Response("Planet added")
 
@@ -138,8 +136,8 @@ class PlanetRes(Resource):
         if planet_number is None:
             planet_number = 0
 
-        with DefaultSession() as session:
-            user = User.load_by_name(flask_session.get("user_name", None), session=session)
+        with unit_of_work() as session:
+            user = User.load_by_name(flask_session.get("user_name", None), profile="combat roster", session=session)
             if planet_number is not None:
                 try:
                     planet: Planet = user.planets[planet_number]
@@ -1,6 +1,8 @@
+from http import HTTPStatus
+
 from backend.api.planet import api
-from backend.game_classes import Planet, Settlement, User
-from database.database_access import DefaultSession
+from backend.game_classes import Planet, Resources, Settlement, User
+from database.database_access import unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource
@@ -15,15 +17,15 @@ class Settlements(Resource):
         user_name = flask_session.get("user_name", None)
 
         data = request.get_json()
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
 
             selected_planet = data["planet_number"]
             planet: Planet = user.planets[selected_planet]
 
             # Remove the resources
-            planet.building_materials -= 5000
-            session.commit()
+            if not planet.spend(Resources(building_materials=5000), session=session):
+                api.abort(HTTPStatus.BAD_REQUEST, "Planet does not have enough building materials")
 
             settlement: Settlement = Settlement(planet.settlements[-1].settlement_nr + 1, planet.planet_id)
 
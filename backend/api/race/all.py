@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from backend.api.race import api
 from backend.game_classes import Race
-from database.database_access import DefaultSession
+from database.database_access import read_only_session
 from flask_restx import Resource, fields, marshal
 
 race_model = api.model(
@@ -23,6 +23,6 @@ class All(Resource):
         """
         Show all races.
         """
-        with DefaultSession() as session:
+        with read_only_session() as session:
             races: list[Race] = session.query(Race).all()
             return marshal(races, race_model)
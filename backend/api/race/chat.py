@@ -7,7 +7,7 @@ from flask_restx import Resource, fields, marshal
 from backend.api.race import api
 from backend.game_classes import User
 from backend.game_classes.Message import MAX_MESSAGE_LENGTH, Message
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 
 message_model = api.model(
     "ChatMessage",
@@ -87,7 +87,7 @@ class Chat(Resource):
             return api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = get_chat_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user: User | None = User.load_by_name(user_name, session=session)
             if user.race is None:
                 return api.abort(HTTPStatus.NOT_FOUND, "User not in race")
@@ -116,7 +116,7 @@ class Chat(Resource):
             return api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = post_chat_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             if user.race is None:
                 return api.abort(HTTPStatus.NOT_FOUND, "User not in race")
@@ -132,7 +132,7 @@ class Chat(Resource):
             )
 
             session.add(message)
-            session.commit()
+            commit(session)
             return marshal(message, message_model), HTTPStatus.CREATED
 
     @api.expect(delete_chat_parser)
@@ -146,7 +146,7 @@ class Chat(Resource):
             return api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = delete_chat_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             if user.race is None:
                 return api.abort(HTTPStatus.NOT_FOUND, "User not in race")
@@ -159,5 +159,5 @@ class Chat(Resource):
                 return api.abort(HTTPStatus.BAD_REQUEST, "User did not send the message")
 
             session.delete(message)
-            session.commit()
+            commit(session)
             return Response("Message deleted", HTTPStatus.OK)
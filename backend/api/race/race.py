@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from backend.api.race import api
 from backend.game_classes import Race, User
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields, inputs, marshal
@@ -67,7 +67,7 @@ class Members(Resource):
         if user_name is None:
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             race: Race | None = user.race
             if race is None:
@@ -92,7 +92,7 @@ class Members(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = post_race_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             if user.race is not None:
                 api.abort(HTTPStatus.CONFLICT, "User already in race")
@@ -105,13 +105,13 @@ class Members(Resource):
                 race = Race(race_name=data["race_name"], leader_id=user.user_id)
                 session.add(race)
                 race.members.append(user)
-                session.commit()
+                commit(session)
                 resp = "Created race"
             else:  # joining a race
                 if data["no_join"]:
                     api.abort(HTTPStatus.CONFLICT, "Race with same name already exists")
                 race.members.append(user)
-                session.commit()
+                commit(session)
                 resp = "Joined race"
 
             return Response(resp, HTTPStatus.OK)
@@ -133,7 +133,7 @@ class Members(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "User not logged in")
 
         data = delete_race_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
             if user.race is None:
                 api.abort(HTTPStatus.NOT_FOUND, "User not in race")
@@ -150,5 +150,5 @@ class Members(Resource):
                 user.race = None
                 resp = "Left race"
 
-            session.commit()
+            commit(session)
             return Response(resp, HTTPStatus.OK)
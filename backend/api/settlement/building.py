@@ -1,7 +1,7 @@
 from backend.api.settlement import api
 from backend.game_classes import Barrack, Farm, Mine, Planet, Settlement, User, Warper, Spaceport, Spaceship
 from backend.game_classes.Buildings.Building import Building
-from database.database_access import DefaultSession
+from database.database_access import commit, unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource
@@ -25,7 +25,7 @@ class AddBuilding(Resource):
         """
         data = add_building_parser.parse_args(request)
 
-        with DefaultSession(autoflush=False) as session:
+        with unit_of_work(autoflush=False) as session:
             user = User.load_by_name(flask_session.get("user_name", None), session=session)
             planet: Planet = user.planets[data["planet_number"]]
             settlement: Settlement = planet.settlements[data["settlement_number"]]
@@ -44,13 +44,13 @@ class AddBuilding(Resource):
             elif data["building"] == 5:
                 building = Spaceport(settlement.settlement_id, data["pos_x"], data["pos_y"])
                 settlement.build(building, session=session)
-                session.commit()
+                commit(session)
                 spaceship = Spaceship(building.settlement.planet.user.user_id)
                 session.add(spaceship)
-                session.commit()
+                commit(session)
                 building.space_ship_id = spaceship.ship_id
                 building.spaceship = spaceship
-                session.commit()
+                commit(session)
                 pass
             elif data["building"] == 6:
                 building = Warper(settlement.settlement_id, data["pos_x"], data["pos_y"])
@@ -58,7 +58,7 @@ class AddBuilding(Resource):
             else:
                 raise NotImplementedError("type: ", data["building"])
 
-            session.commit()
+            commit(session)
 
         return Response("Building added")
 
@@ -69,7 +69,7 @@ class AddBuilding(Resource):
         """
         data = building_parser.parse_args(request)
 
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(flask_session.get("user_name", None), session=BaseSession)
             planet: Planet = user.planets[data["planet_number"]]
             settlement: Settlement = planet.settlements[data["settlement_number"]]
@@ -80,6 +80,6 @@ class AddBuilding(Resource):
 
             settlement.remove_building(building, session=BaseSession)
 
-            BaseSession.commit()
+            commit(BaseSession)
 
         return Response("Building removed")
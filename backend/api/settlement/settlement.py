@@ -4,7 +4,7 @@ import json
 from backend.api.building.building import building_model
 from backend.api.settlement import api
 from backend.game_classes import Planet, Settlement, User
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields, inputs
@@ -57,8 +57,8 @@ class SettlementRes(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = get_settlement_parser.parse_args(request)
-        with DefaultSession() as session:
-            user = User.load_by_name(user_name, session=session)
+        with unit_of_work() as session:
+            user = User.load_by_name(user_name, profile="settlement grid", session=session)
 
             try:
                 planet: Planet = user.planets[data["planet_number"]]
@@ -87,7 +87,7 @@ class SettlementRes(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = get_settlement_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
 
             selected_planet = data["planet_number"]
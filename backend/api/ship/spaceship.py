@@ -4,7 +4,7 @@ import json
 from backend.api.building.building import building_model
 from backend.api.ship import api
 from backend.game_classes import Planet, Settlement, User, Spaceship, Spaceport
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import request, Response
 from flask import session as flask_session
 from flask_restx import Resource, fields, marshal
@@ -86,7 +86,7 @@ class GetShipsRes(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = get_ships_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             user = User.load_by_name(user_name, session=session)
 
             try:
@@ -144,7 +144,7 @@ class GetShipRes(Resource):
             api.abort(HTTPStatus.UNAUTHORIZED, "Not logged in")
 
         data = building_model.parse_args(request)
-        with DefaultSession() as BaseSession:
+        with unit_of_work() as BaseSession:
             user = User.load_by_name(flask_session.get("user_name", None), session=BaseSession)
             user.update()
             planet: Planet = user.planets[data["planet_number"]]
@@ -2,7 +2,7 @@ from http import HTTPStatus
 
 from backend.api.user import api
 from backend.game_classes import User
-from database.database_access import DefaultSession
+from database.database_access import unit_of_work
 from flask import Response, request
 from flask import session as flask_session
 from flask_restx import Resource, fields
@@ -36,7 +36,7 @@ class UserRes(Resource):
             return Response("Not logged in", HTTPStatus.BAD_REQUEST)
 
         data = get_user_parser.parse_args(request)
-        with DefaultSession() as session:
+        with unit_of_work() as session:
             if data["user_id"] is not None:
                 user: User = User.load_by_id(data["user_id"], session=session)
             else:
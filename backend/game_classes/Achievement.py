@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy import Column, ForeignKey, Table, delete
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
@@ -9,7 +9,8 @@ import tomllib
 
 from sqlalchemy.exc import IntegrityError
 
-from database.database_access import Base, auto_session, default_factory
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.User import User
@@ -45,7 +46,7 @@ class Achievement(Base):
     users: Mapped[list["User"]] = relationship(secondary="has_achievement", back_populates="achievements")
     "All the users that have the achievement"
 
-    @default_factory(achievement_id=uuid1)
+    @default_factory(achievement_id=new_id)
     def __init__(self, achievement_name: str, achievement_description: str, reward: int, requirement: str, achievement_id: UUID = None):
         """
         Initialize an Achievement object with a name and description.
@@ -62,7 +63,8 @@ class Achievement(Base):
     @auto_session
     def store(self, session: Session = None) -> None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print(
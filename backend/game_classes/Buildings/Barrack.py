@@ -1,12 +1,18 @@
-from uuid import UUID, uuid1
+from datetime import datetime, timedelta
+from uuid import UUID
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy.orm.attributes import flag_modified
 
+from backend.game_classes import clock
 from backend.game_classes.Buildings.Building import Building
-from backend.game_classes.properties import get_building_property, get_unit_property
+from backend.game_classes.properties import building_level, get_unit_property
+from backend.game_classes.resources import Resources
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
 from backend.game_classes.Units.AttackUnits import AttackUnit, SpaceCommando, SpaceDrone, SpaceMarine
 from database.database_access import auto_session, default_factory
+from database.ids import new_id
 
 
 class Barrack(Building):
@@ -31,15 +37,15 @@ class Barrack(Building):
     space_drone_level: Mapped[int]
     "Level of the space drones"
 
-    __mapper_args__ = {"polymorphic_identity": "barracks"}
+    __mapper_args__ = {"polymorphic_identity": "barracks", "polymorphic_load": "inline"}
 
     __property_name__ = "barrack"
 
     @property
     def max_capacity(self):
-        return get_building_property(self.__property_name__, "level", str(self.level), "max_capacity")
+        return building_level(self.__property_name__, self.level).max_capacity
 
-    @default_factory(building_id=uuid1)
+    @default_factory(building_id=new_id)
     def __init__(
         self,
         settlement_id: UUID,
@@ -81,58 +87,45 @@ class Barrack(Building):
         return [unit for unit in self.attack_units if not unit.in_training()]
 
     @auto_session
-    def update(self, seconds: float, session: Session = None) -> None:
+    def update(self, upkeep: bool = True, session: Session = None) -> None:
         """
         Updates the barrack, checks all the units whether they have enough food
+
+        :param upkeep: Whether to feed the units, when False :meth:`Planet.feed_units` feeds them
         """
         # First call the parent function:
-        super().update(seconds)
+        super().update()
 
         # Check all the units for food consumption
-        attack_units: list[AttackUnit] = self.attack_units
-
-        # We go per list over each unit
-        for unit in attack_units:
-            # We update the unit, and if it returns False (food shortage), we remove it
-            if unit.update(seconds) is False:
-                session.delete(unit)
-
-        # If there are no units in training, the function stops here
-        units_in_training: list[AttackUnit] = self.get_units_in_training()
-        if len(units_in_training) == 0:
+        if upkeep:
+            attack_units: list[AttackUnit] = self.attack_units
+
+            # We go per list over each unit
+            for unit in attack_units:
+                # We update the unit, and if it returns False (food shortage), we remove it
+                if unit.update() is False:
+                    unit.remove(session=session)
+
+        # The training is derived from the completion times, if no unit finished training the function stops here
+        queue: list[AttackUnit] = sorted(
+            (unit for unit in self.attack_units if unit.training_completes_at is not None),
+            key=lambda unit: unit.training_completes_at,
+        )
+        if all(unit.in_training() for unit in queue):
             return
 
-        # We take the currently trained unit
-        unit: AttackUnit = units_in_training[0]
-        trained_unit_list: list[AttackUnit] = units_in_training
-        assert unit.training_time_left > 0, "Unit is not actually in training"
-
-        # If the seconds since last updates are more than the remaining training time:
-        while unit.training_time_left <= seconds and len(trained_unit_list) > 0:
-            # Remove the remaining training time from the total time
-            seconds -= unit.training_time_left
-
-            # Now we remove the unit from training
-            unit.training_time_left = 0
-            unit.training_pos = None
-            assert not unit.in_training()
-
-            # After this, we adjust all the priorities of the units that are left in training:
-            trained_unit_list = trained_unit_list[1:]
-            for unit in trained_unit_list:
-                assert unit.in_training(), "Unit not in training"
-                unit.training_pos -= 1
-
-            # We set the next unit equal to the next unit in priority
-            if len(trained_unit_list) > 0:
-                unit = trained_unit_list[0]
-
-        # If the training time left is larger than the number of seconds left
-        if unit.training_time_left > seconds:
-            unit.training_time_left -= seconds
+        # The units that are trained leave the queue, and the units that are left move up
+        position: int = 0
+        for unit in queue:
+            if unit.in_training():
+                position += 1
+                unit.training_pos = position
+            else:
+                unit.training_pos = None
+                unit.training_completes_at = None
 
     @auto_session
-    def train_unit(self, unit: AttackUnit) -> str | None:
+    def train_unit(self, unit: AttackUnit, session: Session = None) -> str | None:
         """
         This function trains a unit if it is possible, otherwise will return the error message.
         """
@@ -141,39 +134,46 @@ class Barrack(Building):
         if check_result:
             return check_result
 
-        # Now we start training the unit, we start by subtracting the food cost from the planet
-        self.settlement.planet.rations -= unit.training_cost
+        # Now we start training the unit, we start by subtracting the food cost from the planet. Another request may
+        # have spent the rations since the check
+        if not self.settlement.planet.spend(Resources(rations=unit.training_cost), session=session):
+            return "Planet does not have enough food"
+
+        # The queue was checked on the barrack as it was loaded, writing the barrack makes a request that trained a unit
+        # in it meanwhile conflict with this one
+        flag_modified(self, "level")
+
+        # The unit is trained once all the units before it in the queue are trained
+        units_in_training: list[AttackUnit] = self.get_units_in_training()
+        queue_end: datetime = clock.now() if len(units_in_training) == 0 else units_in_training[-1].training_completes_at
 
         # Now we add it to the training queue
         unit.building_id = self.building_id
 
-        # We set the training time to the training value of the unit:
-        unit.training_time_left = unit.training_time
+        # We set the time the training is done, the unit starts eating from then on
+        unit.training_completes_at = queue_end + timedelta(seconds=unit.training_time)
+        unit.fed_until = unit.training_completes_at
         assert unit.training_time_left > 0
 
         # We set the training position of the unit:
-        unit.training_pos = len(self.get_units_in_training()) + 1
+        unit.training_pos = len(units_in_training) + 1
+
+        # Schedule the end of the training for the background worker
+        TimerEvent.schedule(
+            self.settlement.planet.user_id,
+            TimerKind.TRAINING,
+            unit.unit_id,
+            clock.seconds_until(unit.training_completes_at),
+            session=session,
+        )
 
-    def get_units_in_training(self):
+    def get_units_in_training(self) -> list[AttackUnit]:
         """
         Returns the units that are in training in correct order of training priority
         """
-        # We make a list of None with the max size of the training queue (5)
-        ordered_list: list[AttackUnit | None] = [None, None, None, None, None]
-
-        # Now we put all items in the right spot (ordered by training priority, i.e., priority 1 -> position 0).
-        for unit in self.attack_units:
-            if unit.in_training():
-                ordered_list[unit.training_pos - 1] = unit
-
-        # We remove excessive Nones
-        while len(ordered_list) > 0 and ordered_list[-1] is None:
-            ordered_list = ordered_list[:-1]
-
-        # We check whether there are no empty spots in between the queue
-        assert None not in ordered_list
-
-        return ordered_list
+        # The units are trained one after the other, so the order of the queue is the order they are trained in
+        units_in_training: list[AttackUnit] = [unit for unit in self.attack_units if unit.in_training()]
+        return sorted(units_in_training, key=lambda unit: unit.training_completes_at)
 
     @auto_session
     def can_train_unit(self, unit: AttackUnit) -> str | None:
@@ -224,16 +224,14 @@ class Barrack(Building):
         This makes it so all units that are trained of this type now have the
         new level.
         """
-        building_materials: int = self.settlement.planet.building_materials
         if unit_type == SpaceCommando:
             upgrade_cost = get_unit_property(unit_type.__property_name__,
                                              "level",
                                              str(self.space_commando_level + 1),
                                              "upgrade_cost"
                                              )
-            if upgrade_cost > building_materials:
+            if not self.settlement.planet.spend(Resources(building_materials=upgrade_cost)):
                 return False
-            self.settlement.planet.building_materials -= upgrade_cost
             self.space_commando_level += 1
         elif unit_type == SpaceMarine:
             upgrade_cost = get_unit_property(
@@ -241,9 +239,8 @@ class Barrack(Building):
                 "level", str(self.space_marine_level + 1),
                 "upgrade_cost"
             )
-            if upgrade_cost > building_materials:
+            if not self.settlement.planet.spend(Resources(building_materials=upgrade_cost)):
                 return False
-            self.settlement.planet.building_materials -= upgrade_cost
             self.space_marine_level += 1
         elif unit_type == SpaceDrone:
             upgrade_cost = get_unit_property(
@@ -252,9 +249,8 @@ class Barrack(Building):
                 str(self.space_drone_level + 1),
                 "upgrade_cost"
             )
-            if upgrade_cost > building_materials:
+            if not self.settlement.planet.spend(Resources(building_materials=upgrade_cost)):
                 return False
-            self.settlement.planet.building_materials -= upgrade_cost
             self.space_drone_level += 1
         else:
             raise NotImplementedError(unit_type.__name__)
@@ -1,19 +1,25 @@
-from uuid import UUID, uuid1
+from datetime import datetime
+from uuid import UUID
 
 from typing import TYPE_CHECKING
 
-from backend.game_classes.properties import get_building_property
+from backend.game_classes import clock
+from backend.game_classes.properties import building_level, kind_stats
+from backend.game_classes.resources import Resources
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
 
 if TYPE_CHECKING:
     from backend.game_classes.Settlement import Settlement
     from backend.game_classes.Planet import Planet
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, text
 
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
-from database.database_access import Base, auto_session, default_factory
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 
 
 class Building(Base):
@@ -36,17 +42,31 @@ class Building(Base):
     level: Mapped[int]
     "Level of the building"
 
-    construction_time_left: Mapped[float]
-    "Time left until the building is constructed"
+    construction_completes_at: Mapped[datetime | None]
+    "Time at which the building is constructed, None when it isn't being built"
 
     # Type is automatically stored here for polymorphisms
     type: Mapped[str]
     "Type of the building. Needed for inheritance mapping"
 
-    __table_args__ = (UniqueConstraint("settlement_id", "grid_pos_x", "grid_pos_y"),)
+    # Spending doesn't lock the planet, so the building itself keeps two requests from upgrading or collecting it both
+    version: Mapped[int] = mapped_column(server_default="1")
+    "Version of the row, an update of a building that changed since it was loaded fails, see database/conflicts.py"
+
+    __table_args__ = (
+        UniqueConstraint("settlement_id", "grid_pos_x", "grid_pos_y"),
+        # Only the few buildings that are being built are indexed, so the update finds them without a full scan
+        Index(
+            "ix_buildings_in_construction",
+            "settlement_id",
+            postgresql_where=text("construction_completes_at IS NOT NULL"),
+            sqlite_where=text("construction_completes_at IS NOT NULL"),
+        ),
+    )
     __mapper_args__ = {
         "polymorphic_identity": "buildings",
         "polymorphic_on": "type",
+        "version_id_col": version,
     }
 
     __property_name__ = None
@@ -55,28 +75,37 @@ class Building(Base):
     @property
     def max_level(self) -> int:
         """Get the max level"""
-        return get_building_property(self.__property_name__, "max_level")
+        return kind_stats("building", self.__property_name__).max_level
 
     @property
     def build_cost(self) -> int | None:
         """Get the cost of the next level. Is None if max level is reached"""
         if self.level >= self.max_level:
             return None
-        return get_building_property(self.__property_name__, "level", str(self.level + 1), "build_cost")
+        return building_level(self.__property_name__, self.level + 1).build_cost
 
     @property
     def upgrade_time(self) -> int | None:
         """Get the upgrade time of the next level. Is None if max level is reached"""
         if self.level >= self.max_level:
             return None
-        return get_building_property(self.__property_name__, "level", str(self.level + 1), "upgrade_time")
+        return building_level(self.__property_name__, self.level + 1).upgrade_time
 
     @property
     def display_name(self) -> str:
         """Get the display name"""
-        return get_building_property(self.__property_name__, "display_name")
+        return kind_stats("building", self.__property_name__).display_name
 
-    @default_factory(building_id=uuid1)
+    @property
+    def construction_time_left(self) -> float:
+        """Seconds left until the building is constructed"""
+        return clock.seconds_until(self.construction_completes_at)
+
+    @construction_time_left.setter
+    def construction_time_left(self, seconds: float) -> None:
+        self.construction_completes_at = clock.after(seconds)
+
+    @default_factory(building_id=new_id)
     def __init__(
         self,
         settlement_id: UUID,
@@ -96,31 +125,35 @@ class Building(Base):
         self.grid_pos_y: int = grid_pos_y
         self.level: int = level
         self.building_id: UUID = building_id
-        self.construction_time_left: float = 0
+        self.construction_completes_at: datetime | None = None
 
     @auto_session
     def store(self, session: Session = None) -> None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print("Cannot Store Building. Building already exist. id :" + self.building_id.__str__() + " )")
 
+        except StaleDataError:
+            # Another transaction changed the row, the request is retried as a whole
+            raise
+
         except Exception as err:
             print(type(err))  # the exception type
 
-    def update(self, seconds: float) -> None:
+    def update(self) -> None:
         """
         Virtual function, so when the derived function doesn't get called, it's not a problem.
         """
-        # If the building is being built, update the built time left:
-        if self.construction_time_left > 0:
-            self.construction_time_left -= seconds
-            if self.construction_time_left < 0:
-                self.construction_time_left: float = 0
+        # The time left is derived from the completion time, we only clear it once the construction is done, so the
+        # building no longer counts as active
+        if self.construction_completes_at is not None and self.construction_time_left == 0:
+            self.construction_completes_at = None
 
     @auto_session(auto_commit=True)
-    def upgrade(self) -> bool:
+    def upgrade(self, session: Session = None) -> bool:
         """
         Virtual function to upgrade the building, returns boolean value of whether it is possible
         """
@@ -128,21 +161,17 @@ class Building(Base):
         if self.construction_time_left > 0 or self.level >= self.max_level:
             return False
 
-        # Get the amount of building materials on the planet
+        # Take the resources from the planet, if it doesn't have enough we return False
         settlement: "Settlement" = self.settlement
         planet: "Planet" = settlement.planet
-        building_materials: int = planet.building_materials
-
-        # If it is not enough, return False
-        if building_materials - self.build_cost < 0:
+        if not planet.spend(Resources(building_materials=self.build_cost), session=session):
             return False
 
-        # Else we just take the planet and extract the resources
-        planet.building_materials -= self.build_cost
-        planet.store()
-
         # Adjust the upgrade time
-        self.construction_time_left: float = float(self.upgrade_time)
+        self.construction_time_left = float(self.upgrade_time)
+        TimerEvent.schedule(
+            planet.user_id, TimerKind.CONSTRUCTION, self.building_id, self.construction_time_left, session=session
+        )
 
         # Increase the level of the building
         self.level += 1
@@ -1,9 +1,15 @@
-from sqlalchemy import ForeignKey
+from datetime import datetime
 
-from sqlalchemy.orm import Mapped, mapped_column
-from uuid import UUID, uuid1
-from backend.game_classes.properties import get_building_property
+from sqlalchemy import ForeignKey, Index, text
+
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from uuid import UUID
+from backend.game_classes import clock
+from backend.game_classes.properties import building_level
+from backend.game_classes.resources import Resources
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
 from database.database_access import default_factory, auto_session
+from database.ids import new_id
 from backend.game_classes.Buildings.Building import Building
 
 from typing import TYPE_CHECKING
@@ -18,27 +24,67 @@ class Farm(Building):
     building_id: Mapped[UUID] = mapped_column(ForeignKey("buildings.building_id", ondelete="CASCADE"), primary_key=True)
     "Id of the building"
 
-    stored_resources: Mapped[int]
-    "Amount of resources stored"
+    _stored_resources: Mapped[int] = mapped_column("stored_resources")
+    "Amount of resources stored when the gathering started"
 
-    gathering_time_left: Mapped[float]
-    "Time left until the resource is gathered"
+    gathering_completes_at: Mapped[datetime | None]
+    "Time at which the farm is full, None when it isn't gathering"
 
-    __mapper_args__ = {"polymorphic_identity": "farms"}
+    __table_args__ = (
+        Index(
+            "ix_farms_gathering",
+            "building_id",
+            postgresql_where=text("gathering_completes_at IS NOT NULL"),
+            sqlite_where=text("gathering_completes_at IS NOT NULL"),
+        ),
+    )
+    __mapper_args__ = {"polymorphic_identity": "farms", "polymorphic_load": "inline"}
 
     __property_name__ = "farm"
 
     @property
     def production_rate(self) -> int:
         """Amount of resources produced per hour"""
-        return get_building_property(self.__property_name__, "level", str(self.level), "production_rate")
+        return building_level(self.__property_name__, self.level).production_rate
 
     @property
     def capacity(self) -> int:
         """Maximum amount of resources that can be stored"""
-        return get_building_property(self.__property_name__, "level", str(self.level), "capacity")
+        return building_level(self.__property_name__, self.level).capacity
+
+    @property
+    def fill_up_time(self) -> float:
+        """Seconds it takes to fill up the farm"""
+        return self.capacity / self.production_rate * 3600
+
+    @property
+    def gathering_time_left(self) -> float:
+        """Seconds left until the farm is full"""
+        return clock.seconds_until(self.gathering_completes_at)
+
+    @gathering_time_left.setter
+    def gathering_time_left(self, seconds: float) -> None:
+        self.gathering_completes_at = clock.after(seconds)
+
+    @property
+    def stored_resources(self) -> int:
+        """Amount of resources stored, including what was gathered so far"""
+        if self.gathering_completes_at is None:
+            return self._stored_resources
+
+        time_left: float = self.gathering_time_left
+        if time_left == 0:
+            return self.capacity
+
+        # The resources are computed from the whole time since the gathering started, so no rounding adds up
+        gathered_seconds: float = self.fill_up_time - time_left
+        return self._stored_resources + int(gathered_seconds * self.production_rate / 3600)
+
+    @stored_resources.setter
+    def stored_resources(self, amount: int) -> None:
+        self._stored_resources = amount
 
-    @default_factory(building_id=uuid1)
+    @default_factory(building_id=new_id)
     def __init__(
         self,
         settlement_id: UUID,
@@ -58,8 +104,8 @@ class Farm(Building):
             level=level,
         )
 
-        self.gathering_time_left: float = 0
-        self.stored_resources: int = 0
+        self.gathering_completes_at: datetime | None = None
+        self._stored_resources: int = 0
 
     def upgrade(self) -> bool:
         """
@@ -69,20 +115,18 @@ class Farm(Building):
         return (not self.is_gathering()) and super().upgrade()
 
     @auto_session(auto_commit=True)
-    def update(self, seconds: float) -> None:
+    def update(self) -> None:
         """
-        Returns the amount of resources that have been collected since the last update
+        Stores the gathered resources once the farm is full
         """
         # First, we call the function from the superclass
-        super().update(seconds)
+        super().update()
 
-        # If it's gathering, remove the time from the gathering time and store the resources in the farm
-        if self.is_gathering():
-            self.gathering_time_left -= seconds
-            self.stored_resources += int(seconds * self.production_rate / 3600)
-            if self.gathering_time_left <= 0:
-                self.gathering_time_left: float = 0
-                self.stored_resources: int = self.capacity
+        # The resources are derived from the completion time, we only store them once the farm is full, so it no longer
+        # counts as active
+        if self.gathering_completes_at is not None and self.gathering_time_left == 0:
+            self._stored_resources: int = self.capacity
+            self.gathering_completes_at = None
 
     def is_gathering(self) -> bool:
         """
@@ -91,7 +135,7 @@ class Farm(Building):
         return self.gathering_time_left > 0
 
     @auto_session
-    def collect_resources(self) -> bool:
+    def collect_resources(self, session: Session = None) -> bool:
         """
         Function that collects the gained resources
         """
@@ -101,15 +145,15 @@ class Farm(Building):
 
         # Add the collected rations to the planet
         planet: "Planet" = self.settlement.planet
-        planet.rations += self.stored_resources
+        planet.receive(Resources(rations=self.stored_resources), session=session)
 
         # Reset the gathering values
-        self.stored_resources: int = 0
-        self.gathering_time_left: float = 0
+        self.stored_resources = 0
+        self.gathering_completes_at = None
         return True
 
     @auto_session
-    def start_gathering(self) -> bool:
+    def start_gathering(self, session: Session = None) -> bool:
         """
         This function starts gathering the resources
         """
@@ -117,8 +161,14 @@ class Farm(Building):
         if self.in_construction() or self.is_gathering():
             return False
 
+        # The resources of a previous gathering that is done are stored first
+        self.stored_resources = self.stored_resources
+
         # We calculate the number of seconds it takes to fill up the farm, and set the gathering time equal to this
-        fill_up_time: float = (
-            self.capacity / self.production_rate * 3600
+        fill_up_time: float = self.fill_up_time
+        self.gathering_time_left = fill_up_time
+
+        # Schedule the moment the farm is full for the background worker
+        TimerEvent.schedule(
+            self.settlement.planet.user_id, TimerKind.GATHERING, self.building_id, fill_up_time, session=session
         )
-        self.gathering_time_left: float = fill_up_time
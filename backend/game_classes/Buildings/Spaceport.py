@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
@@ -7,8 +7,9 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 from backend.game_classes.Buildings import Building, Barrack
 from backend.game_classes.Ships.Spaceship import Spaceship
 from backend.game_classes.Units import SpaceMarine, SpaceDrone, SpaceCommando
-from backend.game_classes.properties import properties
+from backend.game_classes.properties import building_level
 from database.database_access import auto_session, default_factory
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.Ships import LandedLocation, LandingLocation
@@ -32,19 +33,20 @@ class Spaceport(Building):
 
     __mapper_args__ = {
         "polymorphic_identity": "spaceport",
+        "polymorphic_load": "inline",
     }
 
     __property_name__ = "spaceport"
 
     @property
     def max_ships(self) -> int:
-        return properties["spaceport"]["level"][str(self.level)]["max_ships"]
+        return building_level(self.__property_name__, self.level).max_ships
 
     @property
     def production_time(self) -> int:
-        return properties["spaceport"]["level"][str(self.level)]["production_time"]
+        return building_level(self.__property_name__, self.level).production_time
 
-    @default_factory(building_id=uuid1)
+    @default_factory(building_id=new_id)
     def __init__(
         self,
         settlement_id: UUID,
@@ -64,10 +66,10 @@ class Spaceport(Building):
         return super().upgrade()
 
     @auto_session
-    def update(self, seconds: float) -> None:
+    def update(self) -> None:
         if self.space_ship is not None:
-            self.space_ship.update(seconds)
-        return super().update(seconds)
+            self.space_ship.update()
+        return super().update()
 
     def get_transportable_unit_counts(self):
         """
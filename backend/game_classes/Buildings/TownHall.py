@@ -1,25 +1,16 @@
-from sqlalchemy import ForeignKey
-
-from sqlalchemy.orm import Mapped, mapped_column
-from uuid import UUID, uuid1
+from uuid import UUID
 from backend.game_classes.Buildings import Building
 from database.database_access import default_factory
+from database.ids import new_id
 
 
 class TownHall(Building):
-    __tablename__ = "town_halls"
-
-    building_id: Mapped[UUID] = mapped_column(
-        ForeignKey("buildings.building_id", ondelete="CASCADE"),
-        primary_key=True,
-    )
-    "Id of the building"
-
+    # Single table inheritance, town halls have no columns of their own so they are stored in buildings
     __mapper_args__ = {"polymorphic_identity": "town_halls", }
 
     __property_name__ = "town_hall"
 
-    @default_factory(building_id=uuid1)
+    @default_factory(building_id=new_id)
     def __init__(
             self,
             settlement_id: UUID,
@@ -1,12 +1,14 @@
 from sqlalchemy import ForeignKey
 
-from uuid import UUID, uuid1
+from uuid import UUID
 
-from database.database_access import default_factory, auto_session
+from database.database_access import commit, default_factory, auto_session
+from database.ids import new_id
 from backend.game_classes.Buildings.Building import Building
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
-from backend.game_classes.properties import get_building_property
+from backend.game_classes.properties import building_level, kind_stats
+from backend.game_classes.resources import Resources
 
 from backend.game_classes.PlanetLink import PlanetLink
 
@@ -26,11 +28,11 @@ class Warper(Building):
 
     planet_link: Mapped["PlanetLink"] = relationship(back_populates="warper")
 
-    __mapper_args__ = {"polymorphic_identity": "warpers"}
+    __mapper_args__ = {"polymorphic_identity": "warpers", "polymorphic_load": "inline"}
 
     __property_name__ = "warper"
 
-    @default_factory(building_id=uuid1)
+    @default_factory(building_id=new_id)
     def __init__(
             self,
             settlement_id: UUID,
@@ -53,21 +55,21 @@ class Warper(Building):
     @property
     def max_level(self) -> int:
         """Get the max level"""
-        return get_building_property(self.__property_name__, "max_level")
+        return kind_stats("building", self.__property_name__).max_level
 
     @property
     def build_cost(self) -> int | None:
         """Get the cost of the next level. Is None if max level is reached"""
         if self.level >= self.max_level:
             return None
-        return get_building_property(self.__property_name__, "level", str(self.level + 1), "build_cost")
+        return building_level(self.__property_name__, self.level + 1).build_cost
 
     @property
     def upgrade_time(self) -> int | None:
         """Get the upgrade time of the next level. Is None if max level is reached"""
         if self.level >= self.max_level:
             return None
-        return get_building_property(self.__property_name__, "level", str(self.level + 1), "upgrade_time")
+        return building_level(self.__property_name__, self.level + 1).upgrade_time
 
     @property
     def has_link(self):
@@ -79,7 +81,7 @@ class Warper(Building):
         """
         Gets the speed-factor the warper instantiates
         """
-        return get_building_property(self.__property_name__, "level", str(self.level + 1), "travel_factor")
+        return building_level(self.__property_name__, self.level + 1).travel_factor
 
     @auto_session
     def create_link(self, planet1: "Planet", planet2: "Planet", session: Session) -> PlanetLink:
@@ -91,13 +93,14 @@ class Warper(Building):
             return self.planet_link
         elif self.has_link:
             raise ValueError("This Warper instance already has a link associated with it.")
+        # The link is paid for first, the materials may have been spent since the check
+        if not self.settlement.planet.spend(Resources(building_materials=2000), session=session):
+            raise ValueError("Building materials are too low")
         new_link = PlanetLink(planet_from_id=planet1.planet_id, planet_to_id=planet2.planet_id,
                               warper_id=self.building_id)
         session.add(new_link)
-        session.commit()
         self.planet_link: PlanetLink = new_link
-        self.settlement.planet.building_materials -= 2000
-        session.commit()
+        commit(session)
         return new_link
 
     @auto_session
@@ -113,7 +116,7 @@ class Warper(Building):
         """Delete the link associated with this Warper instance"""
         if self.planet_link:
             session.delete(self.planet_link)
-            session.commit()
+            commit(session)
 
     @auto_session
     def check_existing_link(self, planet1: "Planet", planet2: "Planet", session: Session) -> bool:
@@ -171,7 +174,7 @@ class Warper(Building):
         # If the coordinates are none, remove the link
         if planet_to_y is None or planet_to_x is None:
             session.delete(self.planet_link)
-            session.commit()
+            commit(session)
             return None
 
         # Get the other planet
@@ -181,6 +184,6 @@ class Warper(Building):
 
         # Make the planet link
         self.create_link(planet, planet_to, session=session)
-        session.commit()
+        commit(session)
 
         return self.planet_link
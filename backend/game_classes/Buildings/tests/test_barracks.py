@@ -1,5 +1,8 @@
+from uuid import UUID
+
 import pytest
 from backend.game_classes import (
+    clock,
     User,
     Planet,
     TownHall,
@@ -56,7 +59,8 @@ def test_training_a_space_marine():
         assert planet.building_materials == 900
 
         # We update 10 seconds (until construction is finished)
-        barrack.update(10)
+        clock.advance(10)
+        barrack.update()
         assert not barrack.in_construction()
 
         # We make a space marine
@@ -80,7 +84,8 @@ def test_training_a_space_marine():
         assert space_marine.training_pos == 1
 
         # We finish the training:
-        barrack.update(60)
+        clock.advance(60)
+        barrack.update()
         assert not space_marine.in_training()
         assert space_marine.training_pos is None
         assert space_marine.training_time_left == 0
@@ -132,14 +137,16 @@ def test_training_multiple_units():
         assert space_marine2.training_time_left == 60
 
         # We wait 60 seconds (time for the first unit to train)
-        barrack.update(60)
+        clock.advance(60)
+        barrack.update()
         session.commit()
         assert not space_marine1.in_training()
         assert space_marine2.in_training()
         assert planet.get_attack_power() == 10
 
         # We wait 60 seconds (time for the second unit to train)
-        barrack.update(60)
+        clock.advance(60)
+        barrack.update()
         session.commit()
         assert not space_marine1.in_training()
         assert not space_marine2.in_training()
@@ -181,7 +188,8 @@ def test_food_consumption():
         session.commit()
 
         # We wait 1 hour, so food starts getting consumed
-        barrack.update(3600)
+        clock.advance(3600)
+        barrack.update()
         assert planet.rations == 994
 
 
@@ -220,12 +228,121 @@ def test_starvation():
         session.commit()
 
         # We wait 10 hours, this should be enough food for the units to starve
-        barrack.update(3600 * 10)
+        clock.advance(3600 * 10)
+        barrack.update()
         session.commit()
         assert len(barrack.attack_units) == 0
         assert planet.rations == 0
 
 
+@pytest.mark.usefixtures("clear-db")
+def test_long_offline_catch_up():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        barrack = Barrack(settlement_id=settlement.settlement_id, grid_pos_x=2, grid_pos_y=3, level=1)
+        session.add(barrack)
+        session.commit()
+
+        planet.rations = 5000
+
+        # We make 1 trained unit and 1 unit in training
+        space_marine_1 = SpaceMarine(level=1, barrack_id=barrack.building_id)
+        session.add(space_marine_1)
+        session.commit()
+        space_marine_2 = SpaceMarine(level=1, barrack_id=barrack.building_id)
+        assert barrack.train_unit(space_marine_2) is None
+        session.commit()
+        assert planet.rations == 4990
+
+        # We are away for 3 weeks, the first unit eats 504 hours and the second one 503 hours, because it trained
+        # for the first minute
+        clock.advance(3 * 7 * 24 * 3600)
+        barrack.update()
+        session.commit()
+        assert not space_marine_2.in_training()
+        assert space_marine_1.seconds_since_last_feed == 0
+        assert space_marine_2.seconds_since_last_feed == 3540
+        assert planet.rations == 4990 - 504 * 3 - 503 * 3
+
+        # Another 3 weeks, the food runs out after the first unit is fed, so the second unit starves
+        clock.advance(3 * 7 * 24 * 3600)
+        barrack.update()
+        session.commit()
+        assert len(barrack.attack_units) == 1
+        assert planet.rations == 0
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_planet_upkeep():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        # Two settlements with a barrack each
+        settlement_1 = Settlement(1, planet.planet_id)
+        settlement_2 = Settlement(2, planet.planet_id)
+        session.add_all([settlement_1, settlement_2])
+        session.commit()
+
+        barrack_1 = Barrack(settlement_id=settlement_1.settlement_id, grid_pos_x=2, grid_pos_y=3, level=1)
+        barrack_2 = Barrack(settlement_id=settlement_2.settlement_id, grid_pos_x=2, grid_pos_y=3, level=1)
+        session.add_all([barrack_1, barrack_2])
+        session.commit()
+
+        # The units are fed in order of their id, no matter which barrack they are in
+        units = [
+            SpaceMarine(level=1, barrack_id=barrack_2.building_id, unit_id=UUID(int=1)),
+            SpaceCommando(level=1, barrack_id=barrack_1.building_id, unit_id=UUID(int=2)),
+            SpaceMarine(level=1, barrack_id=barrack_1.building_id, unit_id=UUID(int=3)),
+            SpaceMarine(level=1, barrack_id=barrack_2.building_id, unit_id=UUID(int=4)),
+        ]
+        session.add_all(units)
+        planet.rations = 3 * (3 + 9 + 3) + 1
+        session.commit()
+
+        # After 3 hours, the first three units are fed, the last one starves on the single ration that is left
+        clock.advance(3 * 3600 + 60)
+        planet.update()
+        session.commit()
+        assert planet.rations == 0
+        assert {unit.unit_id for unit in barrack_1.attack_units + barrack_2.attack_units} == {
+            UUID(int=1),
+            UUID(int=2),
+            UUID(int=3),
+        }
+        assert all(unit.seconds_since_last_feed == 60 for unit in units[:3])
+
+        # Less than an hour later nobody eats, so nobody starves
+        clock.advance(3000)
+        planet.update()
+        session.commit()
+        assert len(barrack_1.attack_units) + len(barrack_2.attack_units) == 3
+
+        # The next hour there is nothing left to eat
+        clock.advance(600)
+        planet.update()
+        session.commit()
+        assert len(barrack_1.attack_units) + len(barrack_2.attack_units) == 0
+
+
 @pytest.mark.usefixtures("clear-db")
 def test_training_a_space_commando():
     with DefaultSession(autoflush=True) as session:
@@ -272,7 +389,8 @@ def test_training_a_space_commando():
         assert planet.building_materials == 900
 
         # We update 10 seconds (until construction is finished)
-        barrack.update(10)
+        clock.advance(10)
+        barrack.update()
         assert not barrack.in_construction()
         assert barrack.level == 1
         session.commit()
@@ -294,7 +412,8 @@ def test_training_a_space_commando():
         # Now we upgrade the barrack
         barrack.upgrade()
         assert barrack.in_construction()
-        barrack.update(60)
+        clock.advance(60)
+        barrack.update()
         assert not barrack.in_construction()
         assert barrack.level == 2
         assert barrack.space_commando_level == 1
@@ -317,7 +436,8 @@ def test_training_a_space_commando():
         assert space_commando.training_pos == 1
 
         # We finish the training:
-        barrack.update(240)
+        clock.advance(240)
+        barrack.update()
         assert not space_commando.in_training()
         assert space_commando.training_pos is None
         assert space_commando.training_time_left == 0
@@ -386,7 +506,8 @@ def test_training_a_space_drone():
         session.commit()
 
         # Now we wait until training is done:
-        barrack.update(1800)
+        clock.advance(1800)
+        barrack.update()
         session.commit()
         assert not space_drone.in_training()
         assert space_drone.attack_power == 200
@@ -401,13 +522,15 @@ def test_training_a_space_drone():
         assert space_drone.training_pos is None
 
         # We check food consumption:
-        barrack.update(1800)
+        clock.advance(1800)
+        barrack.update()
         session.commit()
         assert space_drone.seconds_since_last_feed == 1800
         assert planet.rations == 1000
 
         # We check food consumption:
-        barrack.update(1800)
+        clock.advance(1800)
+        barrack.update()
         session.commit()
         assert space_drone.seconds_since_last_feed == 0
         assert planet.rations == 950
@@ -1,5 +1,6 @@
 import pytest
-from backend.game_classes import User, Planet, TownHall, Settlement, Farm, Mine
+from backend.game_classes import User, Planet, TownHall, Settlement, Farm, Mine, clock
+from backend.game_classes.Settlement import select_active_buildings
 from database.database_access import DefaultSession
 
 
@@ -48,7 +49,8 @@ def test_farm_resource_gathering():
         assert farm.production_rate == 200, "Change in default resource rate"
 
         # We wait 10 seconds until the building is over
-        farm.update(10)
+        clock.advance(10)
+        farm.update()
         session.commit()
         assert not farm.is_gathering()
         assert not farm.in_construction()
@@ -63,7 +65,8 @@ def test_farm_resource_gathering():
         assert farm.stored_resources == 0
 
         # We gather for an hour
-        farm.update(3600)
+        clock.advance(3600)
+        farm.update()
         session.commit()
         assert farm.is_gathering()
         assert farm.gathering_time_left > 0
@@ -71,7 +74,8 @@ def test_farm_resource_gathering():
         assert not farm.collect_resources()
 
         # We wait another 4 hours (until the farm is full)
-        farm.update(4 * 3600)
+        clock.advance(4 * 3600)
+        farm.update()
         session.commit()
         assert not farm.is_gathering()
         assert not farm.in_construction()
@@ -95,7 +99,8 @@ def test_farm_resource_gathering():
         assert planet.building_materials == 9550
 
         # We wait 60 seconds until it is built
-        farm.update(60)
+        clock.advance(60)
+        farm.update()
         session.commit()
         assert farm.level == 2
         assert not farm.in_construction()
@@ -150,7 +155,8 @@ def test_mine_resource_gathering():
         assert mine.production_rate == 200, "Change in default resource rate"
 
         # We wait 10 seconds until the building is over
-        mine.update(10)
+        clock.advance(10)
+        mine.update()
         session.commit()
         assert not mine.is_gathering()
         assert not mine.in_construction()
@@ -165,7 +171,8 @@ def test_mine_resource_gathering():
         assert mine.stored_resources == 0
 
         # We gather for an hour
-        mine.update(3600)
+        clock.advance(3600)
+        mine.update()
         session.commit()
         assert mine.is_gathering()
         assert mine.gathering_time_left > 0
@@ -173,7 +180,8 @@ def test_mine_resource_gathering():
         assert not mine.collect_resources()
 
         # We wait another 4 hours (until the farm is full)
-        mine.update(4 * 3600)
+        clock.advance(4 * 3600)
+        mine.update()
         session.commit()
         assert not mine.is_gathering()
         assert not mine.in_construction()
@@ -197,10 +205,51 @@ def test_mine_resource_gathering():
         assert planet.building_materials == 10550
 
         # We wait 60 seconds until it is built
-        mine.update(60)
+        clock.advance(60)
+        mine.update()
         session.commit()
         assert mine.level == 2
         assert not mine.in_construction()
         assert mine.construction_time_left == 0
         assert mine.production_rate == 400
         assert not mine.is_gathering()
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_update_skips_idle_buildings():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "Mercury")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        # An idle farm, a gathering mine and a town hall that is being built
+        farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1, level=1)
+        mine = Mine(settlement_id=settlement.settlement_id, grid_pos_x=2, grid_pos_y=2, level=1)
+        town_hall = TownHall(level=1, settlement_id=settlement.settlement_id, grid_pos_x=3, grid_pos_y=3)
+        session.add_all([farm, mine, town_hall])
+        session.commit()
+        mine.start_gathering()
+        town_hall.construction_time_left = 60
+        session.commit()
+
+        # Only the buildings with a running timer are selected
+        active = set(session.scalars(select_active_buildings()))
+        assert active == {mine, town_hall}
+
+        # Updating the planet advances those, the idle farm is left alone
+        clock.advance(3600)
+        planet.update()
+        session.commit()
+        assert mine.stored_resources == 200
+        assert not town_hall.in_construction()
+        assert farm.stored_resources == 0
+        assert set(session.scalars(select_active_buildings())) == {mine}
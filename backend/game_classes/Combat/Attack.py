@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 from uuid import UUID
 from enum import Enum
 from sqlalchemy import ForeignKey
@@ -8,7 +8,9 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
 from backend.game_classes.Units.AttackUnits import AttackUnit
 from backend.game_classes.Buildings.Barrack import Barrack
-from database.database_access import Base, auto_session
+from backend.game_classes.resources import Resources
+from database.conflicts import ConflictError
+from database.database_access import Base, auto_session, commit
 
 if TYPE_CHECKING:
     from backend.game_classes.Planet import Planet
@@ -20,6 +22,19 @@ class GameResult(Enum):
     DRAW = "Draw"
 
 
+class Round(NamedTuple):
+    """A duel of an attacking and a defending unit"""
+
+    attack_unit: str
+    defence_unit: str
+    attack_roll: int
+    defence_roll: int
+    attack_survive: bool
+    defence_survive: bool
+    passive_attack: bool
+    passive_defense: bool
+
+
 class Attack(Base):
     __tablename__ = "attacks"
 
@@ -136,12 +151,12 @@ class Attack(Base):
         # If auto selecting attack is True, automatically select an attack unit (first of the list)
         if auto_select_attack:
             self.select_unit_attacking(attack_units[0].unit_id)
-            session.commit()
+            commit(session)
 
         # If auto selecting defense is True, automatically select a defense unit (first of the list)
         if auto_select_defence:
             self.select_unit_defending(defence_units[0].unit_id)
-            session.commit()
+            commit(session)
 
         assert self._selected_attack_unit_id is not None, "No attack unit selected"
         assert self._selected_defence_unit_id is not None, "No defence unit selected"
@@ -160,27 +175,18 @@ class Attack(Base):
         assert attacking_unit is not None, "Attacking unit not in unit list of attacker"
         assert defending_unit is not None, "Defence unit not in unit list of defender"
 
-        # Get the dice roll result of both
-        attack_roll: int = attacking_unit.roll_dice()
-        defence_roll: int = defending_unit.roll_dice()
-
-        # Get the result of who wins / loses:
-        attack_survive, defence_survive, passive_attack, passive_defense = self.get_win(
-            attack_roll=attack_roll,
-            defence_roll=defence_roll,
-            attacking_unit=attacking_unit,
-            defending_unit=defending_unit
-        )
+        duel: Round = self.fight(attacking_unit, defending_unit)
+        attack_survive, defence_survive = duel.attack_survive, duel.defence_survive
 
         # If a unit dies, we remove it
         if not attack_survive:
             self._selected_attack_unit_id: None = None
-            session.delete(attacking_unit)
-            session.commit()
+            attacking_unit.remove(session=session)
+            commit(session)
         if not defence_survive:
             self._selected_defence_unit_id: None = None
-            session.delete(defending_unit)
-            session.commit()
+            defending_unit.remove(session=session)
+            commit(session)
 
         # Check if someone has won the game
         attack_units = self.get_attacking_units()
@@ -199,15 +205,82 @@ class Attack(Base):
                 self.win()
             combat_result = "Win"
         return {
-            "attack_roll": attack_roll,
-            "defence_roll": defence_roll,
+            "attack_roll": duel.attack_roll,
+            "defence_roll": duel.defence_roll,
             "attack_survive": attack_survive,
             "defence_survive": defence_survive,
-            "passive_attack": passive_attack,
-            "passive_defense": passive_defense,
+            "passive_attack": duel.passive_attack,
+            "passive_defense": duel.passive_defense,
             "combat_result": combat_result
         }
 
+    @auto_session
+    def auto_resolve(self, session: Session = None) -> dict:
+        """
+        Plays every round of the battle, with the strongest unit of both sides in every round, and ends the attack.
+
+        The rounds are played on the units in memory, the casualties, the loot or loss and the end of the attack are
+        written together when the session is flushed.
+
+        Returns the combat result and the rounds that were played
+        """
+        # Strongest first, as the rounds are played with the front of both lists. The list stays in this order: the
+        # loser of a round is removed and the attack power of a survivor only goes up
+        attack_units = self.get_attacking_units()
+        defence_units = self.get_defending_units()
+        attack_units.reverse()
+        defence_units.reverse()
+
+        rounds: list[Round] = []
+        casualties: list[AttackUnit] = []
+        while attack_units and defence_units:
+            duel: Round = self.fight(attack_units[-1], defence_units[-1])
+            rounds.append(duel)
+            if not duel.attack_survive:
+                casualties.append(attack_units.pop())
+            if not duel.defence_survive:
+                casualties.append(defence_units.pop())
+
+        for unit in casualties:
+            unit.remove(session=session)
+        self._selected_attack_unit_id = None
+        self._selected_defence_unit_id = None
+
+        # Like a round that ends the battle, a draw is a loss for the attacker
+        if attack_units:
+            self.win(session=session)
+            combat_result = GameResult.WIN
+        else:
+            self.lose(session=session)
+            combat_result = GameResult.LOSE
+        return {"combat_result": combat_result.value, "rounds": rounds}
+
+    def fight(self, attacking_unit: AttackUnit, defending_unit: AttackUnit) -> Round:
+        """
+        Rolls the dice for a duel of 2 units and calculates which of them survive
+        """
+        # Get the dice roll result of both
+        attack_roll: int = attacking_unit.roll_dice()
+        defence_roll: int = defending_unit.roll_dice()
+
+        # Get the result of who wins / loses:
+        attack_survive, defence_survive, passive_attack, passive_defense = self.get_win(
+            attack_roll=attack_roll,
+            defence_roll=defence_roll,
+            attacking_unit=attacking_unit,
+            defending_unit=defending_unit
+        )
+        return Round(
+            attacking_unit.type_string,
+            defending_unit.type_string,
+            attack_roll,
+            defence_roll,
+            attack_survive,
+            defence_survive,
+            passive_attack,
+            passive_defense,
+        )
+
     @auto_session
     def get_win(self, attack_roll: int, defence_roll: int, attacking_unit: AttackUnit, defending_unit: AttackUnit) -> (
             tuple[bool, bool, bool, bool]):
@@ -235,9 +308,15 @@ class Attack(Base):
         When losing, you lose 10% of your resources and the attack is deleted
         """
         # Delete 10% of the resources
-        self.attacking_planet.rations = int(self.attacking_planet.rations * 9 / 10)
-        self.attacking_planet.building_materials = int(self.attacking_planet.building_materials * 9 / 10)
-        session.commit()
+        planet: Planet = self.attacking_planet
+        loss = Resources(
+            planet.building_materials - int(planet.building_materials * 9 / 10),
+            planet.rations - int(planet.rations * 9 / 10),
+        )
+        # The loss is counted on the resources that were loaded, when the planet spent almost everything since then the
+        # request is run again on what is left
+        if not planet.spend(loss, session=session):
+            raise ConflictError("The attacking planet spent its resources during the attack")
 
         # Delete the attack
         session.delete(self)
@@ -248,16 +327,14 @@ class Attack(Base):
         When winning, 25% of the resources from the defending planet are moved to the attacking planet
         """
         # Get the resources
-        rations_gained: int = int(self.defending_planet.rations * 1 / 4)
-        building_mats_gained: int = int(self.defending_planet.building_materials * 1 / 4)
-
-        # Add them to the attacking planet
-        self.attacking_planet.rations += rations_gained
-        self.attacking_planet.building_materials += building_mats_gained
+        loot = Resources(
+            int(self.defending_planet.building_materials * 1 / 4), int(self.defending_planet.rations * 1 / 4)
+        )
 
-        # Remove them from the defending planet
-        self.defending_planet.rations -= rations_gained
-        self.defending_planet.building_materials -= building_mats_gained
+        # Move them from the defending planet to the attacking planet, like for a loss the request is run again when the
+        # defending planet spent most of them since they were counted
+        if not self.defending_planet.transfer(self.attacking_planet, loot, session=session):
+            raise ConflictError("The defending planet spent its resources during the attack")
 
         # Delete the attack
         session.delete(self)
@@ -4,6 +4,7 @@ from backend.game_classes.Combat.Attack import Attack, GameResult
 
 from backend.game_classes import User, Planet, Settlement, Barrack, SpaceMarine, SpaceCommando, SpaceDrone
 from database.database_access import DefaultSession
+from database.query_counter import count_queries
 import pytest
 
 
@@ -227,4 +228,45 @@ def test_lose(basic_setup_attacks):
     assert planet1.rations == 900
     assert planet1.building_materials == 900
     assert planet2.rations == 1000
-    assert planet2.building_materials == 1000
\ No newline at end of file
+    assert planet2.building_materials == 1000
+
+@pytest.mark.usefixtures("clear-db")
+def test_auto_resolve(basic_setup_attacks):
+    """
+    Tests playing a whole battle at once
+    """
+    (user1, user2, session, space_marine1, space_marine2, barrack1, barrack2, settlement1, settlement2, attack, planet1,
+     planet2) = basic_setup_attacks
+    session.add_all([SpaceCommando(barrack_id=barrack1.building_id), SpaceDrone(barrack_id=barrack2.building_id)])
+    session.add_all([SpaceMarine(barrack1.building_id, level=2) for _ in range(10)])
+    session.add_all([SpaceMarine(barrack2.building_id, level=2) for _ in range(10)])
+    planet1.rations = planet1.building_materials = 1000
+    planet2.rations = planet2.building_materials = 1000
+    session.commit()
+    attack.get_attacking_units()
+    attack.get_defending_units()
+
+    with count_queries() as stats:
+        battle = attack.auto_resolve()
+        session.commit()
+
+    # The units that are left are the survivors of the last round, the rest died in one of the rounds
+    attack_units = barrack1.attack_units
+    defence_units = barrack2.attack_units
+    rounds = battle["rounds"]
+    assert len(rounds) > 0
+    assert sum(not r.attack_survive for r in rounds) == 12 - len(attack_units)
+    assert sum(not r.defence_survive for r in rounds) == 12 - len(defence_units)
+
+    if battle["combat_result"] == GameResult.WIN.value:
+        assert len(attack_units) > 0 and len(defence_units) == 0
+        assert (planet1.rations, planet2.rations) == (1250, 750)
+    else:
+        assert battle["combat_result"] == GameResult.LOSE.value
+        assert len(attack_units) == 0
+        assert (planet1.rations, planet2.rations) == (900, 1000)
+    assert planet1.current_offence_attack is None
+
+    # The casualties are written together, not per round: the units, the resources of both planets and the attack
+    assert stats.statements <= 6
+    assert stats.repeated() == {}
@@ -2,11 +2,20 @@ import csv
 from uuid import UUID, uuid1
 
 from flask import Response, jsonify
+from sqlalchemy import Select, bindparam, select
 from sqlalchemy.orm import Query, Session
 
 from backend.game_classes.Race import Race
 from backend.game_classes.User import User
-from database.database_access import auto_session
+from database.database_access import auto_session, commit
+
+
+_CHECK_USER: Select = (
+    select(User.user_id)
+    .where(User.user_name == bindparam("user_name"), User.password == bindparam("password"))
+    .limit(2)
+)
+"Statement of :func:`check_user`, built once so every call reuses it and its cache key"
 
 
 def get_users_json() -> Response:
@@ -35,11 +44,10 @@ def check_user(user_name: str, user_password: str, session: Session = None) -> b
     # panic on calls manually specifying an invalid type as session
     assert isinstance(session, Session), "session must be of type 'Session'"
 
-    query: Query = session.query(User).filter_by(user_name=user_name, password=user_password)
-    assert query.count() <= 1, "Multiple versions of same user in database"
-    if query.count() > 0:
-        return True
-    return False
+    # A single query of at most two ids tells both whether the user exists and whether it is unique
+    user_ids: list[UUID] = list(session.scalars(_CHECK_USER, {"user_name": user_name, "password": user_password}))
+    assert len(user_ids) <= 1, "Multiple versions of same user in database"
+    return len(user_ids) == 1
 
 
 @auto_session
@@ -140,7 +148,7 @@ def add_user(user_name: str, user_password: str, user_id: UUID = uuid1(), sessio
         return "An error occurred while adding the user to the database"
 
     # Commit the changes if they were made
-    session.commit()
+    commit(session)
     return "Successfully added user"
 
 
@@ -1,10 +1,11 @@
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Select, UniqueConstraint, bindparam, select
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from database.database_access import Base, auto_session, default_factory
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.Race import Race
@@ -38,9 +39,13 @@ class Message(Base):
     race: Mapped["Race"] = relationship(back_populates="messages", foreign_keys=[race_id])
     "Race the message is posted in"
 
-    __table_args__ = (UniqueConstraint("user_id", "race_id", "position"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "race_id", "position"),
+        # The chat of a race is read in the order of the messages
+        Index("ix_messages_race_id_position", "race_id", "position"),
+    )
 
-    @default_factory(message_id=uuid1)
+    @default_factory(message_id=new_id)
     def __init__(self, message: str, user_id: UUID, race_id: UUID, position: int, message_id: UUID = None):
         assert len(message) <= MAX_MESSAGE_LENGTH, f"Message cannot be longer than {MAX_MESSAGE_LENGTH} characters"
 
@@ -58,8 +63,8 @@ class Message(Base):
 
         :race_id: Id of the race to get the last message from
         """
-        last_message = session.query(Message).filter_by(race_id=race_id).order_by(Message.position.desc()).first()
-        return last_message.position if last_message else 0
+        position: int | None = session.scalar(_LAST_POSITION, {"race_id": race_id})
+        return position if position is not None else 0
         
 
     @staticmethod
@@ -146,3 +151,9 @@ class Message(Base):
         :race_id: Id of the race to count the messages from
         """
         return session.query(Message).filter_by(race_id=race_id).count()
+
+
+_LAST_POSITION: Select = (
+    select(Message.position).where(Message.race_id == bindparam("race_id")).order_by(Message.position.desc()).limit(1)
+)
+"Statement of :meth:`Message.last_position`, built once so every call reuses it and its cache key"
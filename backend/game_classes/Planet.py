@@ -1,18 +1,39 @@
 from __future__ import annotations
 
+from array import array
+from datetime import timedelta
+from functools import cache
+from itertools import accumulate
 from typing import TYPE_CHECKING, Optional
-from uuid import UUID, uuid1
-
-from sqlalchemy import CheckConstraint, Column, ForeignKey, Table, UniqueConstraint
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
-
-from backend.game_classes.Settlement import Settlement
-from backend.game_classes.Buildings import Barrack
+from uuid import UUID
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Select,
+    Table,
+    UniqueConstraint,
+    Update,
+    bindparam,
+    select,
+    update,
+)
+from sqlalchemy.orm import Load, Mapped, Session, mapped_column, relationship, selectinload, with_polymorphic
+from sqlalchemy.orm.attributes import set_committed_value
+
+from backend.game_classes import clock
+from backend.game_classes.Settlement import Settlement, select_active_buildings
+from backend.game_classes.Buildings import Barrack, Building
+from backend.game_classes.Units.AttackUnits import AttackUnit
 from backend.game_classes.Combat.Attack import Attack
-from database.database_access import Base, auto_session, default_factory
+from backend.game_classes.resources import Resources
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 from backend.game_classes.Ships import Spaceship
 
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 import random
 import math
@@ -21,18 +42,111 @@ if TYPE_CHECKING:
     from backend.game_classes.User import User
 
 
+@cache
+def loader_profiles() -> dict[str, tuple[Load, ...]]:
+    """
+    Named eager-loading profiles for the tree of a planet, as options relative to the buildings of its settlements.
+    The tree is walked through lazy loads by default, which is a query per collection. With a profile every level is
+    loaded with a single query, no matter how many settlements, buildings and units there are.
+
+    The buildings are loaded with the columns of all their subclasses joined in and the unit types share the table of
+    the attack units, so the subclass columns don't need a query per object.
+    """
+    return {
+        # Everything Settlement.get_grid looks at
+        "settlement grid": (
+            selectinload(_any_building().Warper.planet_link),
+            selectinload(_any_building().Spaceport.space_ship),
+        ),
+        # The units in the barracks, for the attack power and the units of an attack
+        "combat roster": (selectinload(_any_building().Barrack.attack_units),),
+        # The whole tree, including the units on the ships in the spaceports
+        "empire": (
+            selectinload(_any_building().Warper.planet_link),
+            selectinload(_any_building().Spaceport.space_ship).selectinload(Spaceship.attack_units),
+            selectinload(_any_building().Barrack.attack_units),
+        ),
+    }
+
+
+@cache
+def _any_building():
+    # Made on first use, as the polymorphic entity needs all classes to be mapped
+    return with_polymorphic(Building, "*")
+
+
+def planet_loader_options(profile: str, planets: Load | None = None) -> list[Load]:
+    """
+    Get the options that load the tree of planets with a profile.
+
+    :param profile: Name of the profile in :func:`loader_profiles`
+    :param planets: Path to the planets when they are loaded through another object, like ``selectinload(User.planets)``
+    :return: The options for the query of the planets, or of the object the path starts from
+    """
+    profiles: dict[str, tuple[Load, ...]] = loader_profiles()
+    if profile not in profiles:
+        raise ValueError(f"Unknown loader profile: {profile}")
+
+    settlements: Load = (
+        selectinload(Planet.settlements) if planets is None else planets.selectinload(Planet.settlements)
+    )
+    buildings: Load = settlements.selectinload(Settlement.buildings.of_type(_any_building()))
+    return [buildings.options(*profiles[profile])]
+
+
+# The lookups are built once per profile with bound parameters, so every call reuses the statement and its cache key
+# instead of building a query and deriving the key again
+@cache
+def _select_by_pos(profile: str | None) -> Select:
+    statement: Select = (
+        select(Planet).where(Planet.planet_x == bindparam("planet_x"), Planet.planet_y == bindparam("planet_y")).limit(1)
+    )
+    return statement if profile is None else statement.options(*planet_loader_options(profile))
+
+
+@cache
+def _select_by_uuid(profile: str | None) -> Select:
+    statement: Select = select(Planet).where(Planet.planet_id == bindparam("planet_id")).limit(1)
+    return statement if profile is None else statement.options(*planet_loader_options(profile))
+
+
+@cache
+def _change_resources(conditional: bool) -> Update:
+    planets: Table = Planet.__table__
+    materials, rations = bindparam("materials_cost"), bindparam("rations_cost")
+    statement: Update = (
+        update(planets)
+        .where(planets.c.planet_id == bindparam("target_id"))
+        # The version is bumped like the mapper does, so a request that loaded the planet before can't overwrite it
+        .values(
+            building_materials=planets.c.building_materials - materials,
+            rations=planets.c.rations - rations,
+            version=planets.c.version + 1,
+        )
+        .returning(planets.c.building_materials, planets.c.rations, planets.c.version)
+    )
+    if conditional:
+        statement = statement.where(planets.c.building_materials >= materials, planets.c.rations >= rations)
+    return statement
+
+
 class Planet(Base):
     __tablename__ = "planets"
 
     planet_id: Mapped[UUID] = mapped_column(primary_key=True)
     planet_x: Mapped[int]
     planet_y: Mapped[int]
-    user_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("users.user_id"))
+    user_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("users.user_id"), index=True)
     planet_name: Mapped[str] = mapped_column(unique=True)
     building_materials: Mapped[int]
     rations: Mapped[int]
 
+    # Every change of the resources bumps the version, an update of a planet that changed since it was loaded fails
+    # instead of overwriting the other change, see database/conflicts.py
+    version: Mapped[int] = mapped_column(server_default="1")
+
     __table_args__ = (UniqueConstraint("planet_x", "planet_y"),)
+    __mapper_args__ = {"version_id_col": version}
 
     current_offence_attack: Mapped["Attack"] = relationship("Attack", foreign_keys=[Attack.attacking_planet_id],
                                                             back_populates="attacking_planet")
@@ -47,7 +161,7 @@ class Planet(Base):
     # The user that owns the planet:
     user: Mapped[Optional["User"]] = relationship(back_populates="planets")
 
-    @default_factory(planet_id=uuid1)
+    @default_factory(planet_id=new_id)
     def __init__(
             self,
             user_id: UUID | None,
@@ -76,12 +190,17 @@ class Planet(Base):
     @auto_session
     def store(self, session: Session = None) -> None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print("Cannot Store Planet. Planet already exist. id :" + self.planet_id.__str__() + " , ( planet name :  "
                   + self.planet_name + " )")
 
+        except StaleDataError:
+            # Another transaction changed the row, the request is retried as a whole
+            raise
+
         except Exception as err:
             print(type(err))  # the exception type
 
@@ -99,37 +218,152 @@ class Planet(Base):
     def add_rations(self, amount):
         self.rations += amount
 
-    def update(self, update_time: float) -> None:
+    @auto_session
+    def spend(self, cost: Resources, session: Session = None) -> bool:
+        """
+        Take the cost from the resources of the planet, with a single ``UPDATE`` that only matches when the planet has
+        enough of every resource. Requests spending at the same time can't take the planet below zero.
+
+        :return: Whether the planet had enough resources, nothing is taken when it didn't
+        """
+        return self._write_resources(cost, conditional=True, session=session)
+
+    @auto_session
+    def receive(self, amount: Resources, session: Session = None) -> None:
+        """Add the amount to the resources of the planet, with a single ``UPDATE``"""
+        self._write_resources(-amount, conditional=False, session=session)
+
+    @auto_session
+    def transfer(self, to_planet: Planet, amount: Resources, session: Session = None) -> bool:
+        """
+        Move resources to another planet, in the transaction of the session.
+
+        :return: Whether this planet had enough resources, nothing is moved when it didn't
+        """
+        if not self.spend(amount, session=session):
+            return False
+        to_planet.receive(amount, session=session)
+        return True
+
+    def _write_resources(self, cost: Resources, conditional: bool, session: Session) -> bool:
+        # Changes of the planet that weren't written yet go first, so the version in the session is the current one
+        if self in session.dirty:
+            session.flush()
+        row = session.execute(
+            _change_resources(conditional),
+            {"target_id": self.planet_id, "materials_cost": cost.building_materials, "rations_cost": cost.rations},
+        ).first()
+        if row is None:
+            return False
+
+        # The balance is set as loaded, so it isn't written again and reflects what other requests spent meanwhile
+        set_committed_value(self, "building_materials", row.building_materials)
+        set_committed_value(self, "rations", row.rations)
+        set_committed_value(self, "version", row.version)
+        return True
+
+    @auto_session
+    def update(self, session: Session = None) -> None:
         """
         Log in to the world, this will call all functions to restore all the resources that have been made.
+        Timers are derived from their completion times, so only what completed since the last update is written.
         """
-        for settlement in self.settlements:
-            settlement.update(update_time)
+        # The units eat every hour since they were last fed, the barracks leave the upkeep to the planet
+        self.feed_units()
+
+        # Only the buildings with a running timer can change, so the idle settlements and buildings are never loaded
+        active: list[Building] = list(
+            session.scalars(
+                select_active_buildings()
+                .join(Settlement, Settlement.settlement_id == Building.settlement_id)
+                .where(Settlement.planet_id == self.planet_id)
+            )
+        )
+        for building in active:
+            if isinstance(building, Barrack):
+                building.update(upkeep=False)
+            else:
+                building.update()
+
+    @auto_session
+    def feed_units(self, session: Session = None) -> int:
+        """
+        Feed all units in the barracks of the planet that have to eat, in one pass over the planet.
+
+        Units are fed in order of their id, when the rations run out the unit that can't be fed eats what is left and
+        every later unit that has to eat starves as well. Starved units are removed.
+
+        :return: The amount of units that starved
+        """
+        # We load the units that were last fed more than an hour ago with a single query, without their subclass
+        # columns as upkeep only needs the base ones. Units in training are fed until they are trained, so they are
+        # never loaded
+        session.flush()
+        units: list[AttackUnit] = list(
+            session.scalars(
+                select(AttackUnit)
+                .join(Building, Building.building_id == AttackUnit.building_id)
+                .join(Settlement, Settlement.settlement_id == Building.settlement_id)
+                .where(Settlement.planet_id == self.planet_id, AttackUnit.fed_until <= clock.now() - timedelta(hours=1))
+                .order_by(AttackUnit.unit_id)
+            )
+        )
+        if len(units) == 0:
+            return 0
+
+        # The rations per hour only depend on the type and level, so we look them up once per group
+        rates: dict[tuple[str, int], int] = {}
+        for unit in units:
+            if (unit.type, unit.level) not in rates:
+                rates[(unit.type, unit.level)] = unit.rations_per_hour
+
+        # The whole hours every unit has to be fed for, and what that costs
+        hours: array = array("q", (int(unit.seconds_since_last_feed // 3600) for unit in units))
+        costs: array = array(
+            "q", (unit_hours * rates[(unit.type, unit.level)] for unit_hours, unit in zip(hours, units))
+        )
+
+        # A unit is fed when the rations cover everything eaten up to and including it
+        starved: int = 0
+        for unit, unit_hours, cost, eaten in zip(units, hours, costs, accumulate(costs)):
+            if cost > 0 and eaten > self.rations:
+                unit.remove(session=session)
+                starved += 1
+            else:
+                unit.fed_until += timedelta(hours=unit_hours)
+
+        total: int = sum(costs)
+        self.rations = 0 if total > self.rations else self.rations - total
+        return starved
 
     @staticmethod
     @auto_session
-    def get_by_pos(planet_x: int, planet_y: int, session: Session = None) -> Optional[Planet]:
+    def get_by_pos(
+        planet_x: int, planet_y: int, profile: str | None = None, session: Session = None
+    ) -> Optional[Planet]:
         """
         Get the planet at the given position.
 
         :param int planet_x: The x position of the planet
         :param int planet_y: The y position of the planet
+        :param profile: Loader profile to load the tree of the planet with, see :func:`loader_profiles`
         :param Session session: The session to use
         :return: The planet at the given position or None if no planet exists at the given position
         """
-        return session.query(Planet).filter_by(planet_x=planet_x, planet_y=planet_y).first()
+        return session.scalars(_select_by_pos(profile), {"planet_x": planet_x, "planet_y": planet_y}).first()
 
     @staticmethod
     @auto_session
-    def get_by_uuid(uuid: UUID, session: Session = None) -> Optional[Planet]:
+    def get_by_uuid(uuid: UUID, profile: str | None = None, session: Session = None) -> Optional[Planet]:
         """
         Get the planet with the given UUID.
 
         :param UUID uuid: The UUID of the planet
+        :param profile: Loader profile to load the tree of the planet with, see :func:`loader_profiles`
         :param Session session: The session to use
         :return: The planet with the given UUID or None if no planet exists with the given UUID
         """
-        return session.query(Planet).filter_by(planet_id=uuid).first()
+        return session.scalars(_select_by_uuid(profile), {"planet_id": uuid}).first()
 
     def get_attack_power(self):
         """
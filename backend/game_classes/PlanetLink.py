@@ -1,9 +1,10 @@
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 from database.database_access import Base, default_factory, auto_session
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.Buildings.Warper import Warper, Planet
@@ -24,7 +25,7 @@ class PlanetLink(Base):
 
     __table_args__ = (UniqueConstraint("planet_from_id", "planet_to_id"),)
 
-    @default_factory(link_id=uuid1)
+    @default_factory(link_id=new_id)
     def __init__(self, planet_from_id: UUID, planet_to_id: UUID, warper_id: UUID, link_id: UUID = None):
         self.link_id = link_id
 
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy import Column, ForeignKey, Table
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
-from database.database_access import Base, auto_session, default_factory
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.Message import Message
@@ -26,7 +27,7 @@ class Race(Base):
 
     messages: Mapped[list["Message"]] = relationship(back_populates="race")
 
-    @default_factory(race_id=uuid1)
+    @default_factory(race_id=new_id)
     def __init__(self, race_name: str, leader_id: UUID, race_id: UUID = None):
         """
         Initialize a Race object with an id, a name, a player id and an empty list of participants.
@@ -40,7 +41,8 @@ class Race(Base):
     @auto_session
     def store(self, session: Session = None) -> str | None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print("Cannot Store Race. Race already exist. id :" + self.race_id.__str__() + " , ( race name :  " + self.race_name + " )" )
@@ -1,17 +1,48 @@
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
-from sqlalchemy import ForeignKey, UniqueConstraint
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy import ForeignKey, Select, UniqueConstraint, or_, select
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, selectin_polymorphic
 
-from backend.game_classes.Buildings import Building, Warper, Spaceport
-from database.database_access import Base, auto_session, default_factory
+from backend.game_classes.Buildings import Barrack, Building, Farm, Mine, Warper, Spaceport
+from backend.game_classes.Units.AttackUnits import AttackUnit
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
+from backend.game_classes.resources import Resources
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 from sqlalchemy.exc import IntegrityError
 
 if TYPE_CHECKING:
     from backend.game_classes.Planet import Planet
 
 
+def select_active_buildings() -> Select:
+    """
+    Select the buildings with a timer that wasn't cleared yet: being built, gathering, training units or having a ship.
+    Idle buildings don't change on an update, the partial indexes on the timer columns let the database skip them.
+    """
+    farms, mines, spaceports = Farm.__table__, Mine.__table__, Spaceport.__table__
+    attack_units = AttackUnit.__table__
+
+    return (
+        select(Building)
+        .where(
+            or_(
+                Building.construction_completes_at.is_not(None),
+                Building.building_id.in_(select(farms.c.building_id).where(farms.c.gathering_completes_at.is_not(None))),
+                Building.building_id.in_(select(mines.c.building_id).where(mines.c.gathering_completes_at.is_not(None))),
+                Building.building_id.in_(
+                    select(attack_units.c.building_id).where(attack_units.c.training_completes_at.is_not(None))
+                ),
+                Building.building_id.in_(
+                    select(spaceports.c.building_id).where(spaceports.c.space_ship_id.is_not(None))
+                ),
+            )
+        )
+        .options(selectin_polymorphic(Building, [Farm, Mine, Barrack, Spaceport]))
+    )
+
+
 class Settlement(Base):
     __tablename__ = "settlements"
 
@@ -21,7 +52,7 @@ class Settlement(Base):
     settlement_nr: Mapped[int]
     "Number of the settlement"
 
-    planet_id: Mapped[UUID] = mapped_column(ForeignKey("planets.planet_id", ondelete="CASCADE"))
+    planet_id: Mapped[UUID] = mapped_column(ForeignKey("planets.planet_id", ondelete="CASCADE"), index=True)
     "Id of the planet the settlement is on"
 
     __table_args__ = (UniqueConstraint("settlement_nr", "planet_id"),)
@@ -32,7 +63,7 @@ class Settlement(Base):
     planet: Mapped["Planet"] = relationship(back_populates="settlements")
     "Planet that the settlement is on"
 
-    @default_factory(settlement_id=uuid1)
+    @default_factory(settlement_id=new_id)
     def __init__(self, settlement_nr: int, planet_id: UUID, settlement_id: UUID = None) -> None:
         """
         Initialize a Settlement object with a settlement number and a planet.
@@ -85,7 +116,8 @@ class Settlement(Base):
     @auto_session
     def store(self, session: Session = None) -> None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print("Cannot Store Settlement. Settlement already exist. id :" + self.settlement_id.__str__() + " )")
@@ -101,12 +133,29 @@ class Settlement(Base):
         return self.get_grid(False)[pos_y][pos_x]
 
     @auto_session
-    def update(self, seconds: float) -> None:
+    def update(self, upkeep: bool = True, session: Session = None) -> None:
         """
         Update the settlement with the time that has passed since last update
+
+        :param upkeep: Whether the barracks feed their units, the planet feeds them all at once instead
         """
-        for building in self.buildings:
-            building.update(seconds=seconds)
+        # Only the buildings with a running timer can change
+        session.flush()
+        active: list[Building] = list(
+            session.scalars(select_active_buildings().where(Building.settlement_id == self.settlement_id))
+        )
+
+        # When the barracks feed their units themselves, the ones without units in training still have to be visited
+        if upkeep:
+            active += [
+                building for building in self.buildings if isinstance(building, Barrack) and building not in active
+            ]
+
+        for building in active:
+            if isinstance(building, Barrack):
+                building.update(upkeep=upkeep)
+            else:
+                building.update()
 
     @auto_session
     def remove_building(self, building: Building, session: Session = None) -> None:
@@ -116,7 +165,7 @@ class Settlement(Base):
         # First delete the 'Building' part
         item = session.query(Building).filter_by(building_id=building.building_id).first()
         session.delete(item)
-        session.commit()
+        commit(session)
 
         """
         # Now remove the specialization part
@@ -133,39 +182,32 @@ class Settlement(Base):
         """
 
     @auto_session
-    def build(self, building: Building) -> bool:
+    def build(self, building: Building, session: Session = None) -> bool:
         """
         Builds a building, returns whether it is possible to build it.
         """
-        # Check if there are enough resources on the planet
+        # Extract the build cost from the planet, if there are not enough resources on the planet we can't build
         planet: "Planet" = self.planet
-        materials: int = planet.building_materials
-
-        if isinstance(building, Warper):
-            build_cost = building.build_cost
-        else:
-            build_cost = building.build_cost  # TODO remove this
-
-        if materials < build_cost:
+        if not planet.spend(Resources(building_materials=building.build_cost), session=session):
             print("error: not enough resources")
             return False
 
         # Now that we know that it is possible, we can build it:
         self.buildings.append(building)
 
-        # Now we extract the build cost from the planet
-
         if isinstance(building, Warper):
-            planet.building_materials -= building.build_cost
             building.construction_time_left = 1000  # TODO Construction time warper
         else:
-            planet.building_materials -= building.build_cost
-
             # And we append the wait time
             building.construction_time_left = building.build_cost
 
         building.level = 1
 
+        # Schedule the end of the construction for the background worker
+        TimerEvent.schedule(
+            planet.user_id, TimerKind.CONSTRUCTION, building.building_id, building.construction_time_left, session=session
+        )
+
         building.store()
 
         return True
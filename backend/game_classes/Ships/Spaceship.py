@@ -1,12 +1,17 @@
-from uuid import UUID, uuid1
+from datetime import datetime, timedelta
+from uuid import UUID
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from backend.game_classes import clock
 from backend.game_classes.Ships.ship import Ship
-from database.database_access import auto_session, Session, default_factory
-from backend.game_classes.properties import get_spaceship_property
+from database.database_access import auto_session, commit, Session, default_factory
+from database.ids import new_id
+from backend.game_classes.properties import spaceship_level
+from backend.game_classes.resources import Resources
 from backend.game_classes.Buildings.Barrack import Barrack
 from typing import Optional, TYPE_CHECKING
 from backend.game_classes.PlanetLink import PlanetLink
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
 from math import sqrt
 
 if TYPE_CHECKING:
@@ -27,14 +32,17 @@ class Spaceship(Ship):
 
     space_port: Mapped["Spaceport"] = relationship(back_populates="space_ship")
 
-    current_destination_id: Mapped[UUID] = mapped_column(ForeignKey("planets.planet_id"), nullable=True)
+    current_destination_id: Mapped[UUID] = mapped_column(ForeignKey("planets.planet_id"), nullable=True, index=True)
 
     destination: Mapped["Planet"] = relationship(back_populates="incoming_spaceships")
 
-    moving_time_left: Mapped[float]
-    "Remaining travel time of the spaceship"
+    moving_completes_at: Mapped[datetime | None]
+    "Time at which the spaceship arrives, None when it isn't moving"
 
-    __mapper_args__ = {"polymorphic_identity": "spaceship"}
+    version: Mapped[int] = mapped_column(server_default="1")
+    "Version of the row, an update of a spaceship that changed since it was loaded fails, see database/conflicts.py"
+
+    __mapper_args__ = {"polymorphic_identity": "spaceship", "polymorphic_load": "inline", "version_id_col": version}
     __property_name__ = "spaceship"
 
     @property
@@ -42,21 +50,30 @@ class Spaceship(Ship):
         """
         Get the travel speed amplifying factor based on spaceship level.
         """
-        return get_spaceship_property(self.__property_name__, "level", str(self.level), "travel_speed_factor")
+        return spaceship_level(self.__property_name__, self.level).travel_speed_factor
 
     @property
     def unit_capacity(self) -> int:
-        return get_spaceship_property(self.__property_name__, "level", str(self.level), "unit_capacity")
+        return spaceship_level(self.__property_name__, self.level).unit_capacity
 
     @property
     def resource_capacity(self) -> int:
-        return get_spaceship_property(self.__property_name__, "level", str(self.level), "resource_capacity")
+        return spaceship_level(self.__property_name__, self.level).resource_capacity
 
     @property
     def level(self) -> int:
         return self.space_port.level
 
-    @default_factory(ship_id=uuid1)
+    @property
+    def moving_time_left(self) -> float:
+        """Remaining travel time of the spaceship"""
+        return clock.seconds_until(self.moving_completes_at)
+
+    @moving_time_left.setter
+    def moving_time_left(self, seconds: float) -> None:
+        self.moving_completes_at = clock.after(seconds)
+
+    @default_factory(ship_id=new_id)
     def __init__(self, owner_id: UUID, ship_id: UUID = None):
 
         super().__init__(owner_id=owner_id, ship_id=ship_id)
@@ -64,7 +81,7 @@ class Spaceship(Ship):
         self.rations: int = 0
         self.building_materials: int = 0
 
-        self.moving_time_left: float = 0
+        self.moving_completes_at: datetime | None = None
         self.moving_time: float = 0
 
     @auto_session
@@ -74,13 +91,12 @@ class Spaceship(Ship):
         """
         if self.is_moving():
             raise ValueError("Can not board materials while the spaceship is moving.")
-        if from_planet.building_materials < building_materials_amount:
+        if not from_planet.spend(Resources(building_materials=building_materials_amount), session=session):
             raise ValueError("The planet (" + from_planet.planet_name + ") does not have " +
                              str(building_materials_amount) + " building materials.")
 
-        from_planet.building_materials -= building_materials_amount
         self.building_materials += building_materials_amount
-        session.commit()
+        commit(session)
 
     @auto_session
     def board_rations(self, from_planet: "Planet", amount: int, session: Session) -> None:
@@ -89,23 +105,21 @@ class Spaceship(Ship):
         """
         if self.is_moving():
             raise ValueError("Can not board rations while the spaceship is moving.")
-        if from_planet.rations < amount:
+        if not from_planet.spend(Resources(rations=amount), session=session):
             raise ValueError("The planet (" + from_planet.planet_name + ") does not have " + str(amount) + " rations.")
 
-        from_planet.rations -= amount
         self.rations += amount
-        session.commit()
+        commit(session)
 
     @auto_session
     def unload_resources(self, planet_to: "Planet", session: Session) -> None:
         """
         Unload resources onto the destination planet.
         """
-        planet_to.add_rations(self.rations)
+        planet_to.receive(Resources(self.building_materials, self.rations), session=session)
         self.rations = 0
-        planet_to.add_building_materials(self.building_materials)
         self.building_materials = 0
-        session.commit()
+        commit(session)
 
     @auto_session
     def board_attack_unit(self, attack_unit: "AttackUnit",
@@ -119,7 +133,7 @@ class Spaceship(Ship):
         attack_unit.building_id = None
         attack_unit.spaceship_id = self.ship_id
         self.attack_units.append(attack_unit)
-        session.commit()
+        commit(session)
 
     @auto_session
     def check_space_in_barracks(self, planet: "Planet", attack_unit: "AttackUnit") -> bool:
@@ -162,9 +176,12 @@ class Spaceship(Ship):
         """
         attack_unit.building_id = barrack.building_id
         attack_unit.spaceship_id = None
+
+        # Units don't eat while they travel, they start a new hour once they are in a barrack again
+        attack_unit.fed_until = clock.now()
         barrack.attack_units.append(attack_unit)
         self.attack_units.remove(attack_unit)
-        session.commit()
+        commit(session)
 
     @staticmethod
     def find_planet_link(planet_from: "Planet", planet_to: "Planet", session: Session) -> Optional[PlanetLink]:
@@ -211,35 +228,37 @@ class Spaceship(Ship):
         return sqrt(delta_x ** 2 + delta_y ** 2)
 
     @auto_session(auto_commit=True)
-    def update(self, seconds: float, session: Session) -> None:
+    def update(self, session: Session) -> None:
         """
         Update the spaceship status.
         """
         super().update(False)
-        if self.is_moving():
-            self.moving_time_left -= seconds
-            if self.moving_time_left <= 0:
-                # Get the remaining time moving
-                time_left = -self.moving_time_left
-                self.moving_time_left = 0
 
-                # If it arrived back:
-                if self.destination.planet_id == self.space_port.settlement.planet_id:
-                    self.destination = None
+        # The travel time is derived from the arrival time, a ship that was away for long enough also made its way back
+        while self.moving_completes_at is not None and self.moving_time_left == 0:
+            arrived_at: datetime = self.moving_completes_at
+            self.moving_completes_at = None
 
-                # If it reached the destination, turn back
-                else:
-                    self.unload_resources(self.destination)
-                    self.unload_units(self.destination, session)
-                    self.move_from_to_planet(self.destination, self.space_port.settlement.planet)
-                    self.update(time_left)
+            # If it arrived back:
+            if self.destination.planet_id == self.space_port.settlement.planet_id:
+                self.destination = None
 
-        session.commit()
+            # If it reached the destination, turn back from the moment it arrived
+            else:
+                self.unload_resources(self.destination)
+                self.unload_units(self.destination, session)
+                self.move_from_to_planet(self.destination, self.space_port.settlement.planet, departure=arrived_at)
+
+        commit(session)
 
     @auto_session
-    def move_from_to_planet(self, from_planet: "Planet", to_planet: "Planet", session: Session) -> None:
+    def move_from_to_planet(
+        self, from_planet: "Planet", to_planet: "Planet", session: Session, departure: datetime = None
+    ) -> None:
         """
         Move the spaceship from one planet to another.
+
+        :param departure: Time the spaceship leaves, defaults to now
         """
         link = self.find_planet_link(from_planet, to_planet, session)
 
@@ -253,9 +272,12 @@ class Spaceship(Ship):
         self.moving_time = distance / (self.travel_speed_factor * warp_factor)
         self.destination = to_planet
 
-        self.moving_time_left = self.moving_time
+        if departure is None:
+            departure = clock.now()
+        self.moving_completes_at = departure + timedelta(seconds=self.moving_time)
+        TimerEvent.schedule(self.owner_id, TimerKind.ARRIVAL, self.ship_id, self.moving_time_left, session=session)
         self.space_port.settlement.planet.user.update()
-        session.commit()
+        commit(session)
 
     def get_description(self) -> str:
         """
@@ -1,12 +1,13 @@
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy import ForeignKey, UUID as sqlUUID
 from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 
 from database.database_access import Base, auto_session, default_factory
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes import User
@@ -57,6 +58,7 @@ class OrbitLocation(ShipLocation):
     planet_id: Mapped[UUID] = mapped_column(
         ForeignKey("planets.planet_id", onupdate="CASCADE", ondelete="CASCADE"),
         nullable=True,
+        index=True,
         use_existing_column=True,
     )
     "Id of the planet the ship is orbiting"
@@ -238,7 +240,7 @@ class Ship(Base):
         "polymorphic_on": "type",
     }
 
-    @default_factory(ship_id=uuid1)
+    @default_factory(ship_id=new_id)
     def __init__(self, owner_id: UUID, ship_id: UUID = None):
         assert isinstance(ship_id, UUID), f"building_id must be of type 'UUID' but is of type {type(ship_id).__name__}"
 
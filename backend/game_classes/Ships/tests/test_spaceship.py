@@ -1,5 +1,6 @@
 import pytest
 from backend.game_classes import (
+    clock,
     User,
     Planet,
     Settlement,
@@ -122,13 +123,15 @@ def test_transfer_attack_units():
         planet1.building_materials, planet1.rations = 1000, 1000
         # build barrack1
         assert settlement1.build(barrack1)
-        barrack1.update(10)
+        clock.advance(10)
+        barrack1.update()
         session.commit()
 
         planet1.building_materials, planet1.rations = 1000, 1000
         # build barrack2
         assert settlement2.build(barrack2)
-        barrack2.update(10)
+        clock.advance(10)
+        barrack2.update()
         session.commit()
 
         for barrack in [barrack1, barrack2]:
@@ -137,7 +140,8 @@ def test_transfer_attack_units():
                 session.add(space_marine)
                 session.commit()
                 assert barrack.train_unit(space_marine) is None
-                barrack.update(60)
+                clock.advance(60)
+                barrack.update()
                 session.commit()
 
         assert len(barrack1.attack_units) == 2
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from enum import Enum
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index, or_, select, update
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from backend.game_classes import clock
+from database.database_access import Base, auto_session, commit, default_factory
+from database.ids import new_id
+
+CLAIM_LEASE = timedelta(minutes=5)
+"Time after which events claimed by a worker that did not finish them can be claimed again"
+
+
+class TimerKind(str, Enum):
+    CONSTRUCTION = "construction"
+    TRAINING = "training"
+    GATHERING = "gathering"
+    ARRIVAL = "arrival"
+
+
+class TimerEvent(Base):
+    """
+    A point in time at which the state of a user changes on its own, e.g. a building that finishes construction.
+    Events are applied by the background worker, so players that don't log in are kept up to date.
+    """
+
+    __tablename__ = "timer_events"
+
+    event_id: Mapped[UUID] = mapped_column(primary_key=True)
+    "Id of the event"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"))
+    "Id of the user whose state changes"
+
+    kind: Mapped[str]
+    "What happens when the event is due, one of :class:`TimerKind`"
+
+    target_id: Mapped[UUID]
+    "Id of the building, unit or ship the event is about"
+
+    due_at: Mapped[datetime]
+    "Time at which the event happens"
+
+    claimed_by: Mapped[UUID | None]
+    "Claim of the worker that is applying the event"
+
+    claimed_at: Mapped[datetime | None]
+    "Time the event was claimed by a worker"
+
+    __table_args__ = (Index("ix_timer_events_due_at", "due_at"),)
+
+    @default_factory(event_id=new_id)
+    def __init__(self, user_id: UUID, kind: TimerKind, target_id: UUID, due_at: datetime, event_id: UUID = None):
+        assert isinstance(event_id, UUID), "event_id must be of type 'UUID'"
+
+        self.event_id = event_id
+        self.user_id = user_id
+        self.kind = TimerKind(kind).value
+        self.target_id = target_id
+        self.due_at = due_at
+        self.claimed_by = None
+        self.claimed_at = None
+
+    @staticmethod
+    @auto_session
+    def schedule(
+        user_id: UUID | None, kind: TimerKind, target_id: UUID, seconds: float, session: Session = None
+    ) -> TimerEvent | None:
+        """
+        Schedule an event that is due after the given amount of seconds.
+
+        :param user_id: Id of the user whose state changes, nothing is scheduled for unowned planets
+        :param kind: What happens when the event is due
+        :param target_id: Id of the building, unit or ship the event is about
+        :param seconds: Seconds from now until the event is due
+        """
+        if user_id is None:
+            return None
+
+        event = TimerEvent(user_id, kind, target_id, clock.now() + timedelta(seconds=seconds))
+        session.add(event)
+        return event
+
+    @staticmethod
+    @auto_session
+    def claim_due(batch_size: int, session: Session = None) -> list[TimerEvent]:
+        """
+        Claim a batch of events that are due.
+
+        The claim is a single ``UPDATE``, on Postgres the candidate rows are locked with ``SKIP LOCKED`` so
+        concurrent workers claim different batches. SQLite does not support row locks, the ``UPDATE`` takes the
+        database write lock instead, so claims never overlap there either, but only one worker can write at a time.
+        Claims that are older than :data:`CLAIM_LEASE` are considered abandoned and can be claimed again. The claim is committed, in a
+        unit of work it is committed with the rest of the work.
+
+        :param batch_size: Maximum amount of events to claim
+        :return: The claimed events, ordered by due time
+        """
+        now = clock.now()
+        claim = new_id()
+
+        due = (
+            select(TimerEvent.event_id)
+            .where(
+                TimerEvent.due_at <= now,
+                or_(TimerEvent.claimed_at.is_(None), TimerEvent.claimed_at < now - CLAIM_LEASE),
+            )
+            .order_by(TimerEvent.due_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        session.execute(
+            update(TimerEvent)
+            .where(TimerEvent.event_id.in_(due))
+            .values(claimed_by=claim, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        commit(session)
+
+        return list(
+            session.scalars(select(TimerEvent).where(TimerEvent.claimed_by == claim).order_by(TimerEvent.due_at))
+        )
@@ -1,15 +1,22 @@
+from datetime import datetime, timedelta
+
+from backend.game_classes import clock
 from backend.game_classes.Units.Unit import Unit
-from backend.game_classes.properties import get_unit_property
+from backend.game_classes.properties import kind_stats, unit_level
 from database.database_access import default_factory, auto_session
+from database.ids import new_id
 from sqlalchemy.orm import Mapped, mapped_column, Session, relationship
-from sqlalchemy import ForeignKey
-from uuid import uuid1, UUID
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import ForeignKey, Index, text
+from uuid import UUID
 from typing import TYPE_CHECKING, Optional
 from random import randint
 
 if TYPE_CHECKING:
     from backend.game_classes.Buildings.Barrack import Barrack
     from backend.game_classes.Ships.Spaceship import Spaceship
+    from backend.game_classes.Planet import Planet
 
 
 class AttackUnit(Unit):
@@ -19,24 +26,36 @@ class AttackUnit(Unit):
         ForeignKey("units.unit_id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
     )
 
-    building_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("barracks.building_id", ondelete="CASCADE"))
+    building_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("barracks.building_id", ondelete="CASCADE"), index=True
+    )
 
     barrack: Mapped[Optional["Barrack"]] = relationship(back_populates="attack_units")
 
-    spaceship_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("spaceships.ship_id", ondelete="CASCADE"))
+    spaceship_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("spaceships.ship_id", ondelete="CASCADE"), index=True
+    )
 
     spaceship: Mapped[Optional["Spaceship"]] = relationship(back_populates="attack_units")
 
-    # Is time since last time the unit consumed rations
-    seconds_since_last_feed: Mapped[float]  # Every hour the attack unit consumes food
+    # Time up to which the unit has eaten, every hour after it the unit consumes rations
+    fed_until: Mapped[datetime]
 
     # When a unit is being trained, this is the position in the training queue of the item
     training_pos: Mapped[int | None]
 
-    # The remaining training time (seconds), this is set by the Barrack, and gotten from a getter function in this
-    # class.
-    training_time_left: Mapped[float]
-
+    # Time at which the unit is trained, this is set by the Barrack and includes the time the units before it in the
+    # queue still need
+    training_completes_at: Mapped[datetime | None]
+
+    __table_args__ = (
+        Index(
+            "ix_attack_units_in_training",
+            "building_id",
+            postgresql_where=text("training_completes_at IS NOT NULL"),
+            sqlite_where=text("training_completes_at IS NOT NULL"),
+        ),
+    )
     __mapper_args__ = {
         "polymorphic_identity": "attack_units",
     }
@@ -47,88 +66,120 @@ class AttackUnit(Unit):
     @property
     def max_level(self) -> int:
         """Get the max level"""
-        return get_unit_property(self.__property_name__, "max_level")
+        return kind_stats("unit", self.__property_name__).max_level
 
     @property
     def size(self) -> int:
         """Get the size of the unit"""
-        return get_unit_property(self.__property_name__, "size")
+        return kind_stats("unit", self.__property_name__).size
 
     @property
     def attack_power(self) -> int:
         """Get the attack power of the unit"""
-        return get_unit_property(self.__property_name__, "level", str(self.level), "attack_power")
+        return unit_level(self.__property_name__, self.level).attack_power
 
     @property
     def rations_per_hour(self) -> int:
         """Get the rations per hour the unit consumes"""
-        return get_unit_property(self.__property_name__, "level", str(self.level), "rations_per_hour")
+        return unit_level(self.__property_name__, self.level).rations_per_hour
     
+    @property
+    def seconds_since_last_feed(self) -> float:
+        """Seconds since the unit last ate, 0 while it is in training"""
+        return max((clock.now() - self.fed_until).total_seconds(), 0)
+
+    @seconds_since_last_feed.setter
+    def seconds_since_last_feed(self, seconds: float) -> None:
+        self.fed_until = clock.now() - timedelta(seconds=seconds)
+
+    @property
+    def training_time_left(self) -> float:
+        """Seconds of training the unit itself still needs, only goes down when it is at the front of the queue"""
+        if self.training_completes_at is None:
+            return 0
+        return min(clock.seconds_until(self.training_completes_at), self.training_time)
+
     @property
     def training_time(self) -> int:
         """Get the training time of the unit """
-        return get_unit_property(self.__property_name__, "level", str(self.level), "training_time")
+        return unit_level(self.__property_name__, self.level).training_time
 
     @property
     def training_cost(self) -> int:
         """Get the training cost of the unit"""
-        return get_unit_property(self.__property_name__, "level", str(self.level), "training_cost")
+        return unit_level(self.__property_name__, self.level).training_cost
 
     @property
     def upgrade_cost(self) -> int | None:
         """Get the upgrade cost of the unit"""
         if self.level >= self.max_level:
             return None
-        return get_unit_property(self.__property_name__, "level", str(self.level), "upgrade_cost")
+        return unit_level(self.__property_name__, self.level).upgrade_cost
 
-    @default_factory(unit_id=uuid1)
+    @default_factory(unit_id=new_id)
     def __init__(self, building_id: UUID, *, level: int = 1, unit_id: UUID = None):
         # Assertion check for the type of the unit ID (UUID)
         assert isinstance(unit_id, UUID)
 
         super().__init__(level=level, unit_id=unit_id)
         self.building_id: UUID = building_id
-        self.seconds_since_last_feed: float = 0
+        self.fed_until: datetime = clock.now()
         self.training_pos: int | None = None
-        self.training_time_left: float = 0
+        self.training_completes_at: datetime | None = None
 
     @auto_session
-    def update(self, seconds) -> bool:
+    def update(self) -> bool:
         """
         Updates the unit, it calculates the amount of food it used up.
         """
-        # When a unit is in training, we don't do anything
-        if self.in_training():
+        # The unit consumes food every hour after it was last fed, a unit in training is fed until it is trained. The
+        # number of whole hours the unit has to be fed for are all paid at once so the cost of an update does not grow
+        # with the time the player was away
+        hours: int = int(self.seconds_since_last_feed // 3600)
+        if hours == 0:
             return True
 
-        # If the unit is not in training, it consumes food every hour, so we've added up extra seconds to the last
-        # time since the unit got fed.
-        self.seconds_since_last_feed += seconds
+        # If there's not enough food for all the hours, the unit eats what is left and starves, the barrack will
+        # remove it
+        planet: "Planet" = self.barrack.settlement.planet
+        rations_needed: int = hours * self.rations_per_hour
+        if planet.rations < rations_needed:
+            planet.rations = 0
+            return False
 
-        # If the time is more than an hour, we remove the used food
-        while self.seconds_since_last_feed >= 3600:
-            # If there's not enough food, give false, and the barrack will remove the unit
-            if self.barrack.settlement.planet.rations - self.rations_per_hour < 0:
-                self.barrack.settlement.planet.rations = 0
-                return False
+        # Else we remove the food and move the fed time forward by the hours
+        planet.rations -= rations_needed
+        self.fed_until += timedelta(hours=hours)
+
+        return True
 
-            # Else we Remove the food
-            self.barrack.settlement.planet.rations -= self.rations_per_hour
+    @auto_session
+    def remove(self, session: Session = None) -> None:
+        """
+        Delete the unit. It is also taken out of the unit lists of its barrack and spaceship that are already loaded,
+        as these are only reloaded once the session is committed.
+        """
+        from backend.game_classes.Buildings.Barrack import Barrack
+        from backend.game_classes.Ships.Spaceship import Spaceship
 
-            # Take an hour of the last fed time
-            self.seconds_since_last_feed -= 3600
+        for owner_class, owner_id in ((Barrack, self.building_id), (Spaceship, self.spaceship_id)):
+            if owner_id is None:
+                continue
+            owner = session.identity_map.get(identity_key(owner_class, owner_id))
+            if owner is not None and "attack_units" in owner.__dict__:
+                set_committed_value(owner, "attack_units", [unit for unit in owner.attack_units if unit is not self])
 
-        return True
+        session.delete(self)
 
     @staticmethod
     def get_training_cost_static(class_name: str, level: int) -> int:
-        return get_unit_property(class_name, "level", str(level), "training_cost")
+        return unit_level(class_name, level).training_cost
 
     def in_training(self) -> bool:
         """
         Returns whether the unit is in training.
         """
-        return self.training_pos is not None
+        return clock.seconds_until(self.training_completes_at) > 0
 
     def is_traveling(self) -> bool:
         """
@@ -1,8 +1,7 @@
 from backend.game_classes.Units.AttackUnits.AttackUnit import AttackUnit
 from database.database_access import default_factory, auto_session
-from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
-from sqlalchemy import ForeignKey
-from uuid import uuid1, UUID
+from database.ids import new_id
+from uuid import UUID
 from typing import TYPE_CHECKING
 from random import randint
 
@@ -11,15 +10,12 @@ if TYPE_CHECKING:
 
 
 class SpaceDrone(AttackUnit):
-    __tablename__ = "space_drones"
-
-    unit_id: Mapped[UUID] = mapped_column(ForeignKey("attack_units.unit_id", ondelete="CASCADE"), primary_key=True)
-
+    # Single table inheritance, the drones are stored in attack_units
     __mapper_args__ = {"polymorphic_identity": "space_drones"}
 
     __property_name__ = "space_drone"
 
-    @default_factory(unit_id=uuid1)
+    @default_factory(unit_id=new_id)
     def __init__(self, barrack_id: UUID, *, unit_id: UUID = None, level: int = 1) -> None:
         """
         Initialize a SpaceMarine object.
@@ -1,19 +1,16 @@
 from backend.game_classes.Units.AttackUnits.AttackUnit import AttackUnit
 from database.database_access import default_factory, auto_session
+from database.ids import new_id
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey
-from uuid import uuid1, UUID
+from uuid import UUID
 from typing import TYPE_CHECKING
 
 
 class SpaceMarine(AttackUnit):
-    __tablename__ = "space_marines"
+    # Single table inheritance, the marines are stored in attack_units with their one extra column
+    combats_survived: Mapped[int] = mapped_column(nullable=True)
 
-    unit_id: Mapped[UUID] = mapped_column(ForeignKey("attack_units.unit_id", ondelete="CASCADE"), primary_key=True)
-
-    combats_survived: Mapped[int]
-
-    __mapper_args__ = {"polymorphic_identity": "space_marines"}
+    __mapper_args__ = {"polymorphic_identity": "space_marines", "polymorphic_load": "inline"}
 
     __property_name__ = "space_marine"
 
@@ -24,7 +21,7 @@ class SpaceMarine(AttackUnit):
         """
         return super().attack_power + (int(self.combats_survived / 2) * 10)  # Always rounds down
 
-    @default_factory(unit_id=uuid1)
+    @default_factory(unit_id=new_id)
     def __init__(self, barrack_id: UUID, *, unit_id: UUID = None, level: int = 1) -> None:
         """
         Initialize a SpaceMarine object.
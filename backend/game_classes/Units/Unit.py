@@ -1,8 +1,9 @@
-from uuid import UUID, uuid1
+from uuid import UUID
 
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
-from database.database_access import Base, auto_session, default_factory
+from database.database_access import Base, auto_session, commit, default_factory
+from database.ids import new_id
 
 
 class Unit(Base):
@@ -18,7 +19,7 @@ class Unit(Base):
     __mapper_args__ = {"polymorphic_identity": "units",
                        "polymorphic_on": "type", }
 
-    @default_factory(unit_id=uuid1)
+    @default_factory(unit_id=new_id)
     def __init__(self, level: int, unit_id: UUID = None) -> None:
         """
         Initialize a Unit object with a name.
@@ -30,7 +31,7 @@ class Unit(Base):
 
     @auto_session
     def store(self, session: Session = None) -> None:
-        session.commit()
+        commit(session)
 
     @property
     def type_string(self) -> str:
@@ -1,26 +1,43 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import cache
 from json.encoder import JSONEncoder
 from typing import TYPE_CHECKING
-from typing import TYPE_CHECKING
-from uuid import UUID, uuid1
+from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Select, bindparam, event, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, selectinload
 
+from backend.game_classes import clock
 from backend.game_classes.Achievement import Achievement
-from backend.game_classes.Planet import Planet
+from backend.game_classes.Planet import Planet, planet_loader_options
 from backend.game_classes.Race import Race
-from database.database_access import Base, auto_session, default_factory
+from backend.game_classes.update_registry import UpdateRegistry, current_registry
+from database.database_access import Base, auto_session, commit, default_factory, savepoint
+from database.ids import new_id
 
 if TYPE_CHECKING:
     from backend.game_classes.Message import Message
     from backend.game_classes.Units.Unit import Unit
 
 
+@cache
+def _select_by_name(profile: str | None) -> Select:
+    # Built once per profile with a bound parameter, so every call reuses the statement and its cache key
+    statement: Select = select(User).where(User.user_name == bindparam("user_name")).limit(1)
+    if profile is None:
+        return statement
+    return statement.options(*planet_loader_options(profile, selectinload(User.planets)))
+
+
+def _changed(session: Session) -> bool:
+    """Whether the session has anything to write, also holds during a flush as it still shows what is written"""
+    return bool(session.new or session.deleted or any(session.is_modified(obj) for obj in session.dirty))
+
+
 class UserEncoder(JSONEncoder):
     def default(self, user: User):
         if not isinstance(user, User):
@@ -59,7 +76,7 @@ class User(Base):
 
     messages: Mapped[list["Message"]] = relationship(back_populates="user")
 
-    @default_factory(user_id=uuid1)
+    @default_factory(user_id=new_id)
     def __init__(self, user_name: str, user_password: str, user_id: UUID = None):
         assert isinstance(user_id, UUID), "user_id must be of type 'UUID'"
 
@@ -71,7 +88,7 @@ class User(Base):
         self.race_id: UUID | None = None
         self.achievements: list[Achievement] = []
         self.units: list[Unit] = []
-        self.last_update: datetime = datetime.now()
+        self.last_update: datetime = clock.now()
 
     def __repr__(self):
         return f"{self.user_id}, {self.user_name}, {self.password}"
@@ -92,7 +109,8 @@ class User(Base):
     @auto_session
     def store(self, session: Session = None) -> str | None:
         try:
-            session.commit()
+            with savepoint(session):
+                commit(session)
         except IntegrityError as DuplicateErr:
             print(type(DuplicateErr))  # the exception type
             print("Cannot Store User. User already exist. id :" + self.user_id.__str__() + " , ( user name :  " + self.user_name + " )" )
@@ -134,30 +152,46 @@ class User(Base):
     def update(self, session=Session) -> None:
         """
         Update all planets owned by the player.
+        Within a request, only the first update of a user does anything.
         """
-        update_time_delta: timedelta = datetime.now() - self.last_update
-        update_time: float = update_time_delta.total_seconds()
+        registry: UpdateRegistry | None = current_registry()
+        if registry is not None and not registry.claim(self.user_id):
+            return
+
+        # The timers are derived from their completion times, so nothing is written unless one of them completed. We
+        # write what is pending first, so only the flushes of the update itself are recorded
+        session.flush()
+        flushes: list[bool] = []
 
-        for planet in self.planets:
-            planet.update(update_time)
+        def record(flushed: Session, _context) -> None:
+            flushes.append(_changed(flushed))
 
-        self.last_update = datetime.now()
+        event.listen(session, "after_flush", record)
+        try:
+            for planet in self.planets:
+                planet.update()
+            session.flush()
+        finally:
+            event.remove(session, "after_flush", record)
 
-        session.commit()
+        if any(flushes):
+            self.last_update = clock.now()
+        commit(session)
 
     @staticmethod
     @auto_session
-    def load_by_name(user_name: str, session: Session = None) -> User | None:
+    def load_by_name(user_name: str, profile: str | None = None, session: Session = None) -> User | None:
         """
         Load a user with the given name from the database.
 
 
         :param str user_name: Name of the user to load
+        :param profile: Loader profile to load the planets of the user with, see :func:`Planet.loader_profiles`
         :param session: Session to use to fetch the user (optional)
         """
         assert isinstance(session, Session), "session must be of type 'Session'"
 
-        return session.query(User).filter_by(user_name=user_name).first()
+        return session.scalars(_select_by_name(profile), {"user_name": user_name}).first()
 
     @auto_session
     def json(self) -> str:
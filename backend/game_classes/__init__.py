@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session, Mapped, mapped_column
 from backend.game_classes.User import User
 from backend.game_classes.Race import Race
 from backend.game_classes.Planet import Planet
+from backend.game_classes.resources import Resources
 from backend.game_classes.PlanetLink import PlanetLink
 from backend.game_classes.Combat.Attack import Attack
 from backend.game_classes.Settlement import Settlement
@@ -15,6 +16,8 @@ from backend.game_classes.Ships.ship import Ship
 from backend.game_classes.Ships.colony_ship import ColonyShip
 from backend.game_classes.Units import Unit, SpaceMarine, AttackUnit, SpaceCommando, SpaceDrone
 from backend.game_classes.Achievement import Achievement
+from backend.game_classes.Message import Message
+from backend.game_classes.TimerEvent import TimerEvent, TimerKind
 from database.database_access import Base, auto_session
 
 
@@ -0,0 +1,63 @@
+"""
+Clock of the game. Timers are stored as the moment they complete, everything that compares them to the current time
+asks this module for it, so tests can freeze and move time.
+"""
+
+from datetime import datetime, timedelta
+
+_frozen_at: datetime | None = None
+"Time the clock is frozen at, None when it follows the system clock"
+
+_offset: timedelta = timedelta(0)
+"Time the clock runs ahead of the system clock"
+
+
+def now() -> datetime:
+    """Get the current time of the game"""
+    if _frozen_at is not None:
+        return _frozen_at
+    return datetime.now() + _offset
+
+
+def after(seconds: float) -> datetime | None:
+    """
+    Get the moment the given amount of seconds from now.
+
+    :return: The moment, None if it is not in the future
+    """
+    if seconds <= 0:
+        return None
+    return now() + timedelta(seconds=seconds)
+
+
+def seconds_until(moment: datetime | None) -> float:
+    """
+    Get the seconds left until a moment.
+
+    :return: The seconds left, 0 if the moment is None or has passed
+    """
+    if moment is None:
+        return 0
+    return max((moment - now()).total_seconds(), 0)
+
+
+def freeze() -> None:
+    """Stop the clock at the current time"""
+    global _frozen_at
+    _frozen_at = now()
+
+
+def advance(seconds: float) -> None:
+    """Move the clock forward"""
+    global _frozen_at, _offset
+    if _frozen_at is not None:
+        _frozen_at += timedelta(seconds=seconds)
+    else:
+        _offset += timedelta(seconds=seconds)
+
+
+def reset() -> None:
+    """Follow the system clock again"""
+    global _frozen_at, _offset
+    _frozen_at = None
+    _offset = timedelta(0)
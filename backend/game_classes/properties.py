@@ -1,13 +1,100 @@
-from functools import wraps
+"""
+Properties of the buildings, units and spaceships, configured in TOML files.
+
+The files are compiled once when they are loaded: every kind gets a :class:`KindStats` with a typed row per level, so
+a stat is a dict lookup and a tuple index instead of a walk through the nested config. Values that are derived from the
+config, like the fill up time of a farm and the cost of all levels up to a level, are computed in the same pass.
+
+The files are reloaded without a restart when a new balance version is published with
+``python -m backend.game_classes.properties --publish``. Publishing copies the files next to the version file, and
+workers only load these copies, so a version always has the same properties, however the files are edited afterwards.
+The version is a number in a file every worker checks at most once per ``config_data['properties_check_interval']``
+seconds, on a request. A worker that sees a new version loads its copies into a new :class:`Snapshot` and swaps it in
+as a whole, so a lookup never mixes two versions.
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from itertools import accumulate
+from typing import Any, Callable, NamedTuple
+
 import tomllib as toml
-from typing import Any
+
+from database.config import config_data
+
+logger = logging.getLogger(__name__)
 
 
 class PropertyError(Exception):
     pass
 
 
-properties: dict[str, dict[str, Any]] = {}
+class BuildingLevel(NamedTuple):
+    """Stats of a level of a building, None when the building doesn't have the stat"""
+
+    build_cost: int
+    upgrade_time: int
+    cumulative_cost: int
+    "Build cost of this level and all levels below it"
+    max_capacity: int | None = None
+    production_rate: int | None = None
+    capacity: int | None = None
+    fill_up_time: float | None = None
+    "Seconds it takes to fill up an empty farm or mine"
+    max_ships: int | None = None
+    production_time: int | None = None
+    travel_factor: float | None = None
+
+
+class UnitLevel(NamedTuple):
+    """Stats of a level of a unit"""
+
+    attack_power: int
+    rations_per_hour: int
+    training_time: int
+    training_cost: int
+    upgrade_cost: int
+    cumulative_upgrade_cost: int
+    "Upgrade cost of this level and all levels below it"
+
+
+class SpaceshipLevel(NamedTuple):
+    """Stats of a level of a spaceship"""
+
+    build_cost: int
+    upgrade_time: int
+    cumulative_cost: int
+    "Build cost of this level and all levels below it"
+    travel_speed_factor: float
+    unit_capacity: int
+    resource_capacity: int
+
+
+class KindStats(NamedTuple):
+    """Compiled properties of a kind of building, unit or spaceship"""
+
+    display_name: str
+    max_level: int
+    levels: tuple[Any, ...]
+    "Stats by level, the index is the level. Level 0 isn't configured and is None"
+    size: int | None = None
+
+
+class Snapshot(NamedTuple):
+    """Properties of a balance version"""
+
+    version: int
+    "Published balance version the files were loaded at"
+    properties: dict[str, dict[str, Any]]
+    "Properties by category, as they are configured"
+    compiled: dict[str, dict[str, KindStats]]
+    "Compiled properties by category and kind"
+
 
 configs = {
     "building": "backend/game_classes/Buildings/building-properties.toml",
@@ -16,20 +103,213 @@ configs = {
 }
 
 
+def _derive_building(level: dict[str, Any]) -> dict[str, Any]:
+    if "capacity" in level and "production_rate" in level:
+        return {"fill_up_time": level["capacity"] / level["production_rate"] * 3600}
+    return {}
+
+
+_rows: dict[str, tuple[type, str, str, Callable[[dict[str, Any]], dict[str, Any]] | None]] = {
+    "building": (BuildingLevel, "build_cost", "cumulative_cost", _derive_building),
+    "unit": (UnitLevel, "upgrade_cost", "cumulative_upgrade_cost", None),
+    "spaceship": (SpaceshipLevel, "build_cost", "cumulative_cost", None),
+}
+"Row type, cost, cumulative cost and derived values of the levels of every category"
+
+
+def compile_properties(category: str, config: dict[str, Any]) -> dict[str, KindStats]:
+    """
+    Compile the configured properties of a category into a table per kind.
+
+    :raise PropertyError: When a kind misses a level below its max level or has an unknown property
+    """
+    row, cost, cumulative, derive = _rows[category]
+    tables: dict[str, KindStats] = {}
+    for kind, values in config.items():
+        if "max_level" not in values or "display_name" not in values:
+            raise PropertyError(f"'{kind}' must configure a display_name and a max_level")
+        levels: dict[str, dict[str, Any]] = values.get("level", {})
+        max_level: int = values["max_level"]
+        if sorted(levels, key=int) != [str(level) for level in range(1, max_level + 1)]:
+            raise PropertyError(f"'{kind}' must configure the levels 1 to {max_level}, not {', '.join(levels)}")
+
+        ordered: list[dict[str, Any]] = [levels[str(level)] for level in range(1, max_level + 1)]
+        totals = accumulate(level[cost] for level in ordered)
+        rows: list[Any] = [None]
+        for number, (level, total) in enumerate(zip(ordered, totals), start=1):
+            try:
+                rows.append(row(**level, **{cumulative: total}, **(derive(level) if derive else {})))
+            except TypeError as err:
+                raise PropertyError(f"Level {number} of '{kind}' doesn't match the {category} properties: {err}")
+
+        tables[kind] = KindStats(values["display_name"], max_level, tuple(rows), values.get("size"))
+    return tables
+
+
+VERSION_FILE: str = config_data.get("properties_version_file", "backend/game_classes/properties.version")
+"File with the published balance version, shared by the workers"
+
+
+def published_version() -> int:
+    """Get the published balance version, 0 when none was published"""
+    try:
+        with open(VERSION_FILE) as f:
+            return int(f.read())
+    except FileNotFoundError:
+        return 0
+
+
+def published_configs(version: int) -> dict[str, str]:
+    """Get the copies of the property files of a published version, by category"""
+    directory: str = os.path.join(os.path.dirname(VERSION_FILE), "published-properties", str(version))
+    return {type: os.path.join(directory, os.path.basename(file)) for type, file in configs.items()}
+
+
+def load_snapshot(version: int, files: dict[str, str] | None = None) -> Snapshot:
+    """
+    Load the properties from file and compile them.
+
+    :param version: Published version to load, its copies are loaded unless no version was published yet
+    :param files: Files to load instead, by category
+    :raise PropertyError: When the files can't be read or don't compile
+    """
+    if files is None:
+        files = published_configs(version) if version > 0 else configs
+
+    properties: dict[str, dict[str, Any]] = {}
+    compiled: dict[str, dict[str, KindStats]] = {}
+    for type, file in files.items():
+        try:
+            with open(file, "rb") as f:
+                properties[type] = toml.load(f)
+        except (OSError, toml.TOMLDecodeError) as err:
+            raise PropertyError(f"The {type} properties of version {version} can't be loaded: {err}")
+        compiled[type] = compile_properties(type, properties[type])
+    return Snapshot(version, properties, compiled)
+
+
+_snapshot: Snapshot = load_snapshot(published_version())
+
+_reload_lock = threading.Lock()
+_next_check: float = 0.0
+"Monotonic time of the next check of the published version"
+
+
 def load_properties() -> None:
     """
-    Load building properties from file.
+    Load the properties from file and swap them in, whatever version is published.
+    """
+    global _snapshot
+    _snapshot = load_snapshot(published_version())
+
+
+def refresh_properties() -> bool:
     """
-    for type, file in configs.items():
-        with open(file, "rb") as f:
-            global properties
-            properties[type] = toml.load(f)
+    Swap in the published balance version when it changed. Only reads the version file once per check interval, in
+    between this is a single comparison.
 
+    :return: Whether a new version was swapped in, a version that can't be loaded is logged and the current one is
+        kept until the next check
+    """
+    global _snapshot, _next_check
+    now: float = time.monotonic()
+    if now < _next_check:
+        return False
+    # One thread checks, the others keep using the current snapshot meanwhile
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    try:
+        _next_check = now + config_data.get("properties_check_interval", 1.0)
+        version: int = published_version()
+        if version == _snapshot.version:
+            return False
+        try:
+            _snapshot = load_snapshot(version)
+        except PropertyError:
+            logger.exception("Balance version %s can't be loaded, keeping version %s", version, _snapshot.version)
+            return False
+        return True
+    finally:
+        _reload_lock.release()
 
-load_properties()
 
+def publish_properties() -> int:
+    """
+    Publish the property files as a new balance version, once they compile. The files are copied, the workers load
+    the copies of the version.
 
-def get_property(type: str, *args, properties=properties) -> Any:
+    :return: The new version
+    :raise PropertyError: When the files don't compile, nothing is published then
+    """
+    version: int = published_version() + 1
+    published_dir: str = os.path.dirname(next(iter(published_configs(version).values())))
+    os.makedirs(os.path.dirname(published_dir), exist_ok=True)
+
+    # The copies are made in a directory of their own that is renamed once they are complete
+    staging_dir: str = tempfile.mkdtemp(dir=os.path.dirname(published_dir))
+    try:
+        staged: dict[str, str] = {}
+        for type, file in configs.items():
+            staged[type] = os.path.join(staging_dir, os.path.basename(file))
+            shutil.copyfile(file, staged[type])
+        # The copies are checked instead of the files, which could be edited meanwhile
+        load_snapshot(version, staged)
+        if os.path.isdir(published_dir):  # left by a publish that stopped before the version file was written
+            shutil.rmtree(published_dir)
+        os.rename(staging_dir, published_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    # The file is replaced as a whole, so a worker never reads half a version
+    directory: str = os.path.dirname(VERSION_FILE) or "."
+    with tempfile.NamedTemporaryFile("w", dir=directory, delete=False) as f:
+        f.write(str(version))
+    os.replace(f.name, VERSION_FILE)
+    return version
+
+
+def __getattr__(name: str) -> Any:
+    # The properties and compiled tables of the current snapshot, for code that reads them directly
+    if name in ("properties", "compiled", "version"):
+        return getattr(_snapshot, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def kind_stats(category: str, kind: str) -> KindStats:
+    """Get the compiled properties of a kind"""
+    try:
+        return _snapshot.compiled[category][kind]
+    except KeyError:
+        raise PropertyError(f"Property '{kind}' not found in the {category} properties")
+
+
+def _level(category: str, kind: str, level: int) -> Any:
+    try:
+        stats = _snapshot.compiled[category][kind].levels[level]
+    except (KeyError, IndexError):
+        stats = None
+    if stats is None:
+        raise PropertyError(f"Level {level} of '{kind}' not found in the {category} properties")
+    return stats
+
+
+def building_level(building: str, level: int) -> BuildingLevel:
+    """Get the stats of a level of a building"""
+    return _level("building", building, level)
+
+
+def unit_level(unit: str, level: int) -> UnitLevel:
+    """Get the stats of a level of a unit"""
+    return _level("unit", unit, level)
+
+
+def spaceship_level(spaceship: str, level: int) -> SpaceshipLevel:
+    """Get the stats of a level of a spaceship"""
+    return _level("spaceship", spaceship, level)
+
+
+def get_property(type: str, *args, properties: dict[str, Any] | None = None) -> Any:
     """
     Get a property from the properties' config.
 
@@ -38,6 +318,9 @@ def get_property(type: str, *args, properties=properties) -> Any:
     >>> get_property("farm", "level", 1, "build_cost")
     """
 
+    if properties is None:
+        properties = _snapshot.properties
+
     res: Any = properties.get(type)
     if res is None:
         raise PropertyError(f"Property '{type}' not found")
@@ -61,32 +344,45 @@ def get_property(type: str, *args, properties=properties) -> Any:
     return res
 
 
-def gets_property(*props):
-    def wrapper(func) -> Any:
-        @wraps(func)
-        def inner(*args, **kwargs):
-            prop = get_property(*props)
-            if prop is None:
-                raise PropertyError(f"No '{type}' properties loaded")
-            return func(*args, **kwargs, properties=prop)
-
-        return inner
+def _lookup(category: str, kind: str, args: tuple) -> Any:
+    # A stat of a level or of the kind is read from the compiled table, other paths walk the config
+    if len(args) == 3 and args[0] == "level":
+        value = getattr(_level(category, kind, int(args[1])), args[2], None)
+    elif len(args) == 1 and args[0] in KindStats._fields and args[0] != "levels":
+        value = getattr(kind_stats(category, kind), args[0])
+    else:
+        return get_property(kind, *args, properties=_snapshot.properties[category])
 
-    return wrapper
+    if value is None:
+        raise PropertyError(f"Property '{'.'.join(map(str, (kind, *args)))}' not found in the {category} properties")
+    return value
 
 
-@gets_property("building")
-def get_building_property(building: str, *args, properties) -> Any:
+def get_building_property(building: str, *args) -> Any:
     """Get building properties"""
-    return get_property(building, *args, properties=properties)
+    return _lookup("building", building, args)
 
 
-@gets_property("unit")
-def get_unit_property(unit: str, *args, properties) -> Any:
+def get_unit_property(unit: str, *args) -> Any:
     """Get unit properties"""
-    return get_property(unit, *args, properties=properties)
+    return _lookup("unit", unit, args)
 
-@gets_property("spaceship")
-def get_spaceship_property(spaceship: str, *args, properties) -> Any:
+
+def get_spaceship_property(spaceship: str, *args) -> Any:
     """Get spaceship properties"""
-    return get_property(spaceship, *args, properties=properties)
\ No newline at end of file
+    return _lookup("spaceship", spaceship, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--publish", action="store_true", help="publish the property files as a new balance version")
+    args = parser.parse_args()
+
+    if args.publish:
+        print(f"Published balance version {publish_properties()}")
+    else:
+        print(f"Balance version {published_version()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Amounts of the resources of a planet. Costs, gains and transfers are written with :meth:`Planet.spend`,
+:meth:`Planet.receive` and :meth:`Planet.transfer`, which change the balance in SQL instead of in Python.
+"""
+
+from typing import NamedTuple
+
+
+class Resources(NamedTuple):
+    """An amount of every resource, like the cost of a building or the loot of an attack"""
+
+    building_materials: int = 0
+    rations: int = 0
+
+    def __neg__(self) -> "Resources":
+        return Resources(-self.building_materials, -self.rations)
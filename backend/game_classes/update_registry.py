@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+from uuid import UUID
+
+from database.conflicts import retry_hooks
+
+
+class UpdateRegistry:
+    """
+    Keeps track of the users that were already brought up to date in the current request.
+    Updating a user again in the same request is a no-op, as hardly any time has passed.
+    """
+
+    def __init__(self) -> None:
+        self.updated: set[UUID] = set()
+        "Ids of the users that were updated"
+
+        self.absorbed: int = 0
+        "Amount of redundant updates that were skipped"
+
+    def claim(self, user_id: UUID) -> bool:
+        """
+        Claim the update of a user.
+
+        :param user_id: Id of the user that is about to be updated
+        :return: Whether the user still has to be updated, False if it already was in this request
+        """
+        if user_id in self.updated:
+            self.absorbed += 1
+            return False
+
+        self.updated.add(user_id)
+        return True
+
+
+_current: ContextVar[UpdateRegistry | None] = ContextVar("update_registry", default=None)
+
+
+def current_registry() -> UpdateRegistry | None:
+    """Get the registry of the current request, None when not in a request"""
+    return _current.get()
+
+
+def begin_registry() -> Token:
+    """Start a new registry, returns the token to pass to :func:`end_registry`"""
+    return _current.set(UpdateRegistry())
+
+
+def _forget_updates() -> None:
+    # The updates of a transaction that is retried were rolled back, so its users have to be updated again
+    registry: UpdateRegistry | None = _current.get()
+    if registry is not None:
+        registry.updated.clear()
+
+
+retry_hooks.append(_forget_updates)
+
+
+def end_registry(token: Token) -> UpdateRegistry:
+    """End the registry started with the given token, returns the ended registry"""
+    registry: UpdateRegistry = _current.get()
+    _current.reset(token)
+    return registry
+
+
+@contextmanager
+def update_scope() -> Iterator[UpdateRegistry]:
+    """
+    Run a block with its own registry, for work that doesn't run in a request.
+
+    >>> with update_scope() as registry:
+    ...     user.update()
+    ...     user.update()  # no-op
+    >>> registry.absorbed
+    1
+    """
+    token: Token = begin_registry()
+    try:
+        yield current_registry()
+    finally:
+        end_registry(token)
@@ -0,0 +1,184 @@
+"""
+Onboarding of new players: the user, its first planet, the settlement on it and the town hall in the settlement are
+created in a single transaction.
+
+All objects are added to the session before the first flush, so every table gets one batched ``INSERT``, no matter how
+many accounts are created at once. Run with ``python -m backend.onboarding --accounts 1000`` to create accounts for a
+load test.
+"""
+
+import argparse
+import math
+import random
+from typing import Iterable, Iterator, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.game_classes import Planet, Settlement, TimerEvent, TimerKind, TownHall, User
+from backend.game_classes.General import check_password
+from database.database_access import auto_session, commit, unit_of_work
+
+TOWN_HALL_POS: tuple[int, int] = (2, 2)
+"Position of the town hall on the grid of the first settlement"
+
+MIN_DISTANCE: int = 500
+"A new planet must be further than this from some planet, like in :meth:`Planet.generateNewPlanetCoordinates`"
+
+MAX_DISTANCE: int = 3000
+"A new planet must be closer than this to some planet, like in :meth:`Planet.generateNewPlanetCoordinates`"
+
+
+class _PlanetGrid:
+    """
+    Coordinates of the planets, sorted in cells of :data:`MIN_DISTANCE` wide. A new planet is placed by the same rules
+    as :meth:`Planet.generateNewPlanetCoordinates`, but only looks at the planets in the cells around it, so placing a
+    batch of planets doesn't compare every planet with every other one.
+    """
+
+    def __init__(self, coordinates: Iterable[tuple[int, int]]) -> None:
+        self.cells: dict[tuple[int, int], set[tuple[int, int]]] = {}
+        self.count: int = 0
+        self.largest_x: int = 0
+        self.largest_y: int = 0
+        for coordinate in coordinates:
+            self.add(coordinate)
+
+    def add(self, coordinate: tuple[int, int]) -> None:
+        """Add the coordinate of a planet"""
+        x, y = coordinate
+        self.cells.setdefault((x // MIN_DISTANCE, y // MIN_DISTANCE), set()).add(coordinate)
+        self.count += 1
+        self.largest_x = max(self.largest_x, x)
+        self.largest_y = max(self.largest_y, y)
+
+    def around(self, x: int, y: int, distance: int) -> Iterator[tuple[int, tuple[int, int]]]:
+        """Get the planets in the cells that are at most ``distance`` away, with their distance"""
+        reach: int = math.ceil(distance / MIN_DISTANCE)
+        cell_x, cell_y = x // MIN_DISTANCE, y // MIN_DISTANCE
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                for coord in self.cells.get((cell_x + dx, cell_y + dy), ()):
+                    yield math.sqrt((coord[0] - x) ** 2 + (coord[1] - y) ** 2), coord
+
+    def pick(self) -> tuple[int, int]:
+        """Pick the coordinate of a new planet and add it"""
+        if self.count == 0:
+            self.add((5000, 5000))
+            return 5000, 5000
+
+        while True:
+            x = random.randint(0, int(self.largest_x * 1.5))
+            y = random.randint(0, int(self.largest_y * 1.5))
+
+            # Some planet is far enough away when not all of them are close by
+            near: int = sum(1 for distance, _coord in self.around(x, y, MIN_DISTANCE) if distance <= MIN_DISTANCE)
+            far_enough_away: bool = near < self.count
+            close_enough: bool = any(distance < MAX_DISTANCE for distance, _coord in self.around(x, y, MAX_DISTANCE))
+
+            if far_enough_away and close_enough:
+                self.add((x, y))
+                return x, y
+
+
+class Account(NamedTuple):
+    """Account of a new player"""
+
+    user_name: str
+    password: str
+    planet_name: str
+
+
+@auto_session
+def check_accounts(accounts: list[Account], session: Session = None) -> str:
+    """
+    Check whether the accounts can be created.
+
+    :return: "correct", or the reason the first account that can't be created is refused
+    """
+    for account in accounts:
+        password_check: str = check_password(account.password)
+        if password_check != "correct":
+            return password_check
+
+    names: list[str] = [account.user_name for account in accounts]
+    if len(set(names)) < len(names) or session.scalar(select(User.user_id).where(User.user_name.in_(names)).limit(1)):
+        return "Username already exists"
+
+    planet_names: list[str] = [account.planet_name for account in accounts]
+    if len(set(planet_names)) < len(planet_names) or session.scalar(
+        select(Planet.planet_id).where(Planet.planet_name.in_(planet_names)).limit(1)
+    ):
+        return "Planet name already exists"
+    return "correct"
+
+
+@auto_session
+def create_accounts(accounts: list[Account], session: Session = None) -> list[User]:
+    """
+    Create the accounts with their first planet, settlement and town hall. The accounts must pass
+    :func:`check_accounts`.
+
+    :return: The users of the accounts
+    """
+    grid = _PlanetGrid(session.execute(select(Planet.planet_x, Planet.planet_y)).tuples())
+
+    users: list[User] = []
+    town_halls: list[TownHall] = []
+    for account in accounts:
+        user = User(account.user_name, account.password)
+        planet_x, planet_y = grid.pick()
+        planet = Planet(user.user_id, planet_x, planet_y, account.planet_name)
+        settlement = Settlement(0, planet.planet_id)
+        town_hall = TownHall(settlement.settlement_id, *TOWN_HALL_POS)
+
+        # The objects are new, so the collections are filled without loading them
+        user.planets.append(planet)
+        planet.settlements.append(settlement)
+        settlement.buildings.append(town_hall)
+
+        # Built like Settlement.build does, the first level is paid for and under construction
+        planet.building_materials -= town_hall.build_cost
+        town_hall.construction_time_left = town_hall.build_cost
+        town_hall.level = 1
+
+        users.append(user)
+        town_halls.append(town_hall)
+
+    session.add_all(users)
+    # The events don't have a relationship to their user, so they are only inserted once the users exist
+    session.flush()
+    for user, town_hall in zip(users, town_halls):
+        if town_hall.construction_completes_at is None:
+            continue
+        TimerEvent.schedule(
+            user.user_id, TimerKind.CONSTRUCTION, town_hall.building_id, town_hall.construction_time_left,
+            session=session,
+        )
+    commit(session)
+    return users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, required=True, help="amount of accounts to create")
+    parser.add_argument("--prefix", default="load_user", help="user and planet names are the prefix and a number")
+    parser.add_argument("--password", default="Password1", help="password of all accounts")
+    parser.add_argument("--batch", type=int, default=1_000, help="accounts per transaction")
+    args = parser.parse_args()
+
+    for start in range(0, args.accounts, args.batch):
+        accounts: list[Account] = [
+            Account(f"{args.prefix}_{i}", args.password, f"{args.prefix}_planet_{i}")
+            for i in range(start, min(start + args.batch, args.accounts))
+        ]
+        with unit_of_work() as session:
+            result: str = check_accounts(accounts, session=session)
+            if result != "correct":
+                raise SystemExit(f"Can't create {accounts[0].user_name} to {accounts[-1].user_name}: {result}")
+            create_accounts(accounts, session=session)
+        print(f"Created {accounts[-1].user_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import pytest
+
+from backend.game_classes import Attack, Barrack, Planet, Settlement, SpaceMarine, User
+from database.database_access import DefaultSession
+from database.query_counter import count_queries
+
+
+def build_army(session, user_name: str, position: int, units: int) -> Planet:
+    """Create a user with a planet with a barrack of space marines"""
+    user = User(user_name, "Test_password1")
+    session.add(user)
+    session.flush()
+    planet = Planet(user.user_id, position, position, f"{user_name}_planet")
+    session.add(planet)
+    session.flush()
+    settlement = Settlement(0, planet.planet_id)
+    session.add(settlement)
+    session.flush()
+    barrack = Barrack(settlement.settlement_id, 1, 1, level=1)
+    session.add(barrack)
+    session.flush()
+    session.add_all([SpaceMarine(barrack.building_id, level=level % 4 + 1) for level in range(units)])
+    return planet
+
+
+@pytest.mark.usefixtures("clear-db")
+@pytest.mark.parametrize("units", [2, 50])
+def test_auto_resolve_in_one_request(request, units: int):
+    client = request.getfixturevalue("api-client")
+    with DefaultSession() as session:
+        attacker = build_army(session, "attacker", 0, units)
+        defender = build_army(session, "defender", 1, units)
+        session.commit()
+        session.add(attacker.attack(defender.planet_id))
+        session.commit()
+    with client.session_transaction() as flask_session:
+        flask_session["user_name"] = "attacker"
+
+    with count_queries() as stats:
+        response = client.post("/api/combat/auto_resolve", json={"params": {"planet_name": "attacker_planet"}})
+    assert response.status_code == 200, response.data
+    battle = response.json
+    assert battle["combat_result"] in ("Win", "Lose")
+    assert len(battle["rounds"]) >= units
+    assert all(len(duel) == len(battle["round_fields"]) for duel in battle["rounds"])
+
+    # The statements don't grow with the size of the armies or the number of rounds
+    assert stats.statements <= 25
+    assert stats.repeated() == {}
+
+    with DefaultSession() as session:
+        assert session.query(Attack).count() == 0
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import select
+
+from backend.game_classes import Barrack, Farm, Settlement, SpaceDrone, SpaceMarine, TownHall
+from backend.tests.test_loader_profiles import build_empire
+from database.database_access import DefaultSession
+from database.query_counter import count_queries
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_unit_insert_statements():
+    with DefaultSession() as session:
+        build_empire(session, "unit_user", 1)
+        barrack = session.scalars(select(Barrack)).one()
+        marine, drone = SpaceMarine(barrack.building_id), SpaceDrone(barrack.building_id)
+
+        # A row in units and one in attack_units, the unit types have no table of their own
+        for unit in (marine, drone):
+            with count_queries() as stats:
+                session.add(unit)
+                session.flush()
+            assert stats.statements == 2
+        drone_id = drone.unit_id
+        session.commit()
+
+    with DefaultSession() as session:
+        units = session.scalars(select(SpaceMarine)).all()
+        assert [unit.combats_survived for unit in units] == [0, 0, 0]
+        assert isinstance(session.get(SpaceDrone, drone_id), SpaceDrone)
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_settlement_load_statements():
+    with DefaultSession() as session:
+        build_empire(session, "building_user", 1)
+        settlement = session.scalars(select(Settlement)).one()
+        session.add(TownHall(settlement.settlement_id, 0, 0))
+        session.commit()
+
+    with DefaultSession() as session:
+        settlement = session.scalars(select(Settlement)).one()
+        # The buildings are loaded with the columns of their types in one statement
+        with count_queries() as stats:
+            buildings = settlement.buildings
+            farm = next(building for building in buildings if isinstance(building, Farm))
+            assert farm.stored_resources >= 0
+            assert next(building for building in buildings if isinstance(building, Barrack)).space_marine_level == 1
+        assert stats.statements == 1
+        assert {type(building) for building in buildings} == {Farm, Barrack, TownHall}
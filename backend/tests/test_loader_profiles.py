@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import event
+
+from backend.game_classes import Barrack, Farm, Planet, Settlement, SpaceMarine, User
+from database.database_access import DefaultSession, engine
+
+
+def build_empire(session, user_name: str, settlements: int) -> None:
+    """Create a user with a planet with the given amount of settlements, each with a farm and a barrack of 2 units"""
+    user = User(user_name, "Test_password1")
+    session.add(user)
+    session.flush()
+    planet = Planet(user.user_id, settlements, settlements, f"{user_name}_planet")
+    session.add(planet)
+    session.flush()
+    for settlement_nr in range(settlements):
+        settlement = Settlement(settlement_nr, planet.planet_id)
+        session.add(settlement)
+        session.flush()
+        barrack = Barrack(settlement.settlement_id, 1, 1, level=1)
+        session.add_all([Farm(settlement.settlement_id, 2, 2, level=1), barrack])
+        session.flush()
+        session.add_all([SpaceMarine(barrack.building_id), SpaceMarine(barrack.building_id)])
+    session.commit()
+
+
+def count_queries(user_name: str, profile: str | None) -> tuple[int, int]:
+    """Load the user with the profile and walk its tree, returns the queries and the attack power"""
+    queries: list[int] = []
+
+    def count(*_args) -> None:
+        queries.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with DefaultSession() as session:
+            user = User.load_by_name(user_name, profile=profile, session=session)
+            attack_power = sum(planet.get_attack_power() for planet in user.planets)
+            grids = [settlement.get_grid(True) for planet in user.planets for settlement in planet.settlements]
+            assert all(len(grid) == 5 for grid in grids)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return len(queries), attack_power
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_empire_loads_in_fixed_queries():
+    with DefaultSession() as session:
+        build_empire(session, "small_user", 1)
+        build_empire(session, "large_user", 3)
+
+    small_lazy, small_power = count_queries("small_user", None)
+    large_lazy, large_power = count_queries("large_user", None)
+    small, _ = count_queries("small_user", "empire")
+    large, power = count_queries("large_user", "empire")
+
+    # Lazy loading needs more queries for every settlement, the profile doesn't
+    assert large_lazy > small_lazy
+    assert small == large < large_lazy
+    assert power == large_power == 3 * small_power > 0
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        Planet.get_by_pos(0, 0, profile="everything")
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import event, func, select
+
+from backend.api.account import register
+from backend.game_classes import Planet, Settlement, TownHall, User
+from backend.onboarding import Account, check_accounts, create_accounts
+from database.database_access import DefaultSession, engine, unit_of_work
+
+PLAYER = {"user_name": "test_user", "password": "Test_password1", "planet_name": "test_planet"}
+"Player that registers"
+
+
+def onboard(accounts: int) -> tuple[int, int]:
+    """Create accounts in a unit of work, returns the INSERT statements and the commits"""
+    inserts: list[str] = []
+    commits: list[int] = []
+
+    def record(_connection, _cursor, statement: str, *_args) -> None:
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    event.listen(engine, "commit", lambda *_args: commits.append(1))
+    try:
+        batch = [Account(f"user_{accounts}_{i}", "Password1", f"planet_{accounts}_{i}") for i in range(accounts)]
+        with unit_of_work() as session:
+            assert check_accounts(batch, session=session) == "correct"
+            create_accounts(batch, session=session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return len(inserts), len(commits)
+
+
+@pytest.mark.real_transactions
+@pytest.mark.usefixtures("clear-db")
+def test_bulk_onboarding():
+    # Every table gets a single INSERT in a single commit, however many accounts are created
+    inserts, commits = onboard(1)
+    assert onboard(20) == (inserts, commits)
+    assert inserts <= 5 and commits == 1
+
+    with DefaultSession() as session:
+        assert session.scalar(select(func.count()).select_from(User)) == 21
+        assert session.scalar(select(func.count()).select_from(Settlement)) == 21
+        coordinates = session.execute(select(Planet.planet_x, Planet.planet_y)).all()
+        assert len(set(coordinates)) == 21
+        # Every planet is placed close to another one
+        for x, y in coordinates:
+            assert any(0 < (x - other_x) ** 2 + (y - other_y) ** 2 < 3000**2 for other_x, other_y in coordinates)
+        town_hall = session.scalars(select(TownHall)).first()
+        assert town_hall.level == 1
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_refused_accounts():
+    with DefaultSession() as session:
+        assert check_accounts([Account("user", "password", "planet")], session=session) == "Password needs capital letter"
+        duplicate = [Account("user", "Password1", "planet_1"), Account("user", "Password1", "planet_2")]
+        assert check_accounts(duplicate, session=session) == "Username already exists"
+        duplicate = [Account("user_1", "Password1", "planet"), Account("user_2", "Password1", "planet")]
+        assert check_accounts(duplicate, session=session) == "Planet name already exists"
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_register(request):
+    client = request.getfixturevalue("api-client")
+    assert client.post("/api/account/register", json=PLAYER).status_code == 200
+    assert client.post("/api/account/register", json=PLAYER).data == b"Username already exists"
+
+    with DefaultSession() as session:
+        user = User.load_by_name(PLAYER["user_name"], session=session)
+        assert [planet.planet_name for planet in user.planets] == [PLAYER["planet_name"]]
+        assert [type(building) for building in user.planets[0].settlements[0].buildings] == [TownHall]
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_register_taken_names(request, monkeypatch):
+    client = request.getfixturevalue("api-client")
+    assert client.post("/api/account/register", json=PLAYER).status_code == 200
+    response = client.post("/api/account/register", json={**PLAYER, "user_name": "other_user"})
+    assert (response.status_code, response.data) == (400, b"Planet name already exists")
+
+    # A name taken between the check and the insert is refused the same way
+    monkeypatch.setattr(register, "check_accounts", lambda *_args, **_kwargs: "correct")
+    response = client.post("/api/account/register", json={**PLAYER, "user_name": "other_user"})
+    assert (response.status_code, response.data) == (400, b"Username or planet name already exists")
@@ -0,0 +1,126 @@
+import pytest
+
+from backend.game_classes import properties as properties_module
+from backend.game_classes.properties import (
+    PropertyError,
+    building_level,
+    compile_properties,
+    compiled,
+    get_building_property,
+    get_unit_property,
+    kind_stats,
+    properties,
+    unit_level,
+)
+
+
+def test_compiled_tables_match_the_config():
+    for category, config in properties.items():
+        for kind, values in config.items():
+            stats = kind_stats(category, kind)
+            assert (stats.display_name, stats.max_level, stats.size) == (
+                values["display_name"],
+                values["max_level"],
+                values.get("size"),
+            )
+            assert stats.levels[0] is None
+            for level, level_values in values["level"].items():
+                row = stats.levels[int(level)]
+                for name, value in level_values.items():
+                    assert getattr(row, name) == value
+
+
+def test_derived_values():
+    farm = properties["building"]["farm"]["level"]
+    assert building_level("farm", 2).fill_up_time == farm["2"]["capacity"] / farm["2"]["production_rate"] * 3600
+    assert building_level("farm", 3).cumulative_cost == sum(farm[str(level)]["build_cost"] for level in (1, 2, 3))
+    assert building_level("barrack", 1).fill_up_time is None
+    assert unit_level("space_marine", 4).cumulative_upgrade_cost == sum(
+        properties["unit"]["space_marine"]["level"][str(level)]["upgrade_cost"] for level in range(1, 5)
+    )
+
+
+def test_getters():
+    assert get_building_property("farm", "level", "2", "capacity") == building_level("farm", 2).capacity
+    assert get_unit_property("space_drone", "size") == compiled["unit"]["space_drone"].size
+    # Paths that aren't a stat still walk the config
+    assert get_building_property("farm", "level") is properties["building"]["farm"]["level"]
+
+    with pytest.raises(PropertyError):
+        get_building_property("town_hall", "level", "1", "capacity")
+    with pytest.raises(PropertyError):
+        get_building_property("farm", "level", "9", "capacity")
+    with pytest.raises(PropertyError):
+        building_level("castle", 1)
+    with pytest.raises(PropertyError):
+        building_level("farm", 0)
+
+
+def test_invalid_config():
+    farm = {"display_name": "Farm", "max_level": 2, "level": {"1": {"build_cost": 1, "upgrade_time": 1}}}
+    with pytest.raises(PropertyError, match="levels 1 to 2"):
+        compile_properties("building", {"farm": farm})
+
+    farm["max_level"] = 1
+    farm["level"]["1"]["harvest"] = 3
+    with pytest.raises(PropertyError, match="harvest"):
+        compile_properties("building", {"farm": farm})
+
+
+@pytest.fixture
+def balance_files(tmp_path, monkeypatch):
+    """Copies of the property files and a version file of their own, the snapshot is restored afterwards"""
+    copies: dict[str, str] = {}
+    for category, file in properties_module.configs.items():
+        copy = tmp_path / f"{category}.toml"
+        copy.write_bytes(open(file, "rb").read())
+        copies[category] = str(copy)
+    monkeypatch.setattr(properties_module, "configs", copies)
+    monkeypatch.setattr(properties_module, "VERSION_FILE", str(tmp_path / "properties.version"))
+    monkeypatch.setattr(properties_module, "_snapshot", properties_module._snapshot)
+    monkeypatch.setattr(properties_module, "_next_check", 0.0)
+    yield copies
+
+
+def test_hot_reload(balance_files, monkeypatch):
+    assert properties_module.published_version() == 0
+    assert not properties_module.refresh_properties()
+
+    # Edited files are only used once they are published
+    unit_file = balance_files["unit"]
+    config = open(unit_file).read().replace("attack_power     = 20", "attack_power     = 25", 1)
+    open(unit_file, "w").write(config)
+    monkeypatch.setattr(properties_module, "_next_check", 0.0)
+    assert not properties_module.refresh_properties()
+    assert unit_level("space_commando", 1).attack_power == 20
+
+    assert properties_module.publish_properties() == 1
+    # Within the check interval the version file isn't read
+    assert not properties_module.refresh_properties()
+    monkeypatch.setattr(properties_module, "_next_check", 0.0)
+    assert properties_module.refresh_properties()
+    assert properties_module.version == 1
+    assert unit_level("space_commando", 1).attack_power == 25
+    assert get_unit_property("space_commando", "level", "1", "attack_power") == 25
+
+    # The version keeps the properties it was published with, a worker that loads it later doesn't see later edits
+    open(unit_file, "w").write(config.replace("attack_power     = 25", "attack_power     = 30", 1))
+    properties_module.load_properties()
+    assert unit_level("space_commando", 1).attack_power == 25
+
+
+def test_broken_files_are_not_published(balance_files):
+    open(balance_files["building"], "a").write('\n[castle]\ndisplay_name = "Castle"\nmax_level = 1\n')
+    with pytest.raises(PropertyError):
+        properties_module.publish_properties()
+    assert properties_module.published_version() == 0
+
+
+def test_failed_reload_keeps_the_current_version(balance_files, caplog):
+    assert properties_module.publish_properties() == 1
+    open(properties_module.published_configs(1)["unit"], "a").write("[broken")
+
+    assert not properties_module.refresh_properties()
+    assert properties_module.version == 0
+    assert "Balance version 1 can't be loaded" in caplog.text
+    assert unit_level("space_commando", 1).attack_power == 20
@@ -0,0 +1,27 @@
+import pytest
+
+from database.query_counter import count_queries
+
+PLAYER = {"user_name": "test_user", "password": "Test_password1", "planet_name": "test_planet"}
+"Player that registers for the requests"
+
+BUDGETS: list[tuple[str, dict, int]] = [
+    ("/api/user", {}, 4),
+    ("/api/planet", {"planet_number": 0, "include_settlements": True}, 4),
+    ("/api/settlement", {"planet_number": 0, "settlement_number": 0, "include_grid": True}, 4),
+    ("/api/planet/all", {}, 2),
+]
+"Path, arguments and the statements the request may execute"
+
+
+@pytest.mark.usefixtures("clear-db")
+@pytest.mark.parametrize("path, args, budget", BUDGETS)
+def test_query_budget(request, path: str, args: dict, budget: int):
+    client = request.getfixturevalue("api-client")
+    assert client.post("/api/account/register", json=PLAYER).status_code == 200
+
+    with count_queries() as stats:
+        response = client.get(path, query_string=args)
+    assert response.status_code == 200, response.data
+    assert stats.statements <= budget
+    assert stats.repeated() == {}
@@ -0,0 +1,128 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.game_classes import Farm, Planet, Resources, Settlement, User
+from database.database_access import Base
+from database.query_counter import count_queries
+
+
+@pytest.fixture
+def planets(tmp_path):
+    """A SQLite file with two planets, shared by the sessions of a test"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'resources.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.flush()
+        planet = Planet(user.user_id, 0, 0, "test_planet")
+        other = Planet(user.user_id, 1, 1, "other_planet")
+        planet.building_materials, planet.rations = 1000, 500
+        other.building_materials, other.rations = 0, 0
+        session.add_all([planet, other])
+        session.commit()
+        planet_ids = planet.planet_id, other.planet_id
+    yield engine, planet_ids
+    engine.dispose()
+
+
+def test_spend_in_one_statement(planets):
+    engine, (planet_id, _other_id) = planets
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        with count_queries() as stats:
+            assert planet.spend(Resources(building_materials=300, rations=100), session=session)
+        assert stats.statements == 1
+        assert (planet.building_materials, planet.rations) == (700, 400)
+
+        # A cost the planet can't pay takes nothing, not even the resources it does have enough of
+        assert not planet.spend(Resources(building_materials=100, rations=401), session=session)
+        assert (planet.building_materials, planet.rations) == (700, 400)
+
+        # The balance was set as loaded, the commit doesn't write the planet again
+        with count_queries() as stats:
+            session.commit()
+        assert stats.statements == 0
+
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        assert (planet.building_materials, planet.rations) == (700, 400)
+
+
+def test_concurrent_spending_never_overdraws(planets):
+    engine, (planet_id, _other_id) = planets
+    with Session(engine) as first, Session(engine) as second:
+        first_planet = first.get(Planet, planet_id)
+        second_planet = second.get(Planet, planet_id)
+
+        # Both loaded 1000 building materials, only one of them can spend 600
+        assert first_planet.spend(Resources(building_materials=600), session=first)
+        first.commit()
+        assert not second_planet.spend(Resources(building_materials=600), session=second)
+
+        # The failed spend doesn't refresh the planet, a write of the old balance still conflicts
+        second_planet.rations += 10
+        with pytest.raises(StaleDataError):
+            second.commit()
+
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        assert (planet.building_materials, planet.rations) == (400, 500)
+
+
+def test_spending_refreshes_what_others_spent(planets):
+    engine, (planet_id, _other_id) = planets
+    with Session(engine) as first, Session(engine) as second:
+        first_planet = first.get(Planet, planet_id)
+        second_planet = second.get(Planet, planet_id)
+
+        assert first_planet.spend(Resources(rations=100), session=first)
+        first.commit()
+        assert second_planet.spend(Resources(rations=100), session=second)
+        assert second_planet.rations == 300
+
+        # The planet has the current version again, so writing it works
+        second_planet.building_materials += 5
+        second.commit()
+
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        assert (planet.building_materials, planet.rations) == (1005, 300)
+
+
+def test_transfer(planets):
+    engine, (planet_id, other_id) = planets
+    with Session(engine) as session:
+        planet, other = session.get(Planet, planet_id), session.get(Planet, other_id)
+        assert planet.transfer(other, Resources(250, 125), session=session)
+        assert not other.transfer(planet, Resources(rations=126), session=session)
+        session.commit()
+
+    with Session(engine) as session:
+        planet, other = session.get(Planet, planet_id), session.get(Planet, other_id)
+        assert (planet.building_materials, planet.rations) == (750, 375)
+        assert (other.building_materials, other.rations) == (250, 125)
+
+
+def test_collect_goes_through_receive(planets):
+    engine, (planet_id, _other_id) = planets
+    with Session(engine) as session:
+        settlement = Settlement(0, planet_id)
+        session.add(settlement)
+        session.flush()
+        farm = Farm(settlement.settlement_id, 1, 1, level=1)
+        session.add(farm)
+        session.flush()
+        farm.stored_resources = 150
+        session.commit()
+
+        assert farm.collect_resources(session=session)
+        session.commit()
+        farm_id = farm.building_id
+
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        assert (planet.building_materials, planet.rations) == (1000, 650)
+        assert session.get(Farm, farm_id).stored_resources == 0
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import event
+
+from backend.game_classes import User, Planet, Settlement, Farm
+from database.database_access import DefaultSession, engine, unit_of_work
+
+
+@pytest.mark.real_transactions
+@pytest.mark.usefixtures("clear-db")
+def test_unit_of_work_commits_once():
+    with DefaultSession() as session:
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+        user_id = user.user_id
+
+    commits: list[int] = []
+
+    def count_commit(_connection) -> None:
+        commits.append(1)
+
+    event.listen(engine, "commit", count_commit)
+    try:
+        # The game classes only flush, the unit of work commits once at the end
+        with unit_of_work() as session:
+            user = session.get(User, user_id)
+            planet = Planet(user.user_id, 1, 1, "test_planet")
+            user.add_planet(planet, session=session)
+            planet.store(session=session)
+
+            settlement = Settlement(1, planet.planet_id)
+            planet.add_settlement(settlement, session=session)
+            settlement.store(session=session)
+
+            farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1)
+            planet.building_materials = 1000
+            assert settlement.build(farm, session=session)
+            assert commits == []
+    finally:
+        event.remove(engine, "commit", count_commit)
+
+    assert len(commits) == 1
+    with DefaultSession() as session:
+        assert session.query(Farm).count() == 1
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_unit_of_work_rolls_back_on_error():
+    with DefaultSession() as session:
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+        user_id = user.user_id
+
+    # Changes that were already flushed by a game class are undone as well
+    with pytest.raises(RuntimeError):
+        with unit_of_work() as session:
+            user = session.get(User, user_id)
+            planet = Planet(user.user_id, 1, 1, "test_planet")
+            user.add_planet(planet, session=session)
+            planet.store(session=session)
+            raise RuntimeError("request failed")
+
+    with DefaultSession() as session:
+        assert session.query(Planet).count() == 0
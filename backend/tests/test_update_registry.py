@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import event
+from backend.game_classes import User, Planet, Settlement, Farm, Mine, clock
+from backend.game_classes.update_registry import current_registry, update_scope
+from database.database_access import DefaultSession, engine
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_repeated_updates_are_absorbed():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user with a farm that is gathering
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        # A farm that is built in a minute and a mine that is built in two hours
+        farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1, level=1)
+        mine = Mine(settlement_id=settlement.settlement_id, grid_pos_x=2, grid_pos_y=2, level=1)
+        session.add_all([farm, mine])
+        session.commit()
+        farm.construction_time_left = 60
+        mine.construction_time_left = 2 * 3600
+        session.commit()
+
+        # Within a scope, only the first update counts
+        with update_scope() as registry:
+            clock.advance(3600)
+            user.update(session=session)
+            assert farm.construction_completes_at is None
+            assert user.last_update == clock.now()
+
+            clock.advance(3600)
+            user.update(session=session)
+            user.update(session=session)
+            assert mine.construction_completes_at is not None
+            assert registry.absorbed == 2
+
+        # Outside a scope every update counts
+        assert current_registry() is None
+        user.update(session=session)
+        assert mine.construction_completes_at is None
+        assert user.last_update == clock.now()
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_update_without_completed_timers_writes_nothing():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user with a farm that is gathering
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1, level=1)
+        session.add(farm)
+        session.commit()
+        farm.start_gathering()
+        session.commit()
+        last_update = user.last_update
+
+        # The farm gathers without being written, so an update before it is full doesn't write anything
+        clock.advance(3600)
+        statements: list[str] = []
+
+        def record(_connection, _cursor, statement, *_args) -> None:
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            user.update(session=session)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert not any(statement.startswith(("UPDATE", "INSERT", "DELETE")) for statement in statements)
+        assert user.last_update == last_update
+        assert farm.stored_resources == 200
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.game_classes import User, Planet, Settlement, Farm, TimerEvent, TimerKind, clock
+from backend.worker import apply_events
+from database import conflicts
+from database.database_access import DefaultSession
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_worker_applies_due_events():
+    with DefaultSession(autoflush=False) as session:
+        # Add a user with a planet and a settlement
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        # Building a farm schedules the end of its construction
+        farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=3, grid_pos_y=3)
+        assert settlement.build(farm, session=session)
+        session.commit()
+        events = session.query(TimerEvent).all()
+        assert len(events) == 1
+        assert events[0].kind == TimerKind.CONSTRUCTION
+        assert events[0].target_id == farm.building_id
+        assert farm.in_construction()
+
+        # Nothing is due yet
+        assert TimerEvent.claim_due(10, session=session) == []
+
+        # The user is away for an hour, so the event is due
+        clock.advance(3600)
+
+        # The worker claims the event, a second claim doesn't get it again
+        claimed = TimerEvent.claim_due(10, session=session)
+        assert len(claimed) == 1
+        assert TimerEvent.claim_due(10, session=session) == []
+
+        # Applying the event finishes the construction and removes the event
+        assert apply_events(claimed, session) == 1
+        assert not farm.in_construction()
+        assert session.query(TimerEvent).count() == 0
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_worker_leaves_conflicting_users_claimed(monkeypatch):
+    monkeypatch.setattr(conflicts, "RETRY_BACKOFF", 0)
+    with DefaultSession(autoflush=False) as session:
+        users = [User(f"test_user{number}", "Test_password1") for number in range(3)]
+        session.add_all(users)
+        session.commit()
+        session.add_all([TimerEvent(user.user_id, TimerKind.CONSTRUCTION, user.user_id, clock.now()) for user in users])
+        session.commit()
+        conflicting_id, failing_id, _user_id = [user.user_id for user in users]
+
+        # One user keeps conflicting with requests, another one fails, the third one is still updated
+        attempts: list[int] = []
+        update = User.update
+
+        def flaky_update(self, session=None):
+            if self.user_id == conflicting_id:
+                attempts.append(1)
+                raise StaleDataError("The planet changed meanwhile")
+            if self.user_id == failing_id:
+                # The update is undone with the rest of the user's transaction
+                self.user_name = "renamed_user"
+                update(self, session=session)
+                raise ValueError("Broken user")
+            return update(self, session=session)
+
+        monkeypatch.setattr(User, "update", flaky_update)
+        assert apply_events(TimerEvent.claim_due(10, session=session), session) == 1
+
+        # The conflicting user was run again, the events of both failed users stay claimed
+        assert len(attempts) == conflicts.RETRY_ATTEMPTS
+        left = session.query(TimerEvent).all()
+        assert {event.user_id for event in left} == {conflicting_id, failing_id}
+        assert all(event.claimed_by is not None for event in left)
+        assert session.get(User, failing_id).user_name == "test_user1"
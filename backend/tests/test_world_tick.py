@@ -0,0 +1,129 @@
+import pytest
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.game_classes import User, Planet, Settlement, Farm, Mine, Barrack, SpaceMarine, clock
+from backend.world_tick import world_tick
+from database import conflicts
+from database.database_access import DefaultSession
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_world_tick(monkeypatch):
+    with DefaultSession(autoflush=False) as session:
+        # Add a user with a planet and a settlement
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.commit()
+
+        planet = Planet(user.user_id, 1, 1, "test_planet")
+        session.add(planet)
+        session.commit()
+
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+
+        # A farm that is gathering, and a mine that is being built
+        farm = Farm(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1, level=1)
+        mine = Mine(settlement_id=settlement.settlement_id, grid_pos_x=2, grid_pos_y=2, level=1)
+        session.add_all([farm, mine])
+        session.commit()
+        farm.start_gathering(session=session)
+        mine.construction_time_left = 60
+        session.commit()
+
+        # Another user with a unit, which is updated object by object
+        busy_user = User("busy_user", "Test_password1")
+        session.add(busy_user)
+        session.commit()
+        busy_planet = Planet(busy_user.user_id, 2, 2, "busy_planet")
+        session.add(busy_planet)
+        session.commit()
+        busy_settlement = Settlement(1, busy_planet.planet_id)
+        session.add(busy_settlement)
+        session.commit()
+        barrack = Barrack(settlement_id=busy_settlement.settlement_id, grid_pos_x=1, grid_pos_y=1)
+        busy_farm = Farm(settlement_id=busy_settlement.settlement_id, grid_pos_x=2, grid_pos_y=2, level=1)
+        session.add_all([barrack, busy_farm])
+        session.commit()
+        marine = SpaceMarine(barrack.building_id)
+        session.add(marine)
+        busy_planet.rations = 100
+        session.commit()
+        busy_farm.start_gathering(session=session)
+        session.commit()
+
+        # An hour passes for both users, the farm gathers and the mine finishes construction
+        clock.advance(3600)
+        assert farm.stored_resources == 200
+        assert farm.gathering_time_left == pytest.approx(4 * 3600)
+
+        # The tick clears the finished construction, the gathering farm has nothing to settle yet
+        mine_version, farm_version = mine.version, farm.version
+        assert world_tick(session=session) == 1
+        assert mine.construction_completes_at is None
+        assert mine.version == mine_version + 1
+        assert farm.version == farm_version
+        assert farm.gathering_completes_at is not None
+        assert farm.stored_resources == 200
+
+        # The busy user went through the regular update, so its unit was fed
+        assert busy_farm.stored_resources == 200
+        assert busy_planet.rations == 100 - marine.rations_per_hour
+
+        # Four more hours fill the farm up, the tick settles it
+        clock.advance(4 * 3600)
+        world_tick(session=session)
+        assert farm.gathering_completes_at is None
+        assert farm.stored_resources == farm.capacity
+        assert farm.gathering_time_left == 0
+        assert farm.version == farm_version + 1
+
+        # A busy user that keeps conflicting is left to the next tick, without stopping the tick
+        monkeypatch.setattr(conflicts, "RETRY_BACKOFF", 0)
+
+        def conflicting_update(self, session=None):
+            raise StaleDataError("The planet changed meanwhile")
+
+        monkeypatch.setattr(User, "update", conflicting_update)
+        mine.start_gathering(session=session)
+        session.commit()
+        clock.advance(5 * 3600)
+        assert world_tick(session=session) == 0
+        assert mine.stored_resources == mine.capacity
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_world_tick_settles_unowned_planets():
+    with DefaultSession(autoflush=False) as session:
+        # A planet nobody owns, next to a user that is busy
+        planet = Planet(None, 1, 1, "free_planet")
+        session.add(planet)
+        session.commit()
+        settlement = Settlement(1, planet.planet_id)
+        session.add(settlement)
+        session.commit()
+        mine = Mine(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1, level=1)
+        session.add(mine)
+        session.commit()
+        mine.construction_time_left = 60
+        session.commit()
+
+        busy_user = User("busy_user", "Test_password1")
+        session.add(busy_user)
+        session.commit()
+        busy_planet = Planet(busy_user.user_id, 2, 2, "busy_planet")
+        session.add(busy_planet)
+        session.commit()
+        busy_settlement = Settlement(1, busy_planet.planet_id)
+        session.add(busy_settlement)
+        session.commit()
+        barrack = Barrack(settlement_id=busy_settlement.settlement_id, grid_pos_x=1, grid_pos_y=1)
+        session.add(barrack)
+        session.commit()
+        session.add(SpaceMarine(barrack.building_id))
+        session.commit()
+
+        clock.advance(3600)
+        assert world_tick(session=session) == 1
+        assert mine.construction_completes_at is None
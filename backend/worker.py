@@ -0,0 +1,103 @@
+"""
+Background worker that applies due timer events, so the state of players that don't log in keeps advancing.
+
+Run with ``python -m backend.worker``, several workers can run next to each other on Postgres.
+"""
+
+import argparse
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from backend.game_classes import TimerEvent, User
+from backend.game_classes.properties import refresh_properties
+from backend.game_classes.update_registry import update_scope
+from database.conflicts import CONFLICTS, retry_on_conflict
+from database.database_access import DefaultSession, commit, unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+@retry_on_conflict
+def apply_user(user_id: UUID, event_ids: list[UUID]) -> None:
+    """
+    Bring a user up to date and remove the applied events, in a unit of work of its own. It is run again when a request
+    changed the same rows meanwhile.
+    """
+    with unit_of_work() as session:
+        user: User | None = session.get(User, user_id)
+        if user is not None:
+            # Arriving ships update their owner again, this is absorbed like in a request
+            with update_scope():
+                user.update(session=session)
+
+        # The events are removed in the same transaction as the update, a crash leaves both undone and the events
+        # claimed, another worker picks them up when the claim expires
+        session.execute(delete(TimerEvent).where(TimerEvent.event_id.in_(event_ids)))
+        commit(session)
+
+
+def apply_events(events: list[TimerEvent], session: Session) -> int:
+    """
+    Apply claimed events by bringing the users they belong to up to date, and remove them.
+
+    :param events: Events claimed by this worker
+    :param session: Session the events were claimed in
+    :return: The amount of users that were updated
+    """
+    event_ids: dict[UUID, list[UUID]] = {}
+    for event in events:
+        event_ids.setdefault(event.user_id, []).append(event.event_id)
+
+    # A user that fails only leaves its own events claimed, they are applied again once the claim expires
+    updated: int = 0
+    for user_id, claimed_ids in event_ids.items():
+        try:
+            apply_user(user_id, claimed_ids)
+        except CONFLICTS:
+            logger.warning("User %s kept conflicting with requests, its events are applied again later", user_id)
+            continue
+        except Exception:
+            logger.exception("Applying the events of user %s failed, they are applied again later", user_id)
+            continue
+        updated += 1
+
+    # The users were updated in units of work of their own, the objects of the claiming session don't know about it
+    session.expire_all()
+    return updated
+
+
+def run(batch_size: int = 100, poll_interval: float = 1.0, once: bool = False) -> None:
+    """
+    Claim and apply due events until stopped.
+
+    :param batch_size: Maximum amount of events to claim at once
+    :param poll_interval: Seconds to wait when there are no due events
+    :param once: Stop once there are no due events left
+    """
+    while True:
+        refresh_properties()
+        with DefaultSession() as session:
+            events: list[TimerEvent] = TimerEvent.claim_due(batch_size, session=session)
+            if len(events) > 0:
+                updated: int = apply_events(events, session)
+                logger.info("Applied %s events for %s users", len(events), updated)
+                continue
+
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=100, help="maximum amount of events to claim at once")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds to wait when nothing is due")
+    parser.add_argument("--once", action="store_true", help="stop once there are no due events left")
+    args = parser.parse_args()
+
+    run(args.batch_size, args.poll_interval, args.once)
@@ -0,0 +1,194 @@
+"""
+Settle the timers of the whole galaxy at once, so finished work is written without its owners logging in.
+
+Timers are stored as the moment they complete, so nothing has to be advanced: finished constructions are cleared and
+farms and mines that filled up are settled with a few set-based ``UPDATE`` statements. Users with units or ships still
+go through :meth:`User.update`, as feeding, training and travelling depend on each other in ways that don't fit a
+single statement.
+
+Run with ``python -m backend.world_tick``.
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, and_, case, literal, or_, select, union, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.game_classes import AttackUnit, Building, Farm, Mine, Planet, Settlement, Ship, User, clock
+from backend.game_classes.properties import BuildingLevel, kind_stats
+from backend.game_classes.update_registry import update_scope
+from database.conflicts import CONFLICTS, ConflictError, retry_on_conflict
+from database.database_access import auto_session, unit_of_work
+
+logger = logging.getLogger(__name__)
+
+SERIALIZATION_FAILURE: str = "40001"
+"SQLSTATE of a Postgres transaction that read rows another transaction changed meanwhile"
+
+
+def _per_level(building: str, prop: str, level: ColumnElement) -> ColumnElement:
+    """
+    Look up a building property of the level stored in the database.
+
+    :param building: Name of the top level building property in the config
+    :param prop: Name of the property of a level
+    :param level: Column holding the level of the building
+    """
+    levels: tuple[BuildingLevel | None, ...] = kind_stats("building", building).levels
+    return case({lvl: getattr(stats, prop) for lvl, stats in enumerate(levels) if stats is not None}, value=level)
+
+
+def _busy_users():
+    """Users that own units or ships, these are updated object by object"""
+    with_units = (
+        select(Planet.user_id)
+        .join(Settlement, Settlement.planet_id == Planet.planet_id)
+        .join(Building, Building.settlement_id == Settlement.settlement_id)
+        .join(AttackUnit.__table__, AttackUnit.__table__.c.building_id == Building.building_id)
+        .where(Planet.user_id.is_not(None))
+    )
+    # A NULL among the busy users would make every ``NOT IN`` unknown
+    with_ships = select(Ship.owner_id).where(Ship.owner_id.is_not(None))
+    return union(with_units, with_ships)
+
+
+@retry_on_conflict
+def _update_user(user_id: UUID) -> None:
+    """
+    Bring a busy user up to date in a unit of work of its own. It is run again when a request changed the same rows
+    meanwhile.
+    """
+    with unit_of_work() as session:
+        user: User | None = session.get(User, user_id)
+        if user is not None:
+            # Arriving ships update their owner again, this is absorbed like in a request
+            with update_scope():
+                user.update(session=session)
+
+
+def _settle(now: datetime, session: Session) -> list[UUID]:
+    """
+    Settle the timers of the users without units or ships with set-based statements, and commit them.
+
+    :return: The users that have units or ships, in the same snapshot as the statements
+    """
+    buildings = Building.__table__
+    farms = Farm.__table__
+    mines = Mine.__table__
+    settlements = Settlement.__table__
+    planets = Planet.__table__
+
+    # Postgres reads every statement at its own snapshot by default, the busy users and the statements below have to
+    # agree on who is busy. A row a request changed since the snapshot fails the transaction, which is then run again
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    busy_user_ids: list[UUID] = list(session.scalars(_busy_users()))
+    now_literal = literal(now, DateTime())
+
+    # We join every building to the user that owns it, so the buildings of busy users are left to their own update.
+    # Busy users are found in the statement itself, a planet without an owner is never busy
+    owned_by_idle_user = and_(
+        buildings.c.settlement_id == settlements.c.settlement_id,
+        settlements.c.planet_id == planets.c.planet_id,
+        or_(planets.c.user_id.is_(None), planets.c.user_id.not_in(_busy_users())),
+    )
+
+    # Construction of every kind of building. Every statement bumps the version of the buildings it changes, so requests
+    # that loaded them before the tick conflict instead of writing back the old timers
+    session.execute(
+        update(buildings)
+        .where(owned_by_idle_user, buildings.c.construction_completes_at <= now_literal)
+        .values(construction_completes_at=None, version=buildings.c.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    # Farms and mines that are done gathering are full
+    for table, name in ((farms, "farm"), (mines, "mine")):
+        # The version is on the buildings table, it is bumped before the timer it guards is cleared
+        session.execute(
+            update(buildings)
+            .where(
+                buildings.c.building_id.in_(
+                    select(table.c.building_id).where(table.c.gathering_completes_at <= now_literal)
+                ),
+                owned_by_idle_user,
+            )
+            .values(version=buildings.c.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            update(table)
+            .where(
+                table.c.building_id == buildings.c.building_id,
+                owned_by_idle_user,
+                table.c.gathering_completes_at <= now_literal,
+            )
+            .values(stored_resources=_per_level(name, "capacity", buildings.c.level), gathering_completes_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    session.commit()
+    return busy_user_ids
+
+
+@retry_on_conflict
+def _settle_transaction(now: datetime, session: Session) -> list[UUID]:
+    """Run :func:`_settle` in a transaction of its own, it is run again when a request changed the same rows meanwhile"""
+    try:
+        return _settle(now, session)
+    except OperationalError as e:
+        session.rollback()
+        if getattr(e.orig, "pgcode", None) == SERIALIZATION_FAILURE:
+            raise ConflictError("A request changed the rows of the world tick") from e
+        raise
+    except BaseException:
+        session.rollback()
+        raise
+
+
+@auto_session
+def world_tick(now: datetime = None, session: Session = None) -> int:
+    """
+    Settle every timer that completed.
+
+    :param now: Time to settle the galaxy at, defaults to the current time of the game clock
+    :param session: Session to run the tick in, what the caller left in it is committed before the tick starts its own
+        transaction
+    :return: The amount of users that were updated object by object, users that failed are left to the next tick
+    """
+    if now is None:
+        now = clock.now()
+
+    session.commit()
+    busy_user_ids: list[UUID] = _settle_transaction(now, session)
+
+    # A user that fails is logged and left to the next tick, the others are still updated
+    updated: int = 0
+    for user_id in busy_user_ids:
+        try:
+            _update_user(user_id)
+        except CONFLICTS:
+            logger.warning("User %s kept conflicting with requests, it is updated on the next tick", user_id)
+            continue
+        except Exception:
+            logger.exception("Updating user %s failed, it is updated on the next tick", user_id)
+            continue
+        updated += 1
+
+    # The objects in the session don't know about the statements above, nor about the units of work of the users
+    session.expire_all()
+    return updated
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    updated: int = world_tick()
+    print(f"World tick done, {updated} users were updated one by one")
@@ -0,0 +1,114 @@
+"""
+Compare playing a battle a round per request, with ``/api/combat/play_round``, to resolving it in one request with
+``/api/combat/auto_resolve``.
+
+Both modes fight the same battle setup: two planets with a barrack of space marines each. The requests, statements and
+seconds of the whole battle are counted. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/combat.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from flask import Flask
+from sqlalchemy import create_engine, event
+
+from backend.api import api_bp
+from backend.game_classes import Barrack, Planet, Settlement, SpaceMarine, User
+from database.database_access import Base, DefaultSession
+
+ATTACKER = "bench_attacker"
+"Name of the attacking user and planet"
+
+
+def setup(engine, units: int) -> None:
+    """Create the two planets in a fresh database, each with a barrack of units, and the attack between them"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with DefaultSession() as session:
+        planets: list[Planet] = []
+        for number, name in enumerate((ATTACKER, "bench_defender")):
+            user = User(user_name=name, user_password="Password1")
+            session.add(user)
+            session.flush()
+            planet = Planet(user_id=user.user_id, planet_x=number, planet_y=number, name=name)
+            session.add(planet)
+            session.flush()
+            settlement = Settlement(planet_id=planet.planet_id, settlement_nr=1)
+            session.add(settlement)
+            session.flush()
+            barrack = Barrack(settlement_id=settlement.settlement_id, grid_pos_x=1, grid_pos_y=1)
+            session.add(barrack)
+            session.flush()
+            session.add_all([SpaceMarine(barrack.building_id, level=level % 4 + 1) for level in range(units)])
+            planets.append(planet)
+        session.commit()
+
+        session.add(planets[0].attack(planets[1].planet_id))
+        session.commit()
+
+
+def run(engine, auto_resolve: bool) -> tuple[int, int, float]:
+    """
+    Fight the battle with the api.
+
+    :return: The requests, statements and seconds it took
+    """
+    app = Flask("bench")
+    app.config["SECRET_KEY"] = "bench"
+    app.register_blueprint(api_bp)
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["user_name"] = ATTACKER
+
+    statements = 0
+
+    def count_statement(*_args) -> None:
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    requests = 0
+    start = time.perf_counter()
+    params = {"params": {"planet_name": ATTACKER, "selected_attack_type": "Space-Marines"}}
+    while True:
+        path = "/api/combat/auto_resolve" if auto_resolve else "/api/combat/play_round"
+        response = client.post(path, json=params)
+        requests += 1
+        assert response.status_code == 200, f"POST {path}: {response.status_code} {response.data}"
+        if response.json["combat_result"]:
+            break
+    seconds = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", count_statement)
+    return requests, statements, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, default=200, help="units on each side")
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    DefaultSession.configure(bind=engine)
+
+    print(f"{'mode':<12} {'requests':>9} {'statements':>11} {'seconds':>9}")
+    for name, auto_resolve in (("per round", False), ("auto resolve", True)):
+        setup(engine, args.units)
+        requests, statements, seconds = run(engine, auto_resolve)
+        print(f"{name:<12} {requests:>9} {statements:>11} {seconds:>9.2f}")
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+
+if __name__ == "__main__":
+    main()
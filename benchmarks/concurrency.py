@@ -0,0 +1,180 @@
+"""
+Compare sync and threaded gunicorn workers under many concurrent clients of an I/O-bound endpoint.
+
+The server runs the api with the same amount of worker processes in both modes, every statement waits ``--db-latency``
+milliseconds to stand in for a slow query or the network between the server and the database. The clients all poll
+``GET /api/race/all`` at once. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/concurrency.py``.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+from flask import Flask
+from gunicorn.app.base import BaseApplication
+from sqlalchemy import create_engine, event
+
+from backend.api import api_bp
+from backend.game_classes import Race, User
+from database.database_access import Base, DefaultSession
+
+HOST = "127.0.0.1"
+"Address the server listens on"
+
+
+class BenchServer(BaseApplication):
+    """Gunicorn serving a given application with the given settings"""
+
+    def __init__(self, application: Flask, options: dict) -> None:
+        self.application: Flask = application
+        self.options: dict = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Flask:
+        return self.application
+
+
+def seed(races: int) -> None:
+    """Create a race with a leader for every race that is listed"""
+    with DefaultSession() as session:
+        for i in range(races):
+            leader = User(f"leader_{i}", "Password1")
+            session.add(leader)
+            session.flush()
+            session.add(Race(f"race_{i}", leader.user_id))
+        session.commit()
+
+
+def wait_for_port(port: int, timeout: float = 10) -> None:
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((HOST, port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+def poll(port: int, requests: int, latencies: list[float], errors: list[int]) -> None:
+    """Send requests one after the other, every request on a new connection like the sync workers require"""
+    for _ in range(requests):
+        start: float = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=120)
+            connection.request("GET", "/api/race/all")
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except OSError:
+            errors.append(0)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(app: Flask, port: int, options: dict, clients: int, requests: int) -> dict:
+    """
+    Serve the app with the options and let the clients poll it at the same time.
+
+    :return: Throughput, latencies and errors
+    """
+    server = multiprocessing.Process(target=BenchServer(app, {"bind": f"{HOST}:{port}", **options}).run)
+    server.start()
+    try:
+        wait_for_port(port)
+        latencies: list[float] = []
+        errors: list[int] = []
+        threads = [threading.Thread(target=poll, args=(port, requests, latencies, errors)) for _ in range(clients)]
+
+        start: float = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds: float = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.join()
+
+    latencies.sort()
+    return {
+        "requests/s": len(latencies) / seconds,
+        "p50 ms": 1000 * statistics.median(latencies) if latencies else 0.0,
+        "p99 ms": 1000 * latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=4, help="requests per client")
+    parser.add_argument("--workers", type=int, default=3, help="worker processes of the server")
+    parser.add_argument("--threads", type=int, default=32, help="threads per worker in threaded mode")
+    parser.add_argument("--db-latency", type=float, default=20, help="milliseconds every statement waits")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    # Every thread of a worker needs its own connection
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}", pool_size=args.threads, max_overflow=0)
+    DefaultSession.configure(bind=engine)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(races=10)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def wait_for_database(*_args) -> None:
+        time.sleep(args.db_latency / 1000)
+
+    engine.dispose()  # the workers open their own connections after forking
+
+    app = Flask("bench")
+    app.config["SECRET_KEY"] = "bench"
+    app.register_blueprint(api_bp)
+
+    modes = {
+        "sync": {"workers": args.workers, "worker_class": "sync", "backlog": 2 * args.clients},
+        f"gthread x{args.threads}": {
+            "workers": args.workers,
+            "worker_class": "gthread",
+            "threads": args.threads,
+            "backlog": 2 * args.clients,
+        },
+    }
+
+    print(f"{args.clients} clients, {args.requests} requests each, {args.workers} workers")
+    print(f"{'mode':<14} {'requests/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for name, options in modes.items():
+        result = run(app, args.port, {**options, "loglevel": "warning"}, args.clients, args.requests)
+        print(
+            f"{name:<14} {result['requests/s']:>12.1f} {result['p50 ms']:>10.1f} {result['p99 ms']:>10.1f} "
+            f"{result['errors']:>8}"
+        )
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+
+if __name__ == "__main__":
+    main()
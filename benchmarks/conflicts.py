@@ -0,0 +1,184 @@
+"""
+Hammer a single planet with concurrent requests and check that no spending or collecting is lost.
+
+Every thread is a logged in client of the same player that collects from its mines and farms, trains space marines and
+upgrades buildings, all of which change the resources of the one planet. Conflicting transactions are retried, so at
+the end the resources on the planet must match what the successful requests gathered and spent. Prints the retry rate
+of the run. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/conflicts.py``.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from uuid import UUID
+
+from flask import Flask
+from sqlalchemy import create_engine, select
+
+from backend.api import api_bp
+from backend.game_classes import Barrack, Building, Farm, Mine, Planet, SpaceMarine, User, clock
+from backend.onboarding import Account, create_accounts
+from database.conflicts import conflict_metrics
+from database.database_access import Base, DefaultSession
+
+PLAYER = Account("bench_user", "Password1", "bench_planet")
+"Player whose planet is hammered"
+
+SETTLEMENT = {"planet_number": 0, "settlement_number": 0}
+"First settlement of the player"
+
+BARRACK_POS: tuple[int, int] = (0, 0)
+"Position of the barrack that trains the units"
+
+MINE_POSITIONS: list[tuple[int, int]] = [(x, 0) for x in range(1, 5)] + [(x, 3) for x in range(5)]
+"Positions of the mines"
+
+FARM_POSITIONS: list[tuple[int, int]] = [(x, 1) for x in range(5)] + [(x, 4) for x in range(5)]
+"Positions of the farms"
+
+STORED: int = 100
+"Resources every mine and farm holds at the start"
+
+
+def seed(engine) -> dict[tuple[int, int], int]:
+    """
+    Create the player with plenty of resources, a barrack and full mines and farms.
+
+    :return: The cost of upgrading every mine and farm, by position
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with DefaultSession() as session:
+        (user,) = create_accounts([PLAYER], session=session)
+        planet: Planet = user.planets[0]
+        settlement_id: UUID = planet.settlements[0].settlement_id
+        planet.building_materials, planet.rations = 1_000_000, 1_000_000
+
+        buildings: list[Building] = [Barrack(settlement_id, *BARRACK_POS, level=1)]
+        for pos in MINE_POSITIONS:
+            buildings.append(Mine(settlement_id, *pos, level=1))
+        for pos in FARM_POSITIONS:
+            buildings.append(Farm(settlement_id, *pos, level=1))
+        for building in buildings[1:]:
+            building.stored_resources = STORED
+        session.add_all(buildings)
+        session.commit()
+        return {(building.grid_pos_x, building.grid_pos_y): building.build_cost for building in buildings[1:]}
+
+
+def hammer(app: Flask, requests: int, seed_value: int) -> None:
+    """Log in as the player and fire random requests at the planet"""
+    rng = random.Random(seed_value)
+    client = app.test_client()
+    response = client.post("/api/account/login", json=PLAYER._asdict())
+    assert response.status_code == 200, response.data
+
+    for _ in range(requests):
+        action: str = rng.choice(["collect", "train", "upgrade"])
+        if action == "train":
+            args = {**SETTLEMENT, "pos_x": BARRACK_POS[0], "pos_y": BARRACK_POS[1], "unit": "Space Marine"}
+            response = client.post("/api/building/barrack/unit", json=args)
+        else:
+            pos_x, pos_y = rng.choice(MINE_POSITIONS + FARM_POSITIONS)
+            args = {**SETTLEMENT, "pos_x": pos_x, "pos_y": pos_y}
+            if action == "collect":
+                response = client.get("/api/building/production", query_string=args)
+            else:
+                response = client.post("/api/building/upgrade", json=args)
+        # A full training queue is refused and a conflict that is retried in vain is returned to the client, which
+        # would send the request again
+        assert response.status_code in (200, 400, 409), f"{action}: {response.status_code} {response.data}"
+
+
+def check_ledger(upgrade_costs: dict[tuple[int, int], int]) -> list[str]:
+    """
+    Compare the resources left on the planet to what the requests gathered and spent.
+
+    :return: A line for every resource that doesn't add up
+    """
+    with DefaultSession() as session:
+        planet: Planet = session.scalars(select(Planet).where(Planet.planet_name == PLAYER.planet_name)).one()
+        buildings: list[Building] = planet.settlements[0].buildings
+        barrack: Barrack = next(building for building in buildings if isinstance(building, Barrack))
+        units: int = len(barrack.attack_units)
+        training_cost: int = SpaceMarine(barrack.building_id).training_cost
+
+        materials, rations = 1_000_000, 1_000_000
+        for building in buildings:
+            if not isinstance(building, (Mine, Farm)):
+                continue
+            # Upgrading takes the building under construction, so it is upgraded once at most
+            if building.level > 1:
+                materials -= upgrade_costs[(building.grid_pos_x, building.grid_pos_y)]
+            collected: int = STORED - building.stored_resources
+            if isinstance(building, Mine):
+                materials += collected
+            else:
+                rations += collected
+        rations -= units * training_cost
+
+        mismatches: list[str] = []
+        if planet.building_materials != materials:
+            mismatches.append(f"building materials: {planet.building_materials}, expected {materials}")
+        if planet.rations != rations:
+            mismatches.append(f"rations: {planet.rations}, expected {rations}")
+        print(f"{units} units trained, {sum(building.level > 1 for building in buildings)} buildings upgraded")
+        return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8, help="clients playing at the same time")
+    parser.add_argument("--requests", type=int, default=25, help="requests of every client")
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    # Writers of SQLite wait on each other's locks instead of failing right away
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}", connect_args={"timeout": 30} if db_file else {})
+    DefaultSession.configure(bind=engine)
+
+    # The buildings stay under construction and the units in training during the whole run
+    clock.freeze()
+    upgrade_costs: dict[tuple[int, int], int] = seed(engine)
+
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "bench"
+    app.register_blueprint(api_bp)
+
+    threads: list[threading.Thread] = [
+        threading.Thread(target=hammer, args=(app, args.requests, i)) for i in range(args.threads)
+    ]
+    start: float = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed: float = time.perf_counter() - start
+
+    status: dict = conflict_metrics.status()
+    print(f"{args.threads * args.requests} requests in {elapsed:.2f}s")
+    print(
+        f"{status['transactions']} transactions, {status['conflicts']} conflicts, {status['retries']} retries, "
+        f"{status['failures']} failures, retry rate {status['retry_rate']:.1%}"
+    )
+    mismatches: list[str] = check_ledger(upgrade_costs)
+    print("\n".join(mismatches) if mismatches else "ledger matches")
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measure the per call overhead of ``auto_session`` and ``default_factory`` against plain calls.
+
+The decorated methods are called the way the game calls them: with the session passed by the caller, with the session
+the object is already in, and on a constructor with a generated id. Uses an in-memory SQLite database.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/decorators.py``.
+"""
+
+import argparse
+import timeit
+from uuid import UUID, uuid1
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from database.database_access import Base, auto_session, default_factory
+
+
+class BenchItem(Base):
+    __tablename__ = "bench_items"
+
+    item_id: Mapped[UUID] = mapped_column(primary_key=True)
+    "Id of the item"
+
+    value: Mapped[int]
+    "Value that is read by the methods"
+
+    @default_factory(item_id=uuid1)
+    def __init__(self, value: int, item_id: UUID = None) -> None:
+        self.item_id: UUID = item_id
+        self.value: int = value
+
+    def plain(self, session: Session = None) -> int:
+        return self.value
+
+    @auto_session
+    def decorated(self, session: Session = None) -> int:
+        return self.value
+
+    @auto_session
+    def combined(self, other: "BenchItem", session: Session = None) -> int:
+        return self.value + other.value
+
+
+class PlainItem(Base):
+    __tablename__ = "bench_plain_items"
+
+    item_id: Mapped[UUID] = mapped_column(primary_key=True)
+    "Id of the item"
+
+    value: Mapped[int]
+    "Value of the item"
+
+    def __init__(self, value: int, item_id: UUID = None) -> None:
+        self.item_id: UUID = uuid1() if item_id is None else item_id
+        self.value: int = value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000, help="calls per measurement")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:")
+    BenchItem.__table__.create(bind=engine)
+
+    with Session(engine) as session:
+        item, other = BenchItem(1), BenchItem(2)
+        session.add_all([item, other])
+        session.commit()
+
+        cases = {
+            "plain method": lambda: item.plain(session=session),
+            "auto_session, session passed": lambda: item.decorated(session=session),
+            "auto_session, object session": lambda: item.decorated(),
+            "auto_session, orm argument": lambda: item.combined(other, session=session),
+            "plain constructor": lambda: PlainItem(1),
+            "default_factory constructor": lambda: BenchItem(1),
+        }
+        baseline = {"plain method": None, "plain constructor": None}
+        for name, call in cases.items():
+            per_call = min(timeit.repeat(call, number=args.calls, repeat=5)) / args.calls * 1e9
+            reference = baseline["plain constructor" if "constructor" in name else "plain method"]
+            if name in baseline:
+                baseline[name] = per_call
+                print(f"{name:<32} {per_call:8.0f} ns")
+            else:
+                print(f"{name:<32} {per_call:8.0f} ns  (+{per_call - reference:.0f} ns)")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Count the commits and statements of the main endpoints, with every game class committing its own changes and with a
+single unit of work per request.
+
+Both modes play the same session of a new player: registering, looking at the planet, building a farm and gathering
+with it. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/endpoints.py``.
+"""
+
+import argparse
+import os
+import tempfile
+
+from flask import Flask
+from sqlalchemy import create_engine, event, update
+
+import database.database_access as database_access
+from backend.api import api_bp
+from backend.game_classes import Planet, clock
+from database.database_access import Base, DefaultSession
+
+PLAYER = {"user_name": "bench_user", "password": "Password1", "planet_name": "bench_planet"}
+"Player that plays the session"
+
+SETTLEMENT = {"planet_number": 0, "settlement_number": 0}
+"First settlement of the player"
+
+FARM = {**SETTLEMENT, "pos_x": 3, "pos_y": 3}
+"Position of the farm the player builds"
+
+
+SESSION: list[tuple[str, str, dict]] = [
+    ("post", "/api/account/register", PLAYER),
+    ("post", "/api/account/login", PLAYER),
+    ("get", "/api/user", {}),
+    ("get", "/api/planet", {"planet_number": 0, "include_settlements": True}),
+    ("get", "/api/settlement", {**SETTLEMENT, "include_grid": True}),
+    ("post", "/api/settlement/building", {**FARM, "building": 4}),
+    ("advance", "", {}),
+    ("post", "/api/building/production", FARM),
+    ("advance", "", {}),
+    ("get", "/api/building/production", FARM),
+    ("post", "/api/building/upgrade", FARM),
+]
+"Method, path and arguments of the requests of a new player, the clock is advanced at the requests named advance"
+
+
+def run(engine, unit_of_work: bool, seconds_between: float) -> dict[str, tuple[int, int]]:
+    """
+    Play the session in a fresh database.
+
+    :return: The commits and statements of every request
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    database_access.unit_of_work_enabled = unit_of_work
+
+    app = Flask("bench")
+    app.config["SECRET_KEY"] = "bench"
+    app.register_blueprint(api_bp)
+    client = app.test_client()
+
+    counts = {"commits": 0, "statements": 0}
+
+    def count_commit(_connection) -> None:
+        counts["commits"] += 1
+
+    def count_statement(*_args) -> None:
+        counts["statements"] += 1
+
+    event.listen(engine, "commit", count_commit)
+    event.listen(engine, "before_cursor_execute", count_statement)
+
+    results: dict[str, tuple[int, int]] = {}
+    for method, path, args in SESSION:
+        if method == "advance":
+            clock.advance(seconds_between)
+            continue
+
+        counts["commits"], counts["statements"] = 0, 0
+        if method == "get":
+            response = client.get(path, query_string=args)
+        else:
+            response = client.post(path, json=args)
+        assert response.status_code == 200, f"{method.upper()} {path}: {response.status_code} {response.data}"
+        results[f"{method.upper()} {path}"] = (counts["commits"], counts["statements"])
+
+        # The player gets plenty of materials after registering, so building and upgrading never fail
+        if path == "/api/account/register":
+            with DefaultSession() as session:
+                session.execute(update(Planet).values(building_materials=100_000, rations=100_000))
+                session.commit()
+
+    event.remove(engine, "commit", count_commit)
+    event.remove(engine, "before_cursor_execute", count_statement)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds-between", type=float, default=3 * 3600, help="seconds to wait on timers")
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    DefaultSession.configure(bind=engine)
+
+    # Both modes see the same timers
+    clock.freeze()
+    before = run(engine, unit_of_work=False, seconds_between=args.seconds_between)
+    after = run(engine, unit_of_work=True, seconds_between=args.seconds_between)
+
+    print(f"{'endpoint':<34} {'commits':>15} {'statements':>15}")
+    for endpoint, (commits, statements) in before.items():
+        commits_after, statements_after = after[endpoint]
+        print(f"{endpoint:<34} {commits:>6} -> {commits_after:<6} {statements:>6} -> {statements_after:<6}")
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+
+if __name__ == "__main__":
+    main()
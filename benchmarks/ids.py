@@ -0,0 +1,104 @@
+"""
+Compare the insert throughput of primary key schemes on a large table of units.
+
+Every scheme fills its own table with ``--rows`` rows in batches, as the game inserts units one transaction at a time
+but many at once. Random keys (uuid1, uuid4) land on random pages of the primary key index, time-ordered keys (uuid7)
+and sequences at its end. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/ids.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable
+from uuid import UUID, uuid1, uuid4
+
+from sqlalchemy import BigInteger, Column, Engine, Identity, Integer, MetaData, String, Table, Uuid, create_engine, text
+
+from database.ids import uuid7
+
+SCHEMES: dict[str, Callable[[], UUID] | None] = {"uuid1": uuid1, "uuid4": uuid4, "uuid7": uuid7, "bigint": None}
+"Generators of the keys of every scheme, None for a sequence of the database"
+
+
+def units_table(metadata: MetaData, scheme: str) -> Table:
+    """A table shaped like units, with a primary key of the scheme"""
+    if SCHEMES[scheme] is None:
+        key = Column("unit_id", BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True)
+    else:
+        key = Column("unit_id", Uuid, primary_key=True)
+    return Table(f"bench_units_{scheme}", metadata, key, Column("level", Integer), Column("type", String))
+
+
+def index_size(engine: Engine, table: Table) -> str:
+    """Size of the primary key index, only known on Postgres"""
+    if engine.dialect.name != "postgresql":
+        return "-"
+    with engine.connect() as connection:
+        size = connection.execute(
+            text("SELECT pg_relation_size(indexrelid) FROM pg_index WHERE indrelid = CAST(:table AS regclass)"),
+            {"table": table.name},
+        ).scalar()
+    return f"{size / 2 ** 20:.1f} MiB"
+
+
+def fill(engine: Engine, table: Table, generate: Callable[[], UUID] | None, rows: int, batch: int) -> list[float]:
+    """
+    Insert the rows in batches of a transaction each.
+
+    :return: The rows per second of every tenth of the rows
+    """
+    rates: list[float] = []
+    tenth: int = max(rows // 10, batch)
+    inserted, start = 0, time.perf_counter()
+    while inserted < rows:
+        amount: int = min(batch, rows - inserted)
+        values: list[dict] = [{"level": 1, "type": "space_marines"} for _ in range(amount)]
+        if generate is not None:
+            for value in values:
+                value["unit_id"] = generate()
+        with engine.begin() as connection:
+            connection.execute(table.insert(), values)
+
+        inserted += amount
+        if inserted % tenth == 0 or inserted == rows:
+            now: float = time.perf_counter()
+            rates.append(tenth / (now - start))
+            start = now
+    return rates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows to insert per scheme")
+    parser.add_argument("--batch", type=int, default=1_000, help="rows per transaction")
+    parser.add_argument("--db-url", help="database to run on, the bench tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    metadata = MetaData()
+    tables = {scheme: units_table(metadata, scheme) for scheme in SCHEMES}
+    metadata.drop_all(bind=engine)
+    metadata.create_all(bind=engine)
+
+    print(f"{args.rows} rows in batches of {args.batch}")
+    print(f"{'scheme':<8} {'rows/s':>10} {'first 10%':>10} {'last 10%':>10} {'pk index':>10}")
+    for scheme, table in tables.items():
+        start: float = time.perf_counter()
+        rates: list[float] = fill(engine, table, SCHEMES[scheme], args.rows, args.batch)
+        rate: float = args.rows / (time.perf_counter() - start)
+        print(f"{scheme:<8} {rate:>10.0f} {rates[0]:>10.0f} {rates[-1]:>10.0f} {index_size(engine, table):>10}")
+
+    metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+
+if __name__ == "__main__":
+    main()
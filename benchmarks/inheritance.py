@@ -0,0 +1,129 @@
+"""
+Count the statements of inserting units and of loading the buildings of settlements.
+
+Units and buildings are mapped with inheritance: a unit type without columns of its own shares the table of its parent,
+subclasses with a table of their own are joined in the query of their base class. Uses a SQLite file by default, pass
+``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/inheritance.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from uuid import UUID
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.game_classes import (
+    Barrack,
+    Farm,
+    Mine,
+    Planet,
+    Settlement,
+    SpaceCommando,
+    SpaceDrone,
+    SpaceMarine,
+    TownHall,
+    User,
+    Warper,
+)
+from database.database_access import Base
+from database.query_counter import count_queries
+
+
+def seed(session: Session, settlements: int) -> UUID:
+    """Create a planet with settlements that each have one building of every type, returns the id of a barrack"""
+    user = User("bench_user", "Password1")
+    session.add(user)
+    session.flush()
+    planet = Planet(user.user_id, 0, 0, "bench_planet")
+    session.add(planet)
+    session.flush()
+    barrack_id: UUID | None = None
+    for settlement_nr in range(settlements):
+        settlement = Settlement(settlement_nr, planet.planet_id)
+        session.add(settlement)
+        session.flush()
+        barrack = Barrack(settlement.settlement_id, 1, 0, level=1)
+        session.add_all(
+            [
+                TownHall(settlement.settlement_id, 0, 0, level=1),
+                Farm(settlement.settlement_id, 2, 0, level=1),
+                Mine(settlement.settlement_id, 3, 0, level=1),
+                Warper(settlement.settlement_id, 4, 0, level=1),
+                barrack,
+            ]
+        )
+        barrack_id = barrack.building_id
+    session.commit()
+    return barrack_id
+
+
+def insert_units(session: Session, barrack_id: UUID, units: int) -> tuple[int, float]:
+    """
+    Insert units of every type, each in its own flush as the barracks train them.
+
+    :return: The statements and the seconds per unit
+    """
+    unit_types = [SpaceMarine, SpaceCommando, SpaceDrone]
+    start: float = time.perf_counter()
+    with count_queries() as stats:
+        for i in range(units):
+            session.add(unit_types[i % len(unit_types)](barrack_id))
+            session.flush()
+    session.commit()
+    return stats.statements / units, (time.perf_counter() - start) / units
+
+
+def load_settlements(session_factory, settlements: int) -> tuple[int, float]:
+    """
+    Load every settlement with its buildings and the columns of their types.
+
+    :return: The statements and the seconds per settlement
+    """
+    start: float = time.perf_counter()
+    with count_queries() as stats:
+        with session_factory() as session:
+            for settlement in session.scalars(select(Settlement)):
+                for building in settlement.buildings:
+                    if isinstance(building, (Farm, Mine)):
+                        assert building.stored_resources >= 0
+                    elif isinstance(building, Barrack):
+                        assert building.space_marine_level >= 1
+    # The query of the settlements themselves is shared by all of them
+    return (stats.statements - 1) / settlements, (time.perf_counter() - start) / settlements
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, default=3_000, help="units to insert")
+    parser.add_argument("--settlements", type=int, default=200, help="settlements to load")
+    parser.add_argument("--db-url", help="database to run on, its tables are recreated, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as session:
+        barrack_id: UUID = seed(session, args.settlements)
+        unit_statements, unit_seconds = insert_units(session, barrack_id, args.units)
+    load_statements, load_seconds = load_settlements(lambda: Session(engine), args.settlements)
+
+    print(f"{'operation':<16} {'statements':>10} {'ms':>8}")
+    print(f"{'unit insert':<16} {unit_statements:>10.1f} {unit_seconds * 1000:>8.3f}")
+    print(f"{'settlement load':<16} {load_statements:>10.1f} {load_seconds * 1000:>8.3f}")
+
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time the hottest lookups of the game, built as a query on every call and as statements that are built once.
+
+Both run the same SQL on a small in-memory SQLite database, so the difference is the Python overhead of building the
+statement and deriving its cache key. Pass ``--db-url`` to run against an empty database, which is seeded.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/lookups.py``.
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.game_classes import Message, Planet, Race, User
+from backend.game_classes.General import check_user
+from database.database_access import Base
+from database.explain import seed
+
+
+def query_lookups(session: Session, user: User, planet: Planet, race: Race) -> dict[str, Callable[[], object]]:
+    """The lookups as they were built before, with a new query on every call"""
+
+    def check() -> bool:
+        query = session.query(User).filter_by(user_name=user.user_name, password=user.password)
+        assert query.count() <= 1
+        return query.count() > 0
+
+    def last_position() -> int:
+        message = session.query(Message).filter_by(race_id=race.race_id).order_by(Message.position.desc()).first()
+        return message.position if message else 0
+
+    return {
+        "User.load_by_name": lambda: session.query(User).filter_by(user_name=user.user_name).first(),
+        "Planet.get_by_pos": lambda: session.query(Planet).filter_by(
+            planet_x=planet.planet_x, planet_y=planet.planet_y
+        ).first(),
+        "Planet.get_by_uuid": lambda: session.query(Planet).filter_by(planet_id=planet.planet_id).first(),
+        "Message.last_position": last_position,
+        "check_user": check,
+    }
+
+
+def statement_lookups(session: Session, user: User, planet: Planet, race: Race) -> dict[str, Callable[[], object]]:
+    """The lookups of the game classes"""
+    return {
+        "User.load_by_name": lambda: User.load_by_name(user.user_name, session=session),
+        "Planet.get_by_pos": lambda: Planet.get_by_pos(planet.planet_x, planet.planet_y, session=session),
+        "Planet.get_by_uuid": lambda: Planet.get_by_uuid(planet.planet_id, session=session),
+        "Message.last_position": lambda: Message.last_position(race.race_id, session=session),
+        "check_user": lambda: check_user(user.user_name, user.password, session=session),
+    }
+
+
+def per_call(lookup: Callable[[], object], calls: int) -> float:
+    """Microseconds per call of a lookup"""
+    lookup()  # the first call compiles the statement
+    start: float = time.perf_counter()
+    for _ in range(calls):
+        lookup()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5_000, help="calls of every lookup")
+    parser.add_argument("--db-url", help="empty database to run on, defaults to an in-memory SQLite database")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url or "sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        seed(session, users=100)
+        user: User = session.scalars(select(User).limit(1)).one()
+        planet: Planet = session.scalars(select(Planet).limit(1)).one()
+        race: Race = session.scalars(select(Race).limit(1)).one()
+
+        before = query_lookups(session, user, planet, race)
+        after = statement_lookups(session, user, planet, race)
+        print(f"{'lookup':<24} {'query µs':>10} {'statement µs':>13} {'saved':>7}")
+        for name in before:
+            old, new = per_call(before[name], args.calls), per_call(after[name], args.calls)
+            print(f"{name:<24} {old:>10.1f} {new:>13.1f} {1 - new / old:>7.0%}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure the cost of looking up a game property: walking the nested config like the getters did before the properties
+were compiled, the getters that now read the compiled tables, the compiled tables themselves and a bare tuple index.
+
+Also times ``attack_power`` on a unit, the sort of a barrack worth of units by it, as combat does, and the check for a
+new balance version every request makes.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/properties.py``.
+"""
+
+import argparse
+import timeit
+from uuid import uuid1
+
+from backend.game_classes import SpaceMarine
+from backend.game_classes.properties import (
+    compiled,
+    get_property,
+    get_unit_property,
+    properties,
+    refresh_properties,
+    unit_level,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200_000, help="calls per measurement")
+    parser.add_argument("--units", type=int, default=1_000, help="units to sort by attack power")
+    args = parser.parse_args()
+
+    levels = compiled["unit"]["space_marine"].levels
+    unit = SpaceMarine(uuid1(), level=2)
+    units = [SpaceMarine(uuid1(), level=level % 4 + 1) for level in range(args.units)]
+
+    cases = {
+        "tuple index": lambda: levels[2].attack_power,
+        "compiled table": lambda: unit_level("space_marine", 2).attack_power,
+        "getter": lambda: get_unit_property("space_marine", "level", "2", "attack_power"),
+        # Both layers the getters went through: the category, then the path in it
+        "nested config walk": lambda: get_property(
+            "space_marine", "level", "2", "attack_power", properties=get_property("unit", properties=properties)
+        ),
+        "unit.attack_power": lambda: unit.attack_power,
+    }
+    baseline = None
+    for name, call in cases.items():
+        per_call = min(timeit.repeat(call, number=args.calls, repeat=5)) / args.calls * 1e9
+        if baseline is None:
+            baseline = per_call
+            print(f"{name:<20} {per_call:8.0f} ns")
+        else:
+            print(f"{name:<20} {per_call:8.0f} ns  ({per_call / baseline:.1f}x)")
+
+    number = max(args.calls // args.units, 1)
+    seconds = min(timeit.repeat(lambda: sorted(units, key=lambda u: u.attack_power), number=number, repeat=5)) / number
+    print(f"sort {args.units} units by attack power: {seconds * 1e3:.2f} ms")
+
+    # Between two reads of the version file, the check is a comparison of the clock
+    refresh_properties()
+    per_call = min(timeit.repeat(refresh_properties, number=args.calls, repeat=5)) / args.calls * 1e9
+    print(f"balance version check: {per_call:.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
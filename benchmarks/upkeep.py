@@ -0,0 +1,111 @@
+"""
+Compare feeding the units of a planet barrack by barrack with feeding them all at once.
+
+Both paths start from the same planet, with its units spread over a few barracks and enough rations for only part of
+them, so the benchmark also checks that both paths starve the same amount of units. Uses a SQLite file by default, pass
+``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/upkeep.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from datetime import timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.game_classes import AttackUnit, Barrack, Planet, Settlement, SpaceCommando, SpaceMarine, User, clock
+from database.database_access import Base
+
+BARRACKS = 10
+"Barracks the units are spread over"
+
+
+def seed(session: Session, units: int, elapsed: float) -> None:
+    """
+    Create a single planet with the given amount of units, which have rations for most of the hours.
+    The units were last fed between ``elapsed`` seconds and an hour more ago.
+    """
+    user = User("bench_user", "Password1")
+    planet = Planet(user.user_id, 1, 1, "bench_planet")
+    settlement = Settlement(1, planet.planet_id)
+    barracks = [
+        Barrack(settlement_id=settlement.settlement_id, grid_pos_x=i, grid_pos_y=0, level=1) for i in range(BARRACKS)
+    ]
+    session.add_all([user, planet, settlement, *barracks])
+
+    for i in range(units):
+        unit_type = SpaceMarine if i % 3 else SpaceCommando
+        unit = unit_type(level=1, barrack_id=barracks[i % BARRACKS].building_id)
+        unit.fed_until = clock.now() - timedelta(seconds=elapsed + (i * 60) % 3600)
+        session.add(unit)
+
+    planet.rations = units * 12
+    session.commit()
+
+
+def per_barrack(session: Session) -> None:
+    """Every barrack feeds its own units, one unit update at a time"""
+    planet: Planet = session.scalar(select(Planet))
+    for settlement in planet.settlements:
+        for barrack in settlement.buildings:
+            barrack.update()
+    session.commit()
+
+
+def per_planet(session: Session) -> None:
+    """The planet feeds all its units in one pass"""
+    planet: Planet = session.scalar(select(Planet))
+    planet.feed_units()
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, default=2000, help="amount of units on the planet")
+    parser.add_argument("--elapsed", type=float, default=3 * 3600, help="seconds since the planet was last updated")
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    make_session = sessionmaker(bind=engine)
+
+    # Both paths feed at the same moment
+    clock.freeze()
+
+    results = {}
+    for name, run in (("per barrack", per_barrack), ("per planet", per_planet)):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with make_session() as session:
+            seed(session, args.units, args.elapsed)
+
+        # A fresh session, so the per barrack path has to load its units like it would in a request
+        with make_session() as session:
+            start = time.perf_counter()
+            run(session)
+            duration = time.perf_counter() - start
+
+            results[name] = (
+                session.scalar(select(func.count()).select_from(AttackUnit)),
+                session.scalar(select(Planet.rations)),
+            )
+            print(f"{name:>11}: {duration:8.3f}s for {args.units} units, {results[name][0]} left")
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+    assert results["per barrack"][1] == results["per planet"][1], f"Paths disagree: {results}"
+
+
+if __name__ == "__main__":
+    main()
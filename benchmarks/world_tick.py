@@ -0,0 +1,135 @@
+"""
+Compare the set-based world tick with updating every user object by object.
+
+Both paths start from the same generated world of farms and mines, half of them gathering and a tenth of them in
+construction, with part of those timers completed. Uses a SQLite file by default, pass ``--db-url`` to run against Postgres.
+
+Run with ``PYTHONPATH=$PWD python benchmarks/world_tick.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+from uuid import uuid1
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.game_classes import Building, Farm, Mine, Planet, Settlement, User, clock
+from backend.world_tick import world_tick
+from database.database_access import Base
+
+BUILDINGS_PER_SETTLEMENT = 100
+"Buildings on the 10x10 grid of every settlement"
+
+
+def seed(session: Session, buildings: int, elapsed: float) -> None:
+    """Create a world with one user, planet and settlement per 100 buildings, last updated ``elapsed`` seconds ago"""
+    last_update = clock.now() - timedelta(seconds=elapsed)
+
+    users, planets, settlements, building_rows, farm_rows, mine_rows = [], [], [], [], [], []
+    for i in range(buildings // BUILDINGS_PER_SETTLEMENT):
+        user_id, planet_id, settlement_id = uuid1(), uuid1(), uuid1()
+        users.append({"user_id": user_id, "user_name": f"user_{i}", "password": "Password1", "last_update": last_update})
+        planets.append(
+            {
+                "planet_id": planet_id,
+                "planet_x": i,
+                "planet_y": 0,
+                "user_id": user_id,
+                "planet_name": f"planet_{i}",
+                "building_materials": 0,
+                "rations": 0,
+            }
+        )
+        settlements.append({"settlement_id": settlement_id, "settlement_nr": 1, "planet_id": planet_id})
+
+        for j in range(BUILDINGS_PER_SETTLEMENT):
+            building_id = uuid1()
+            is_farm = j % 2 == 0
+            building_rows.append(
+                {
+                    "building_id": building_id,
+                    "settlement_id": settlement_id,
+                    "grid_pos_x": j % 10,
+                    "grid_pos_y": j // 10,
+                    "level": 1 + j % 4,
+                    "construction_completes_at": last_update + timedelta(seconds=600) if j % 10 == 1 else None,
+                    "type": "farms" if is_farm else "mines",
+                }
+            )
+            gathering = {
+                "building_id": building_id,
+                "stored_resources": 0,
+                "gathering_completes_at": last_update + timedelta(hours=j % 5) if j % 10 >= 5 else None,
+            }
+            (farm_rows if is_farm else mine_rows).append(gathering)
+
+    session.execute(insert(User.__table__), users)
+    session.execute(insert(Planet.__table__), planets)
+    session.execute(insert(Settlement.__table__), settlements)
+    session.execute(insert(Building.__table__), building_rows)
+    session.execute(insert(Farm.__table__), farm_rows)
+    session.execute(insert(Mine.__table__), mine_rows)
+    session.commit()
+
+
+def checksum(session: Session) -> tuple:
+    """Totals of everything the tick changes, both paths should end up with the same totals"""
+    return (
+        session.scalar(select(func.count()).where(Building.__table__.c.construction_completes_at.is_not(None))),
+        session.scalar(select(func.sum(Farm.__table__.c.stored_resources))),
+        session.scalar(select(func.sum(Mine.__table__.c.stored_resources))),
+        session.scalar(select(func.count()).where(Farm.__table__.c.gathering_completes_at.is_not(None))),
+        session.scalar(select(func.count()).where(Mine.__table__.c.gathering_completes_at.is_not(None))),
+    )
+
+
+def per_object(session: Session) -> None:
+    """The regular update path"""
+    for user in session.scalars(select(User)):
+        user.update(session=session)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--buildings", type=int, default=100_000, help="amount of buildings in the world")
+    parser.add_argument("--elapsed", type=float, default=3600, help="seconds since the users were last updated")
+    parser.add_argument("--db-url", help="database to run on, its tables are dropped, defaults to a SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    make_session = sessionmaker(bind=engine)
+
+    # Both paths settle the timers at the same moment
+    clock.freeze()
+
+    results = {}
+    for name, run in (("per object", per_object), ("world tick", lambda s: world_tick(session=s))):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with make_session() as session:
+            seed(session, args.buildings, args.elapsed)
+
+            start = time.perf_counter()
+            run(session)
+            duration = time.perf_counter() - start
+
+            results[name] = checksum(session)
+            print(f"{name:>10}: {duration:8.3f}s for {args.buildings} buildings")
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+
+    assert results["per object"] == results["world tick"], f"Paths disagree: {results}"
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,20 @@
-from database.test_fixtures import uses_db
+from database.test_fixtures import api_client, database_schema, raises_on_lazy_load, uses_db
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--raise-on-lazy-load",
+        action="store_true",
+        help="make relationships that weren't loaded eagerly raise instead of loading lazily",
+    )
+    parser.addoption(
+        "--db-isolation",
+        choices=["savepoint", "recreate"],
+        default="savepoint",
+        help="roll every test back in a transaction, or recreate the tables before every test",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "raise_on_lazy_load: relationships that weren't loaded eagerly raise")
+    config.addinivalue_line("markers", "real_transactions: the test commits for real, the tables are recreated for it")
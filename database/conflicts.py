@@ -0,0 +1,110 @@
+"""
+Optimistic concurrency of the rows that change on most requests.
+
+Planets, buildings and spaceships have a version column that SQLAlchemy checks and bumps on every update. When two
+transactions load the same row and both change it, the update of the second one matches no row and raises
+:class:`StaleDataError` instead of overwriting the first change. Game code that finds out in another way that a row
+changed since it was loaded raises :class:`ConflictError`. :func:`retry_on_conflict` then runs the transaction again,
+on the current state of the row.
+"""
+
+import random
+import threading
+import time
+from functools import wraps
+from typing import Callable, TypeVar
+
+from sqlalchemy.orm.exc import StaleDataError
+
+RETRY_ATTEMPTS: int = 5
+"Times a transaction is run before a conflict is raised to the caller"
+
+RETRY_BACKOFF: float = 0.005
+"Seconds to wait before the first retry, doubled for every next retry and jittered"
+
+
+class ConflictError(Exception):
+    """A row changed since the transaction loaded it, so what the transaction decided on doesn't hold anymore"""
+
+
+CONFLICTS: tuple[type[Exception], ...] = (StaleDataError, ConflictError)
+"Exceptions of a transaction that is run again by :func:`retry_on_conflict`"
+
+
+class ConflictMetrics:
+    """Counters of the transactions run with :func:`retry_on_conflict` in this process"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+        self.transactions: int = 0
+        "Amount of transactions that were run, not counting their retries"
+
+        self.conflicts: int = 0
+        "Amount of runs that failed on a row that changed since it was loaded"
+
+        self.failures: int = 0
+        "Amount of transactions that still conflicted on their last attempt"
+
+    def record(self, conflicts: int, failed: bool) -> None:
+        """Record a transaction and the conflicts of its runs"""
+        with self._lock:
+            self.transactions += 1
+            self.conflicts += conflicts
+            self.failures += failed
+
+    def status(self) -> dict:
+        """Get the counters and the retry rate: the retries per transaction"""
+        with self._lock:
+            retries: int = self.conflicts - self.failures
+            return {
+                "transactions": self.transactions,
+                "conflicts": self.conflicts,
+                "retries": retries,
+                "failures": self.failures,
+                "retry_rate": retries / self.transactions if self.transactions else 0.0,
+            }
+
+
+conflict_metrics: ConflictMetrics = ConflictMetrics()
+"Conflicts of this process"
+
+retry_hooks: list[Callable[[], None]] = []
+"Functions called before a transaction is retried, to forget what the rolled back run kept outside the database"
+
+RT = TypeVar("RT")
+
+
+def retry_on_conflict(_func: Callable[..., RT] = None, /, *, attempts: int = RETRY_ATTEMPTS):
+    """
+    Run the function again when its transaction conflicts with another one. The function must open and commit the
+    transaction itself, like an endpoint with a :func:`unit_of_work`, so every run loads the rows again.
+
+    :param _func: The function to wrap. ! Don't pass manually, passed automatically by the wrapping process
+    :param attempts: Times the function is run before the conflict is raised
+    """
+
+    def decorator(func: Callable[..., RT]) -> Callable[..., RT]:
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> RT:
+            for attempt in range(attempts):
+                try:
+                    result: RT = func(*args, **kwargs)
+                except CONFLICTS:
+                    if attempt == attempts - 1:
+                        conflict_metrics.record(attempts, failed=True)
+                        raise
+                    for hook in retry_hooks:
+                        hook()
+                    time.sleep(RETRY_BACKOFF * 2**attempt * random.uniform(0.5, 1.5))
+                    continue
+                except Exception:
+                    # A refused request, like an aborted endpoint, still ran its transaction
+                    conflict_metrics.record(attempt, failed=False)
+                    raise
+                conflict_metrics.record(attempt, failed=False)
+                return result
+
+        return wrapper
+
+    return decorator if _func is None else decorator(_func)
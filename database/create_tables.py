@@ -1,6 +1,11 @@
+from alembic import command
+from alembic.config import Config
+
 import backend.game_classes
 from database.database_access import engine, Base
 
 if __name__ == "__main__":
     Base.metadata.create_all(bind=engine)
 
+    # The tables are created at the latest version, so the migrations up to it don't have to run
+    command.stamp(Config("alembic.ini"), "head")
@@ -1,10 +1,16 @@
+from contextlib import contextmanager
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Iterator, TypeVar
+import os
 import sys
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm import DeclarativeBase, Session, object_session, sessionmaker
+from sqlalchemy.orm.attributes import instance_state
 
 from database.config import config_data
+from database.pool import InstrumentedQueuePool
+from database.routing import note_write, read_engine
 
 
 # Makes a base for all the table classes to derive from
@@ -21,14 +27,157 @@ password: str = config_data["db_password"]
 
 # We connect to the database and create and engine with a session where we are going to be working
 db_url = (
-    "sqlite:///:memory:"
-    if "pytest" in sys.modules  # use in-memory database when running tests
+    # tests use the configured test database, or an in-memory database when there is none
+    os.environ.get("TEST_DB_URL") or config_data.get("test_db_url") or "sqlite:///:memory:"
+    if "pytest" in sys.modules
     else f"postgresql+psycopg2://{username}:{password}@{host}:{port}/{database}"
 )
 
-engine: Engine = create_engine(db_url, echo=False, pool_pre_ping=True)
+
+def _create_engine(url: str) -> Engine:
+    if url.startswith("sqlite"):  # the in-memory database of the tests keeps its single connection
+        sqlite_engine: Engine = create_engine(url, echo=False)
+
+        # pysqlite starts transactions itself, but not before a SAVEPOINT, so savepoints would not roll back. The
+        # driver leaves the transactions to SQLAlchemy instead
+        @event.listens_for(sqlite_engine, "connect")
+        def _no_driver_transactions(dbapi_connection, _connection_record) -> None:
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(sqlite_engine, "begin")
+        def _begin(connection) -> None:
+            connection.exec_driver_sql("BEGIN")
+
+        return sqlite_engine
+    return create_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config_data.get("db_pool_size", 5),
+        max_overflow=config_data.get("db_max_overflow", 10),
+        pool_recycle=config_data.get("db_pool_recycle", -1),
+        pool_pre_ping=config_data.get("db_pool_pre_ping", True),
+        pool_timeout=config_data.get("db_pool_timeout", 30),
+    )
+
+
+engine: Engine = _create_engine(db_url)
+"Engine of the primary database, which all writes go to"
+
+replica_engines: list[Engine] = (
+    [] if "pytest" in sys.modules else [_create_engine(url) for url in config_data.get("db_replica_urls", [])]
+)
+"Engines of the replicas that read-only sessions read from, empty when everything goes to the primary"
+
+replica_max_lag: float = config_data.get("db_replica_max_lag", 5)
+"Seconds after a write before a replica is assumed to have it, when its replay position can't be asked"
+
 DefaultSession = sessionmaker(bind=engine)
 
+unit_of_work_enabled: bool = config_data.get("unit_of_work", True)
+"Whether requests run as a single unit of work, when disabled every game class commits its own changes"
+
+_UNIT_OF_WORK: str = "unit_of_work"
+"Key in :attr:`Session.info` marking a session whose transaction is committed by its owner"
+
+_READ_ONLY: str = "read_only"
+"Key in :attr:`Session.info` marking a session that may be bound to a replica"
+
+_WROTE: str = "wrote"
+"Key in :attr:`Session.info` marking a session that flushed changes in its current transaction"
+
+
+@event.listens_for(DefaultSession, "before_flush")
+def _refuse_read_only_writes(session: Session, _flush_context, _instances) -> None:
+    if session.info.get(_READ_ONLY) and (
+        session.new or session.deleted or any(session.is_modified(instance) for instance in session.dirty)
+    ):
+        raise InvalidRequestError("Read-only sessions can't write, open the session with unit_of_work instead")
+
+
+@event.listens_for(DefaultSession, "after_flush")
+def _mark_write(session: Session, _flush_context) -> None:
+    session.info[_WROTE] = True
+
+
+@event.listens_for(DefaultSession, "after_commit")
+def _note_write(session: Session) -> None:
+    # Later reads of the user must see what was committed, see database.routing
+    if session.info.pop(_WROTE, False):
+        note_write()
+
+
+@event.listens_for(DefaultSession, "after_rollback")
+def _forget_write(session: Session) -> None:
+    session.info.pop(_WROTE, None)
+
+
+@contextmanager
+def unit_of_work(**kwargs) -> Iterator[Session]:
+    """
+    Open a session that is committed once, when the block ends without an exception, and rolled back otherwise.
+    Game classes called with this session only flush their changes, see :func:`commit`.
+
+    :param kwargs: Arguments forwarded to :data:`DefaultSession`
+    """
+    with DefaultSession(**kwargs) as session:
+        if not unit_of_work_enabled:
+            yield session
+            return
+
+        session.info[_UNIT_OF_WORK] = True
+        try:
+            yield session
+            session.commit()
+        except BaseException:
+            session.rollback()
+            raise
+
+
+def in_unit_of_work(session: Session) -> bool:
+    """Whether the transaction of the session is committed by the owner of the session"""
+    return session.info.get(_UNIT_OF_WORK, False)
+
+
+def commit(session: Session) -> None:
+    """
+    Commit the session, unless it is a unit of work: then the changes are only flushed and its owner commits them.
+    """
+    if in_unit_of_work(session):
+        session.flush()
+    else:
+        session.commit()
+
+
+@contextmanager
+def savepoint(session: Session) -> Iterator[None]:
+    """
+    Run a block that can fail on its own. In a unit of work the block runs in a savepoint, so a failing flush only
+    undoes the block instead of the whole transaction.
+    """
+    if not in_unit_of_work(session):
+        yield
+        return
+
+    with session.begin_nested():
+        yield
+
+
+@contextmanager
+def read_only_session(**kwargs) -> Iterator[Session]:
+    """
+    Open a session for work that only reads. It is bound to a replica that has the last writes of the user, or to the
+    primary when no replica has caught up yet. Flushing changes in it raises an error.
+
+    :param kwargs: Arguments forwarded to :data:`DefaultSession`
+    """
+    bind: Engine = read_engine(engine, replica_engines, replica_max_lag)
+    if bind is not engine:  # reads from the primary keep the bind DefaultSession is configured with
+        kwargs.setdefault("bind", bind)
+    with DefaultSession(**kwargs) as session:
+        session.info[_READ_ONLY] = True
+        yield session
+
 
 RT = TypeVar("RT")
 
@@ -62,75 +211,91 @@ def auto_session(_func: Callable[..., RT], /, *, add_all=True, auto_commit=False
 
     :param _func: The function to wrap. ! Don't pass manually, passed automatically by the wrapping process
     :param add_all: Whether to add all orm class instances to the session
-    :param auto_commit: Whether to commit the session when the function returns
+    :param auto_commit: Whether to commit the session when the function returns, in a unit of work it is only flushed
 
     .. note::
        All wrapped functions must declare a ``session`` parameter.
     """
 
-    # indicator if the function does not ask for a session
-    func_requires_session: bool = "session" in _func.__code__.co_varnames
+    # The signature is analysed once here, instead of on every call
+    code = _func.__code__
+    positional: tuple[str, ...] = code.co_varnames[: code.co_argcount]
+    func_requires_session: bool = "session" in code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+    session_index: int | None = positional.index("session") if "session" in positional else None
+    # * this code assumes a method is an instance method if it's first argument is called `self`
+    is_method: bool = len(positional) > 0 and positional[0] == "self"
+
+    def add_instances(session: Session, args: tuple, kwargs: dict) -> None:
+        """Add the orm class instances among the arguments that are not in the session yet"""
+        for arg in args:
+            if isinstance(arg, DeclarativeBase) and instance_state(arg).session_id != session.hash_key:
+                session.add(arg)
+        for arg in kwargs.values():
+            if isinstance(arg, DeclarativeBase) and instance_state(arg).session_id != session.hash_key:
+                session.add(arg)
+
+    def run_func(session: Session, args: tuple, kwargs: dict, add_all_enabled: bool, auto_commit_enabled: bool) -> RT:
+        """
+        Run the provided function with the given session.
+        :return: The result of the function
+        """
+        if add_all_enabled:  # if enabled add all orm instances to the session
+            add_instances(session, args, kwargs)
+
+        res: RT = _func(*args, **kwargs)
+
+        if auto_commit_enabled:  # if enabled commit the session when the function returns, see `commit`
+            commit(session)
+
+        return res
 
     @wraps(_func)
     def wrapper(*args, force_auto_commit: bool = None, force_add_all: bool = None, **kwargs) -> RT:
-        add_all_enabled: bool = (add_all and force_add_all is None) or force_add_all
-        auto_commit_enabled: bool = (auto_commit and force_auto_commit is None) or force_auto_commit
-
-        def run_func(session: Session, inject_session: bool = True) -> RT:
-            """
-            Run the provided function with the most appropriate session.
-            :param session: The session to use
-            :param inject_session: Whether to inject the session
-            :return: The result of the function
-            """
-            if inject_session and func_requires_session:  # inject the session into the keyword arguments
-                kwargs["session"] = session
-
-            if add_all_enabled:  # if enabled add all orm instances to the session
-                session.add_all(instances)
-
-            res: RT = _func(*args, **kwargs)
-
-            if auto_commit_enabled:  # if enabled commit the session when the function returns
-                session.commit()
-
-            return res
-
-        if add_all_enabled:  # if enabled create a list of all orm class instances
-            instances = [arg for arg in [*args, *kwargs.values()] if isinstance(arg, DeclarativeBase)]
+        add_all_enabled: bool = add_all if force_add_all is None else force_add_all
+        auto_commit_enabled: bool = auto_commit if force_auto_commit is None else force_auto_commit
 
         # extract session from function arguments
-        if "session" in _func.__code__.co_varnames:
-            session_index = _func.__code__.co_varnames.index("session")
-            session = args[session_index] if session_index < len(args) else kwargs.get("session")
+        if session_index is not None and session_index < len(args):
+            session = args[session_index]
         else:
             session = kwargs.get("session")
 
+        # use the provided session if possible, this is the common case so it runs the function without extra calls
+        if session is not None:
+            assert isinstance(session, Session), "session must be of type 'Session'"
+            if not func_requires_session:
+                del kwargs["session"]
+            if add_all_enabled:
+                add_instances(session, args, kwargs)
+            res: RT = _func(*args, **kwargs)
+            if auto_commit_enabled:
+                commit(session)
+            return res
+
         # if the function doesn't ask for a session, remove it from the keyword arguments
         if not func_requires_session:
             kwargs.pop("session", None)
 
-        # if use the provided session if possible
-        if session is not None:
-            assert isinstance(session, Session), "session must be of type 'Session'"
-            return run_func(session, inject_session=False)
-
-        # check if the function is an instance method, the instance will always be added to the session
-        # * this code assumes a method is an instance method if it's first argument is called `self`
-        if _func.__code__.co_varnames[0] == "self":
+        if is_method:
             # try to use the session the object is already in
             session: Session | None = object_session(args[0])  # first argument is always `self` for instances
             if session is not None:
-                return run_func(session)
+                if func_requires_session:
+                    kwargs["session"] = session
+                return run_func(session, args, kwargs, add_all_enabled, auto_commit_enabled)
 
-            # create a new session context for the call
+            # create a new session context for the call, the instance will always be added to the session
             with DefaultSession() as session:
                 session.add(args[0])
-                return run_func(session)
+                if func_requires_session:
+                    kwargs["session"] = session
+                return run_func(session, args, kwargs, add_all_enabled, auto_commit_enabled)
 
         # create a new session context for the call
         with DefaultSession() as session:
-            return run_func(session)
+            if func_requires_session:
+                kwargs["session"] = session
+            return run_func(session, args, kwargs, add_all_enabled, auto_commit_enabled)
 
     return wrapper
 
@@ -142,11 +307,18 @@ def default_factory(**defaults) -> Callable:
     """
 
     def wrapper(func: Callable) -> Callable:
+        # The position of every defaulted argument is looked up once here, instead of on every call
+        positions: dict[str, int] = {
+            arg: func.__code__.co_varnames.index(arg)
+            for arg in defaults
+            if arg in func.__code__.co_varnames[: func.__code__.co_argcount]
+        }
+
         @wraps(func)
         def inner(*args, **kwargs) -> Any:
             # generate and set all default values that were not provided
             for arg, gen in defaults.items():
-                if arg not in kwargs and arg not in func.__code__.co_varnames[0 : len(args)]:
+                if arg not in kwargs and positions.get(arg, len(args)) >= len(args):
                     kwargs[arg] = gen()
             return func(*args, **kwargs)
 
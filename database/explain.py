@@ -0,0 +1,150 @@
+"""
+Check with ``EXPLAIN`` that the main queries of the game find their rows through an index.
+
+A query passes when its plan doesn't scan the whole table it filters. Postgres prefers sequential scans on small tables
+even when an index exists, so they are disabled while explaining: the check is whether an index can be used at all.
+
+Run with ``PYTHONPATH=$PWD python -m database.explain``. Uses a seeded SQLite file by default, pass ``--db-url`` to
+check an existing database, which is only read.
+"""
+
+import argparse
+import os
+import tempfile
+from uuid import UUID
+
+from sqlalchemy import Connection, Engine, Select, create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.game_classes import (
+    AttackUnit,
+    Barrack,
+    Building,
+    Message,
+    Planet,
+    PlanetLink,
+    Race,
+    Settlement,
+    SpaceMarine,
+    Spaceship,
+    User,
+)
+from backend.game_classes.Ships.ship import ShipLocation
+from database.database_access import Base
+
+
+def main_queries() -> dict[str, tuple[str, Select]]:
+    """Get the main lookups of the game by name, with the table each of them filters"""
+    some_id = UUID(int=1)
+    messages, planets, settlements = Message.__table__, Planet.__table__, Settlement.__table__
+    buildings, attack_units, spaceships = Building.__table__, AttackUnit.__table__, Spaceship.__table__
+    ship_locations, planet_links = ShipLocation.__table__, PlanetLink.__table__
+
+    return {
+        "last message of a race": (
+            "messages",
+            select(messages).where(messages.c.race_id == some_id).order_by(messages.c.position.desc()).limit(1),
+        ),
+        "planets of a user": ("planets", select(planets).where(planets.c.user_id == some_id)),
+        "settlements of a planet": ("settlements", select(settlements).where(settlements.c.planet_id == some_id)),
+        "buildings of a settlement": ("buildings", select(buildings).where(buildings.c.settlement_id == some_id)),
+        "units in a barrack": ("attack_units", select(attack_units).where(attack_units.c.building_id == some_id)),
+        "units on a spaceship": ("attack_units", select(attack_units).where(attack_units.c.spaceship_id == some_id)),
+        "ships orbiting a planet": (
+            "ship_locations",
+            select(ship_locations).where(ship_locations.c.planet_id == some_id),
+        ),
+        "link between planets": (
+            "planet_links",
+            select(planet_links).where(
+                planet_links.c.planet_from_id == some_id, planet_links.c.planet_to_id == some_id
+            ),
+        ),
+        "spaceships heading to a planet": (
+            "spaceships",
+            select(spaceships).where(spaceships.c.current_destination_id == some_id),
+        ),
+    }
+
+
+def explain(connection: Connection, statement: Select) -> list[str]:
+    """Get the lines of the plan of a statement"""
+    sql: str = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def full_scans(plan: list[str], table: str) -> list[str]:
+    """Get the lines of a plan that read a whole table"""
+    return [line for line in plan if f"Seq Scan on {table} " in f"{line} " or line.strip() == f"SCAN {table}"]
+
+
+def check(engine: Engine) -> dict[str, list[str]]:
+    """
+    Explain the main queries.
+
+    :return: The plan of every query that scans the whole table it filters, by name of the query
+    """
+    failures: dict[str, list[str]] = {}
+    with engine.connect() as connection:
+        for name, (table, statement) in main_queries().items():
+            plan: list[str] = explain(connection, statement)
+            if full_scans(plan, table):
+                failures[name] = plan
+        connection.rollback()
+    return failures
+
+
+def seed(session: Session, users: int) -> None:
+    """Create users with a race, a chat message and a planet with a settlement and a barrack with a unit"""
+    for i in range(users):
+        user = User(f"user_{i}", "Password1")
+        session.add(user)
+        session.flush()
+        race = Race(f"race_{i}", user.user_id)
+        planet = Planet(user.user_id, i, i, f"planet_{i}")
+        session.add_all([race, planet])
+        session.flush()
+        settlement = Settlement(0, planet.planet_id)
+        session.add_all([settlement, Message("Hello", user.user_id, race.race_id, 0)])
+        session.flush()
+        barrack = Barrack(settlement.settlement_id, 1, 1, level=1)
+        session.add(barrack)
+        session.flush()
+        session.add(SpaceMarine(barrack.building_id))
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100, help="users to seed the SQLite file with")
+    parser.add_argument("--db-url", help="database to check, defaults to a seeded SQLite file")
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db_url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".sqlite", delete=False).name
+    engine = create_engine(args.db_url or f"sqlite:///{db_file}")
+    if db_file is not None:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            seed(session, args.users)
+
+    failures = check(engine)
+    for name in main_queries():
+        print(f"{name:<34} {'full scan' if name in failures else 'index'}")
+    for name, plan in failures.items():
+        print(f"\n{name}:\n  " + "\n  ".join(plan))
+
+    engine.dispose()
+    if db_file is not None:
+        os.remove(db_file)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Generation of the primary keys of the models.
+
+Keys are generated by the scheme in ``config_data['id_scheme']``. ``uuid7`` keys start with the time they were made, so
+new rows are inserted at the end of the primary key indexes instead of on a random page of them. ``uuid1`` keys start
+with the fast-changing low bits of the time, which spreads the inserts over the whole index.
+"""
+
+import os
+import threading
+import time
+from typing import Callable
+from uuid import UUID, uuid1
+
+from database.config import config_data
+
+_lock = threading.Lock()
+_last_ms: int = 0
+_counter: int = 0
+
+
+def uuid7() -> UUID:
+    """
+    Generate a UUID version 7: 48 bits of unix time in milliseconds, a 12 bit counter and 62 random bits.
+    The counter keeps the keys of a process increasing within the same millisecond, and when the clock goes back.
+    """
+    global _last_ms, _counter
+    with _lock:
+        ms: int = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # Start the counter in its lower half, so there is room to count up within the millisecond
+            _last_ms, _counter = ms, int.from_bytes(os.urandom(2), "big") & 0x7FF
+        elif _counter < 0xFFF:
+            _counter += 1
+        else:
+            _last_ms, _counter = _last_ms + 1, 0
+        ms, counter = _last_ms, _counter
+
+    random_bits: int = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | random_bits)
+
+
+ID_SCHEMES: dict[str, Callable[[], UUID]] = {"uuid1": uuid1, "uuid7": uuid7}
+"Generators of the keys by name of their scheme"
+
+_generate: Callable[[], UUID] = ID_SCHEMES[config_data.get("id_scheme", "uuid7")]
+
+
+def new_id() -> UUID:
+    """Generate a primary key with the configured scheme"""
+    return _generate()
+
+
+def set_id_scheme(scheme: str) -> None:
+    """Generate the keys with another scheme from now on"""
+    global _generate
+    _generate = ID_SCHEMES[scheme]
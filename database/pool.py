@@ -0,0 +1,108 @@
+"""
+Connection pool of the database, instrumented so the pool of every worker process can be sized from what it reports.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import ConnectionPoolEntry, QueuePool
+
+
+class PoolMetrics:
+    """
+    Counters of the connection checkouts of a pool in this process.
+    Checkouts that found every connection in use, including the overflow, had to wait for one to be returned.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+        self.checkouts: int = 0
+        "Amount of connections that were checked out"
+
+        self.checkout_seconds: float = 0.0
+        "Total time spent checking out connections, including opening new ones"
+
+        self.max_checkout_seconds: float = 0.0
+        "Longest time a single checkout took"
+
+        self.waits: int = 0
+        "Amount of checkouts that had to wait for a connection to be returned"
+
+        self.wait_seconds: float = 0.0
+        "Total time spent waiting for a connection to be returned"
+
+        self.timeouts: int = 0
+        "Amount of checkouts that gave up waiting"
+
+    def record(self, seconds: float, waited: bool, timed_out: bool) -> None:
+        """Record a single checkout"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.checkout_seconds += seconds
+                self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+            if waited:
+                self.waits += 1
+                self.wait_seconds += seconds
+
+
+class InstrumentedQueuePool(QueuePool):
+    """Queue pool that records how long every checkout takes in :attr:`metrics`"""
+
+    def __init__(self, *args, max_overflow: int = 10, **kwargs) -> None:
+        super().__init__(*args, max_overflow=max_overflow, **kwargs)
+        self.metrics: PoolMetrics = PoolMetrics()
+
+        self.max_overflow: int = max_overflow
+        "Connections opened beyond the size of the pool before checkouts wait, -1 when there is no limit"
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # The metrics outlive a recreated pool, as they describe the process
+        pool: InstrumentedQueuePool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # When the overflow is used up and no connection is idle, the checkout blocks until one is returned
+        waited: bool = -1 < self.max_overflow <= self.overflow() and self.checkedin() == 0
+        start: float = time.perf_counter()
+        try:
+            entry: ConnectionPoolEntry = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, waited, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, waited, timed_out=False)
+        return entry
+
+
+def pool_status(pool) -> dict:
+    """
+    Report the state of a pool and, when it is instrumented, its checkout metrics.
+
+    :return: A dictionary that can be logged or serialized as json
+    """
+    status: dict = {"pid": os.getpid()}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(
+            checkouts=metrics.checkouts,
+            avg_checkout_ms=1000 * metrics.checkout_seconds / metrics.checkouts if metrics.checkouts else 0.0,
+            max_checkout_ms=1000 * metrics.max_checkout_seconds,
+            waits=metrics.waits,
+            wait_ms=1000 * metrics.wait_seconds,
+            timeouts=metrics.timeouts,
+        )
+    return status
@@ -0,0 +1,148 @@
+"""
+Counting of the statements sent to the database, per request or per block of code.
+
+Every statement is recorded in the active scopes with the time it took and its fingerprint: the statement with the
+lists of parameters collapsed. The same fingerprint executed many times in one scope is usually a lazy load in a loop,
+an N+1 query pattern. Transaction control, like ``BEGIN`` and savepoints, isn't counted.
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload
+
+from database.conflicts import retry_hooks
+
+N_PLUS_ONE_THRESHOLD: int = 5
+"Times a fingerprint has to be executed in a single scope to be reported as an N+1 query pattern"
+
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_TRANSACTION_CONTROL = re.compile(r"\s*(?:BEGIN|SAVEPOINT|RELEASE|ROLLBACK)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Get the fingerprint of a statement, statements that only differ in the amount of parameters share theirs"""
+    return _PARAMETER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements executed in a scope"""
+
+    def __init__(self, parent: "QueryStats | None" = None) -> None:
+        self.parent: QueryStats | None = parent
+        "Scope this scope runs in, which sees the statements as well"
+
+        self.statements: int = 0
+        "Amount of statements executed"
+
+        self.seconds: float = 0.0
+        "Total time spent executing the statements"
+
+        self.fingerprints: Counter[str] = Counter()
+        "Times every fingerprint was executed"
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Record an executed statement in this scope and the scopes it runs in"""
+        key: str = fingerprint(statement)
+        stats: QueryStats | None = self
+        while stats is not None:
+            stats.statements += 1
+            stats.seconds += seconds
+            stats.fingerprints[key] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        """Get the fingerprints executed at least ``threshold`` times, with the times they were executed"""
+        return {key: count for key, count in self.fingerprints.items() if count >= threshold}
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    """Get the stats of the innermost active scope, None when no statements are counted"""
+    return _current.get()
+
+
+def begin_counting() -> Token:
+    """Start counting the statements in a new scope, returns the token to pass to :func:`end_counting`"""
+    return _current.set(QueryStats(_current.get()))
+
+
+def end_counting(token: Token) -> QueryStats:
+    """End the scope started with the given token, returns its stats"""
+    stats: QueryStats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def _forget_repeats() -> None:
+    # A retried transaction runs its statements again, which isn't a lazy load in a loop
+    stats: QueryStats | None = _current.get()
+    if stats is not None:
+        stats.fingerprints.clear()
+
+
+retry_hooks.append(_forget_repeats)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Count the statements executed in the block, including the ones of the requests handled in it"""
+    token: Token = begin_counting()
+    try:
+        yield _current.get()
+    finally:
+        end_counting(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(connection, _cursor, statement: str, _parameters, _context, _executemany) -> None:
+    # A connection runs one statement at a time, so a single start time is kept
+    if _current.get() is not None and not _TRANSACTION_CONTROL.match(statement):
+        connection.info["query_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(connection, _cursor, statement: str, _parameters, _context, _executemany) -> None:
+    stats: QueryStats | None = _current.get()
+    start: float | None = connection.info.pop("query_start", None)
+    if stats is not None and start is not None and not _TRANSACTION_CONTROL.match(statement):
+        stats.record(statement, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "handle_error")
+def _forget_failed_statement(context: ExceptionContext) -> None:
+    # A failed statement never reaches after_cursor_execute, its start time would be taken for the next statement
+    if context.connection is not None:
+        context.connection.info.pop("query_start", None)
+
+
+_raise_on_lazy_load: ContextVar[bool] = ContextVar("raise_on_lazy_load", default=False)
+
+
+@contextmanager
+def raise_on_lazy_load() -> Iterator[None]:
+    """
+    Make every relationship that wasn't loaded eagerly raise when it is accessed in the block, instead of loading it
+    lazily. Used in tests to keep new lazy loads out of the code paths that load their objects with a profile.
+    """
+    token: Token = _raise_on_lazy_load.set(True)
+    try:
+        yield
+    finally:
+        _raise_on_lazy_load.reset(token)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _add_raiseload(state: ORMExecuteState) -> None:
+    # Explicit loader options of the query take precedence over the wildcard
+    if _raise_on_lazy_load.get() and state.is_select and not state.is_column_load:
+        state.statement = state.statement.options(raiseload("*"))
@@ -0,0 +1,135 @@
+"""
+Routing of read-only work to replicas of the database.
+
+Writes always go to the primary. Work that only reads can go to a replica, unless the user wrote something the replica
+might not have replayed yet: a request that writes leaves a consistency token, and a replica is only used for the user
+once it caught up with that token.
+"""
+
+import time
+from contextvars import ContextVar, Token
+
+from sqlalchemy import Connection, Engine, text
+
+
+class ConsistencyToken:
+    """The last write of a user, which the reads of that user have to see"""
+
+    def __init__(self, written_at: float, position: str | None = None) -> None:
+        self.written_at: float = written_at
+        "Time of the write, in seconds since the epoch"
+
+        self.position: str | None = position
+        "Position of the primary's write-ahead log after the write, None when the database doesn't have one"
+
+    def json(self) -> dict:
+        return {"written_at": self.written_at, "position": self.position}
+
+    @staticmethod
+    def from_json(data: dict | None) -> "ConsistencyToken | None":
+        if data is None:
+            return None
+        return ConsistencyToken(data["written_at"], data.get("position"))
+
+
+class ConsistencyScope:
+    """The consistency of a single request"""
+
+    def __init__(self, token: ConsistencyToken | None) -> None:
+        self.token: ConsistencyToken | None = token
+        "Token of the last write of the user before the request, None if the user didn't write recently"
+
+        self.wrote_at: float | None = None
+        "Time at which the request last committed a write, None if it didn't write"
+
+
+_current: ContextVar[ConsistencyScope | None] = ContextVar("consistency_scope", default=None)
+
+
+def current_scope() -> ConsistencyScope | None:
+    """Get the scope of the current request, None when not in a request"""
+    return _current.get()
+
+
+def begin_scope(token: ConsistencyToken | None) -> Token:
+    """Start a new scope with the token of the user, returns the token to pass to :func:`end_scope`"""
+    return _current.set(ConsistencyScope(token))
+
+
+def end_scope(token: Token) -> ConsistencyScope:
+    """End the scope started with the given token, returns the ended scope"""
+    scope: ConsistencyScope = _current.get()
+    _current.reset(token)
+    return scope
+
+
+def note_write() -> None:
+    """Note that the current request committed a write"""
+    scope: ConsistencyScope | None = _current.get()
+    if scope is not None:
+        scope.wrote_at = time.time()
+        scope.token = ConsistencyToken(scope.wrote_at)
+
+
+def write_position(primary: Engine | Connection) -> str | None:
+    """
+    Get the current position of the write-ahead log of the primary, None when the database doesn't have one.
+    Sessions bound to a connection, like in the tests, ask it on that connection.
+    """
+    if primary.dialect.name != "postgresql":
+        return None
+    if isinstance(primary, Connection):
+        return primary.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+    with primary.connect() as connection:
+        return connection.execute(text("SELECT pg_current_wal_lsn()::text")).scalar()
+
+
+def written_token(primary: Engine | Connection) -> ConsistencyToken | None:
+    """
+    Get the token of the writes of the current request, to be stored for the next requests of the user.
+
+    :return: The token, None if the request didn't write
+    """
+    scope: ConsistencyScope | None = _current.get()
+    if scope is None or scope.wrote_at is None:
+        return None
+    return ConsistencyToken(scope.wrote_at, write_position(primary))
+
+
+def caught_up(replica: Engine, token: ConsistencyToken, max_lag: float) -> bool:
+    """
+    Whether a replica has replayed the write of a token.
+    Without a log position, a replica is assumed to have caught up once ``max_lag`` seconds passed.
+    """
+    if token.position is not None and replica.dialect.name == "postgresql":
+        with replica.connect() as connection:
+            replayed = connection.execute(
+                text("SELECT pg_last_wal_replay_lsn() >= CAST(:position AS pg_lsn)"), {"position": token.position}
+            ).scalar()
+        return bool(replayed)
+    return time.time() - token.written_at >= max_lag
+
+
+_next_replica: int = 0
+"Index of the replica the next read goes to first, the reads are spread round-robin"
+
+
+def read_engine(primary: Engine, replicas: list[Engine], max_lag: float) -> Engine:
+    """
+    Pick the engine to read from in the current scope: the next replica that caught up with the writes of the user, or
+    the primary if there is none.
+    """
+    global _next_replica
+    if len(replicas) == 0:
+        return primary
+
+    scope: ConsistencyScope | None = _current.get()
+    token: ConsistencyToken | None = None if scope is None else scope.token
+
+    start: int = _next_replica
+    _next_replica = (start + 1) % len(replicas)
+    for offset in range(len(replicas)):
+        replica: Engine = replicas[(start + offset) % len(replicas)]
+        if token is None or caught_up(replica, token, max_lag):
+            return replica
+    return primary
@@ -1,10 +1,85 @@
+from typing import Iterator
+
 import pytest
-from database.database_access import Base, engine
+from flask import Flask
+from sqlalchemy import Connection, RootTransaction
+from sqlalchemy.orm import close_all_sessions
 
+from backend.api import api_bp
+from backend.game_classes import clock
+from database.database_access import Base, DefaultSession, engine
+from database.query_counter import raise_on_lazy_load
 
-@pytest.fixture(name="clear-db")
-def uses_db():
-    # clear all tables by dropping and recreating them
+
+@pytest.fixture(name="database-schema", scope="session")
+def database_schema():
+    # the tables are created once per test run, the tests roll back what they write
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     yield
+
+
+def rolled_back_transaction() -> Iterator[None]:
+    # every session of the test joins an outer transaction, their commits only release savepoints in it
+    connection: Connection = engine.connect()
+    transaction: RootTransaction = connection.begin()
+    session_kw: dict = dict(DefaultSession.kw)
+    DefaultSession.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield
+    finally:
+        close_all_sessions()
+        DefaultSession.kw = session_kw
+        transaction.rollback()
+        connection.close()
+
+
+def recreated_tables() -> Iterator[None]:
+    # the test commits for real, so the tables are recreated before it and emptied for the tests after it
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield
+    finally:
+        # sessions the test left open would keep their transaction on the connection
+        close_all_sessions()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+
+@pytest.fixture(name="clear-db")
+def uses_db(request):
+    request.getfixturevalue("database-schema")
+    recreate: bool = (
+        request.config.getoption("--db-isolation") == "recreate"
+        or request.node.get_closest_marker("real_transactions") is not None
+    )
+
+    # the clock only moves when a test advances it, so timers complete exactly when expected
+    clock.freeze()
+    try:
+        yield from recreated_tables() if recreate else rolled_back_transaction()
+    finally:
+        clock.reset()
+
+
+@pytest.fixture(name="api-client")
+def api_client():
+    # a client of just the api, with the cookie session of flask instead of the server side one of the app
+    app = Flask("test")
+    app.config["SECRET_KEY"] = "test"
+    app.register_blueprint(api_bp)
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(name="raise-on-lazy-load", autouse=True)
+def raises_on_lazy_load(request):
+    # opt-in with --raise-on-lazy-load or the raise_on_lazy_load marker, lazy loads then fail the test
+    if not (request.config.getoption("--raise-on-lazy-load") or request.node.get_closest_marker("raise_on_lazy_load")):
+        yield
+        return
+
+    with raise_on_lazy_load():
+        yield
@@ -0,0 +1,109 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.game_classes import Planet, User
+from database import conflicts
+from database.conflicts import ConflictError, conflict_metrics, retry_hooks, retry_on_conflict
+from database.database_access import Base
+
+
+@pytest.fixture
+def planet_db(tmp_path):
+    """A SQLite file with a planet, shared by the sessions of a test"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'conflicts.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        user = User("test_user", "Test_password1")
+        session.add(user)
+        session.flush()
+        planet = Planet(user.user_id, 0, 0, "test_planet")
+        planet.building_materials, planet.rations = 1000, 1000
+        session.add(planet)
+        session.commit()
+        planet_id = planet.planet_id
+    yield engine, planet_id
+    engine.dispose()
+
+
+def test_concurrent_update_is_detected(planet_db):
+    engine, planet_id = planet_db
+    with Session(engine) as first, Session(engine) as second:
+        first_planet = first.get(Planet, planet_id)
+        second_planet = second.get(Planet, planet_id)
+        assert first_planet.version == second_planet.version == 1
+
+        first_planet.building_materials -= 100
+        first.commit()
+        assert first_planet.version == 2
+
+        # The second session still has version 1, its update would overwrite the spending of the first one
+        second_planet.rations -= 100
+        with pytest.raises(StaleDataError):
+            second.commit()
+
+
+def test_retry_on_conflict(planet_db, monkeypatch):
+    engine, planet_id = planet_db
+    monkeypatch.setattr(conflicts, "RETRY_BACKOFF", 0)
+    hook_calls: list[int] = []
+    monkeypatch.setattr(conflicts, "retry_hooks", retry_hooks + [lambda: hook_calls.append(1)])
+    before: dict = conflict_metrics.status()
+    runs: list[int] = []
+
+    @retry_on_conflict
+    def spend_rations() -> None:
+        with Session(engine) as session:
+            planet = session.get(Planet, planet_id)
+            if not runs:
+                # Another transaction changes the planet between the load and the update of the first run
+                with Session(engine) as other:
+                    other.get(Planet, planet_id).building_materials -= 100
+                    other.commit()
+            runs.append(1)
+            planet.rations -= 100
+            session.commit()
+
+    spend_rations()
+    assert len(runs) == 2
+    assert len(hook_calls) == 1
+
+    # Both changes are kept
+    with Session(engine) as session:
+        planet = session.get(Planet, planet_id)
+        assert (planet.building_materials, planet.rations, planet.version) == (900, 900, 3)
+
+    after: dict = conflict_metrics.status()
+    assert after["transactions"] - before["transactions"] == 1
+    assert after["retries"] - before["retries"] == 1
+    assert after["failures"] == before["failures"]
+
+
+def test_retry_gives_up(planet_db, monkeypatch):
+    monkeypatch.setattr(conflicts, "RETRY_BACKOFF", 0)
+    before: dict = conflict_metrics.status()
+
+    @retry_on_conflict(attempts=3)
+    def always_conflicts() -> None:
+        raise StaleDataError("The row changed")
+
+    with pytest.raises(StaleDataError):
+        always_conflicts()
+    after: dict = conflict_metrics.status()
+    assert after["conflicts"] - before["conflicts"] == 3
+    assert after["failures"] - before["failures"] == 1
+
+
+def test_game_conflicts_are_retried(monkeypatch):
+    monkeypatch.setattr(conflicts, "RETRY_BACKOFF", 0)
+    runs: list[int] = []
+
+    @retry_on_conflict
+    def spends_what_changed() -> int:
+        runs.append(1)
+        if len(runs) == 1:
+            raise ConflictError("The planet spent its resources meanwhile")
+        return len(runs)
+
+    assert spends_what_changed() == 2
@@ -0,0 +1,53 @@
+from uuid import UUID
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend.game_classes import User
+from database.database_access import DefaultSession, auto_session, default_factory
+
+
+@auto_session
+def session_of(user: User, session: Session = None) -> Session:
+    return session
+
+
+@auto_session
+def session_of_self(self: User, session: Session = None) -> Session:
+    return session
+
+
+@auto_session
+def without_session(user: User) -> User:
+    return user
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_auto_session():
+    with DefaultSession() as session:
+        user = User("test_user", "Test_password1")
+
+        # A passed session is used, and the orm arguments are added to it
+        assert session_of(user, session) is session
+        assert session_of(user, session=session) is session
+        assert user in session
+
+        # Without a session, a method uses the session of its object and a function gets a new session
+        assert session_of_self(user) is session
+        assert session_of(user, force_add_all=False) is not session
+
+        # Functions that don't ask for a session don't get it
+        assert without_session(user, session=session) is user
+
+
+def test_default_factory():
+    ids = iter(range(1, 100))
+
+    @default_factory(item_id=lambda: UUID(int=next(ids)))
+    def make(value: int, item_id: UUID = None) -> tuple[int, UUID]:
+        return value, item_id
+
+    assert make(1) == (1, UUID(int=1))
+    assert make(2, UUID(int=50)) == (2, UUID(int=50))
+    assert make(3, item_id=UUID(int=60)) == (3, UUID(int=60))
+    assert make(4) == (4, UUID(int=2))
@@ -0,0 +1,19 @@
+import pytest
+
+from database.database_access import DefaultSession, engine
+from database.explain import check, full_scans, seed
+
+
+def test_full_scans():
+    assert full_scans(["SCAN planets"], "planets") == ["SCAN planets"]
+    assert full_scans(["SEARCH planets USING INDEX ix_planets_user_id (user_id=?)"], "planets") == []
+    assert full_scans(["Seq Scan on planets  (cost=0.00..1.01 rows=1 width=64)"], "planets") != []
+    assert full_scans(["Index Scan using ix_planets_user_id on planets"], "planets") == []
+
+
+@pytest.mark.real_transactions
+@pytest.mark.usefixtures("clear-db")
+def test_main_queries_use_indexes():
+    with DefaultSession() as session:
+        seed(session, users=5)
+    assert check(engine) == {}
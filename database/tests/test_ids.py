@@ -0,0 +1,33 @@
+from uuid import UUID
+
+import pytest
+
+from database import ids
+from database.ids import new_id, set_id_scheme, uuid7
+
+
+def test_uuid7_layout():
+    key: UUID = uuid7()
+    assert key.version == 7
+    assert key.variant == "specified in RFC 4122"
+
+
+def test_uuid7_keys_increase():
+    keys: list[UUID] = [uuid7() for _ in range(10_000)]
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    # Postgres compares uuids bytewise and SQLite stores them as hex, both orders match
+    assert [key.hex for key in keys] == sorted(key.hex for key in keys)
+
+
+def test_id_scheme():
+    previous = ids._generate
+    try:
+        set_id_scheme("uuid1")
+        assert new_id().version == 1
+        set_id_scheme("uuid7")
+        assert new_id().version == 7
+        with pytest.raises(KeyError):
+            set_id_scheme("uuid3")
+    finally:
+        ids._generate = previous
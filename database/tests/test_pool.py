@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from database.pool import InstrumentedQueuePool, pool_status
+
+
+def test_pool_metrics(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    # A single connection is checked out
+    connection = engine.connect()
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 1
+    assert status["checkouts"] == 1
+    assert status["waits"] == 0
+
+    # The pool is exhausted, so the next checkout waits and gives up
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    status = pool_status(engine.pool)
+    assert status["waits"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_ms"] >= 50
+
+    # Once it is returned, the connection is reused
+    connection.close()
+    engine.connect().close()
+    status = pool_status(engine.pool)
+    assert status["checked_out"] == 0
+    assert status["idle"] == 1
+    assert status["checkouts"] == 2
+
+    # A recreated pool still knows when checkouts wait
+    engine.dispose()
+    assert engine.pool.max_overflow == 0
+    assert engine.pool.metrics.waits == 1
+    engine.dispose()
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError, OperationalError
+
+from backend.game_classes import Planet, Settlement, User
+from backend.tests.test_loader_profiles import build_empire
+from database.database_access import DefaultSession
+from database.query_counter import count_queries, fingerprint, raise_on_lazy_load
+
+
+def test_fingerprint():
+    assert fingerprint("SELECT *\n  FROM users WHERE user_id IN (?, ?, ?)") == "SELECT * FROM users WHERE user_id IN (?)"
+    assert fingerprint("SELECT * FROM users WHERE user_id IN (%(id_1)s)") == "SELECT * FROM users WHERE user_id IN (?)"
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_count_queries():
+    with DefaultSession() as session:
+        build_empire(session, "test_user", 3)
+
+    with DefaultSession() as session, count_queries() as outer:
+        user = User.load_by_name("test_user", session=session)
+        planet: Planet = user.planets[0]
+
+        # Walking the settlements lazily loads the buildings of every settlement with the same statement
+        with count_queries() as inner:
+            buildings = [building for settlement in planet.settlements for building in settlement.buildings]
+        assert len(buildings) == 6
+
+    assert inner.statements == 4
+    assert outer.statements == inner.statements + 2
+    assert outer.seconds >= inner.seconds > 0
+    assert list(inner.repeated(threshold=3).values()) == [3]
+    assert inner.repeated() == {}
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_count_failed_queries():
+    with DefaultSession() as session, count_queries() as stats:
+        # The failed statement isn't recorded, and its start time doesn't stay behind on the connection
+        with pytest.raises(OperationalError):
+            session.execute(text("SELECT * FROM missing_table"))
+        assert "query_start" not in session.connection().info
+        session.rollback()
+
+        session.execute(text("SELECT 1"))
+        assert "query_start" not in session.connection().info
+
+    assert stats.statements == 1
+
+
+@pytest.mark.usefixtures("clear-db")
+def test_raise_on_lazy_load():
+    with DefaultSession() as session:
+        build_empire(session, "test_user", 2)
+
+    with DefaultSession() as session, raise_on_lazy_load():
+        user = User.load_by_name("test_user", session=session)
+        with pytest.raises(InvalidRequestError):
+            _ = user.planets
+
+    # Relationships loaded by a profile can be walked
+    with DefaultSession() as session, raise_on_lazy_load():
+        user = User.load_by_name("test_user", profile="combat roster", session=session)
+        settlements: list[Settlement] = user.planets[0].settlements
+        assert user.planets[0].get_attack_power() > 0
+        assert len(settlements) == 2
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import InvalidRequestError
+
+import database.database_access as database_access
+from backend.game_classes import User
+from database.database_access import Base, DefaultSession, read_only_session
+from database.routing import ConsistencyToken, begin_scope, end_scope, read_engine, written_token
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary and a replica, each in their own SQLite file"""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.sqlite'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.sqlite'}")
+    Base.metadata.create_all(bind=primary)
+    Base.metadata.create_all(bind=replica)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def test_reads_follow_writes(databases):
+    primary, replica = databases
+
+    # Without writes of the user, reads go to the replica
+    scope_token = begin_scope(None)
+    assert read_engine(primary, [replica], max_lag=5) is replica
+
+    # After a write, reads go to the primary until the replica has it
+    with DefaultSession(bind=primary) as session:
+        session.add(User("test_user", "Test_password1"))
+        session.commit()
+    assert read_engine(primary, [replica], max_lag=5) is primary
+    assert read_engine(primary, [replica], max_lag=0) is replica
+
+    token = written_token(primary)
+    end_scope(scope_token)
+    assert token is not None and token.position is None
+
+    # The token follows the user to their next requests
+    scope_token = begin_scope(ConsistencyToken.from_json(token.json()))
+    assert read_engine(primary, [replica], max_lag=5) is primary
+    end_scope(scope_token)
+
+    scope_token = begin_scope(ConsistencyToken(time.time() - 10))
+    assert read_engine(primary, [replica], max_lag=5) is replica
+    assert written_token(primary) is None
+    end_scope(scope_token)
+
+
+def test_reads_without_writes_spread_over_replicas(databases):
+    primary, replica = databases
+    other = create_engine("sqlite://")
+
+    picked = {read_engine(primary, [replica, other], max_lag=5) for _ in range(2)}
+    assert picked == {replica, other}
+    assert read_engine(primary, [], max_lag=5) is primary
+    other.dispose()
+
+
+def test_read_only_session(databases, monkeypatch):
+    primary, replica = databases
+    monkeypatch.setattr(database_access, "replica_engines", [replica])
+
+    with read_only_session() as session:
+        assert session.get_bind() is replica
+        assert session.query(User).all() == []
+
+        session.add(User("test_user", "Test_password1"))
+        with pytest.raises(InvalidRequestError):
+            session.flush()
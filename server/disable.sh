@@ -11,6 +11,7 @@ sudo systemctl restart nginx
 # disable and stop service
 echo "Stopping service"
 sudo systemctl disable project-galaxyd.service --now
+sudo systemctl disable project-galaxy-worker.service --now
 
 echo "Server disabled"
 
@@ -5,6 +5,7 @@ echo "Enabling server"
 # enable and start service
 echo "Starting service"
 sudo systemctl enable project-galaxyd.service --now
+sudo systemctl enable project-galaxy-worker.service --now
 
 # add to nginx
 echo "Adding site to nginx"
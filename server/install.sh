@@ -14,6 +14,9 @@ install -m 755 -D /opt/project-galaxy/code/management/project-galaxy-management.
 # install web service
 install -m 755 -D /opt/project-galaxy/code/server/project-galaxyd.service /etc/systemd/system/
 
+# install background worker service
+install -m 755 -D /opt/project-galaxy/code/server/project-galaxy-worker.service /etc/systemd/system/
+
 # create nginx config directory
 mkdir -p /opt/project-galaxy/code/server/nginx-config
 chown project-galaxy:www-data /opt/project-galaxy/code/server/nginx-config/
@@ -13,12 +13,26 @@ echo "Fetching latest changes"
 # git checkout production
 git pull
 
-# echo "migrating database to latest version"
-# TODO migrate database once migration is added
-
 # update all python packages
 /opt/project-galaxy/code/.venv/bin/pip install -r /opt/project-galaxy/code/requirements.txt
 
+# The live database was created before the migrations were added, it is marked as being at the baseline revision once
+/opt/project-galaxy/code/.venv/bin/python - <<'EOF'
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from database.database_access import engine
+
+tables: list[str] = inspect(engine).get_table_names()
+if "alembic_version" not in tables and "users" in tables:
+    print("Marking the database as being at the baseline revision")
+    command.stamp(Config("alembic.ini"), "3f1c2a9d7e40")
+EOF
+
+echo "Migrating database to latest version"
+/opt/project-galaxy/code/.venv/bin/alembic upgrade head
+
 cd /opt/project-galaxy/code/frontend/project-galaxy-front/
 npm install
 cd /opt/project-galaxy/code/
@@ -0,0 +1,2 @@
+#!/bin/bash
+/opt/project-galaxy/code/.venv/bin/python -m backend.worker
\ No newline at end of file
@@ -1,2 +1,2 @@
 #!/bin/bash
-/opt/project-galaxy/code/.venv/bin/gunicorn --workers 3 --bind unix:server/project-galaxy.sock -m 007 app:app
\ No newline at end of file
+/opt/project-galaxy/code/.venv/bin/gunicorn --workers 3 --worker-class gthread --threads 8 --bind unix:server/project-galaxy.sock -m 007 app:app
\ No newline at end of file
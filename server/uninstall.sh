@@ -6,11 +6,11 @@ rm /etc/nginx/sites-enabled/incl-project-galaxy.conf /etc/nginx/sites-available/
 # restart nginx to use new configuration
 systemctl restart nginx
 
-# disable and stop web and management services
-systemctl disable project-galaxyd.service project-galaxy-management.service --now
+# disable and stop web, worker and management services
+systemctl disable project-galaxyd.service project-galaxy-worker.service project-galaxy-management.service --now
 
-# remove web and management service files
-rm /etc/systemd/system/project-galaxyd.service /etc/systemd/system/project-galaxy-management.service
+# remove web, worker and management service files
+rm /etc/systemd/system/project-galaxyd.service /etc/systemd/system/project-galaxy-worker.service /etc/systemd/system/project-galaxy-management.service
 
 # remove management service
 rm -r /opt/project-galaxy /etc/project-galaxy